@@ -23,11 +23,12 @@ import json
 import logging
 import asyncio
 import threading
+import concurrent.futures
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from tkinter import simpledialog
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import time
 
@@ -59,6 +60,12 @@ class SuperAgentGUI:
         self.chat_history = []
         self.rag_context = []
         
+        # Estado da resposta em streaming
+        self._stream_cancel = None
+        self._stream_buffer = []
+        self._stream_lock = threading.Lock()
+        self._stream_flush_scheduled = False
+        
         # Referências aos módulos (serão definidas pelo main.py)
         self.agent = None
         self.openrouter_manager = None
@@ -96,6 +103,12 @@ class SuperAgentGUI:
     def load_models_after_injection(self):
         """Carrega modelos após a injeção de dependências"""
         if hasattr(self, 'openrouter_manager') and self.openrouter_manager:
+            cached = list(getattr(self.openrouter_manager, 'models_cache', {}).values())
+            if cached and hasattr(self.openrouter_manager, 'refresh_models'):
+                # Catálogo salvo em disco aparece na hora; a atualização roda em segundo plano
+                self._update_model_combo([f"{m.name} ({m.company})" for m in cached], cached)
+                self._refresh_models_background()
+                return
             self.log_text.insert(tk.END, "Carregando modelos OpenRouter após injeção...\n")
             self.log_text.see(tk.END)
             self._load_models()
@@ -238,9 +251,13 @@ class SuperAgentGUI:
         
         ttk.Label(model_frame, text="Modelo OpenRouter:").pack(side=tk.LEFT, padx=5)
         
-        self.model_combo = ttk.Combobox(model_frame, state="readonly", textvariable=self.selected_model)
+        # Editável: digitar filtra o catálogo por prefixo (ex.: "claude son")
+        self.model_combo = ttk.Combobox(model_frame, textvariable=self.selected_model)
         self.model_combo.pack(side=tk.LEFT, padx=5)
         self.model_combo.bind("<<ComboboxSelected>>", self._on_model_selected)
+        self.model_combo.bind("<KeyRelease>", self._on_model_typed)
+        self.model_combo.bind("<Return>", self._resolve_typed_model)
+        self.model_combo.bind("<FocusOut>", self._resolve_typed_model)
         
         # Dropdown de empresa
         ttk.Label(model_frame, text="Empresa:").pack(side=tk.LEFT, padx=5)
@@ -254,6 +271,10 @@ class SuperAgentGUI:
         self.free_checkbox = ttk.Checkbutton(model_frame, text="Modelos Gratuitos", variable=self.free_var, command=self._on_free_filter)
         self.free_checkbox.pack(side=tk.LEFT, padx=5)
         
+        # Roteamento automático: melhor p95 recente entre os modelos dos filtros acima
+        self.auto_route_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(model_frame, text="Roteamento automático", variable=self.auto_route_var).pack(side=tk.LEFT, padx=5)
+        
         # Frame para ações rápidas
         actions_frame = ttk.Frame(control_frame)
         actions_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -296,6 +317,9 @@ class SuperAgentGUI:
         button_frame.pack(fill=tk.X)
         
         ttk.Button(button_frame, text="Enviar", command=self._send_message).pack(side=tk.LEFT, padx=5)
+        self.stop_button = ttk.Button(button_frame, text="Parar", command=self._cancel_stream, state=tk.DISABLED)
+        self.stop_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Comparar Modelos", command=self._compare_models).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Buscar RAG", command=self._search_rag).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Salvar Memória", command=self._save_memory).pack(side=tk.LEFT, padx=5)
         
@@ -447,20 +471,78 @@ class SuperAgentGUI:
         self.log_text.insert(tk.END, "Carregando modelos OpenRouter...\n")
         self.log_text.see(tk.END)
         
-        # Executar de forma assíncrona em thread separada
-        def load_models_thread():
+        # Executar no event loop persistente do OpenRouter Manager
+        def on_done(future):
+            error = future.exception()
+            if error is not None and hasattr(self, 'root') and self.root:
+                # Usar after para atualizar GUI na thread principal
+                self.root.after(0, lambda: self.log_text.insert(tk.END, f"Erro ao carregar modelos: {error}\n"))
+                self.root.after(0, lambda: self.log_text.see(tk.END))
+        
+        self.openrouter_manager.submit(self._load_models_async()).add_done_callback(on_done)
+    
+    def _refresh_models_background(self):
+        """Atualiza o catálogo de modelos sem bloquear a interface"""
+        def on_done(future):
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(self._load_models_async())
-                loop.close()
+                result = future.result()
             except Exception as e:
-                # Usar after para atualizar GUI na thread principal
-                if hasattr(self, 'root') and self.root:
-                    self.root.after(0, lambda: self.log_text.insert(tk.END, f"Erro ao carregar modelos: {e}\n"))
-                    self.root.after(0, lambda: self.log_text.see(tk.END))
+                result = {"error": str(e)}
+            self.root.after(0, lambda: self._apply_model_changes(result))
         
-        threading.Thread(target=load_models_thread, daemon=True).start()
+        self.openrouter_manager.submit(self.openrouter_manager.refresh_models()).add_done_callback(on_done)
+    
+    def _model_matches_filters(self, model) -> bool:
+        """Modelo visível com os filtros de empresa e de gratuitos atuais"""
+        company = self.company_var.get()
+        if company and company != "Todas" and model.company != company:
+            return False
+        return not self.free_var.get() or getattr(model, 'is_free', False)
+    
+    def _apply_model_changes(self, result):
+        """Aplica ao combobox só os modelos adicionados, removidos ou alterados"""
+        if "error" in result:
+            self.log_text.insert(tk.END, f"Erro ao atualizar modelos (usando catálogo salvo): {result['error']}\n")
+            self.log_text.see(tk.END)
+            return
+        
+        added, removed, changed = result.get("added", []), result.get("removed", []), result.get("changed", [])
+        if not (added or removed or changed):
+            self.log_text.insert(tk.END, "Catálogo de modelos atualizado, sem mudanças\n")
+            self.log_text.see(tk.END)
+            return
+        
+        cache = self.openrouter_manager.models_cache
+        old_models = {m.id: m for m in getattr(self, 'available_models', [])}
+        labels = list(self.model_combo['values'])
+        
+        # Rótulos antigos dos modelos removidos/alterados saem da lista visível
+        stale = {f"{old_models[i].name} ({old_models[i].company})" for i in removed + changed if i in old_models}
+        positions = {label: index for index, label in enumerate(labels)}
+        for model_id in changed:
+            model = cache[model_id]
+            old = old_models.get(model_id)
+            old_label = f"{old.name} ({old.company})" if old else None
+            # Modelo alterado continua na mesma posição
+            if old_label in positions and self._model_matches_filters(model):
+                labels[positions[old_label]] = f"{model.name} ({model.company})"
+                stale.discard(old_label)
+        labels = [label for label in labels if label not in stale]
+        labels += [f"{cache[i].name} ({cache[i].company})" for i in added if self._model_matches_filters(cache[i])]
+        
+        models = [m for m in getattr(self, 'available_models', []) if m.id not in removed]
+        models = [cache.get(m.id, m) for m in models] + [cache[i] for i in added]
+        self.available_models = models
+        self.model_combo['values'] = labels
+        if self.model_combo.get() in stale:
+            self.model_combo.set(labels[0] if labels else "")
+            self.selected_model.set(self.model_combo.get())
+        
+        companies = ["Todas"] + sorted(set(m.company for m in models))
+        self.company_combo['values'] = companies
+        self.log_text.insert(tk.END, f"Modelos atualizados: {len(added)} novos, {len(changed)} alterados, "
+                                     f"{len(removed)} removidos\n")
+        self.log_text.see(tk.END)
     
     def _update_model_combo(self, model_names, models):
         """Atualiza combobox de modelos"""
@@ -483,6 +565,31 @@ class SuperAgentGUI:
         self.log_text.insert(tk.END, f"Carregados {len(models)} modelos\n")
         self.log_text.see(tk.END)
     
+    def _on_model_typed(self, event=None):
+        """Filtra a lista do combobox enquanto o nome do modelo é digitado"""
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        if not self.openrouter_manager or not hasattr(self.openrouter_manager, "search_models"):
+            return
+        
+        matches = self.openrouter_manager.search_models(self.model_combo.get())
+        
+        # Manter os filtros de empresa e de gratuitos
+        company = self.company_var.get()
+        if company and company != "Todas":
+            matches = [m for m in matches if m.company == company]
+        if self.free_var.get():
+            matches = [m for m in matches if getattr(m, 'is_free', False)]
+        
+        self.model_combo['values'] = [f"{m.name} ({m.company})" for m in matches]
+    
+    def _resolve_typed_model(self, event=None):
+        """Texto digitado que não é um modelo vira o primeiro modelo filtrado"""
+        values = self.model_combo['values']
+        if values and self.model_combo.get() not in values:
+            self.model_combo.set(values[0])
+            self.selected_model.set(values[0])
+    
     def _on_company_filter(self, event=None):
         """Filtrar modelos por empresa"""
         company = self.company_var.get()
@@ -553,16 +660,24 @@ class SuperAgentGUI:
         agent_type = self.current_agent_type.get()
         model_name = self.selected_model.get()
         
-        if not model_name:
+        # Encontrar modelo selecionado
+        model_id = None
+        if self.auto_route_var.get() and self.openrouter_manager:
+            company = self.company_var.get()
+            model_id = self.openrouter_manager.select_model(
+                free_only=self.free_var.get(), company=company if company and company != "Todas" else None)
+            model_name = model_id
+            if model_id:
+                self.log_text.insert(tk.END, f"Roteamento automático escolheu {model_id}\n")
+        elif not model_name:
             messagebox.showwarning("Aviso", "Selecione um modelo")
             return
         
-        # Encontrar modelo selecionado
-        model_id = None
-        for model in getattr(self, 'available_models', []):
-            if f"{model.name} ({model.company})" == model_name:
-                model_id = model.id
-                break
+        else:
+            for model in getattr(self, 'available_models', []):
+                if f"{model.name} ({model.company})" == model_name:
+                    model_id = model.id
+                    break
         
         if not model_id:
             messagebox.showerror("Erro", "Modelo não encontrado")
@@ -580,45 +695,189 @@ class SuperAgentGUI:
         self.log_text.insert(tk.END, f"Enviando mensagem para {model_name}...\n")
         self.log_text.see(tk.END)
         
-        # Executar de forma assíncrona
-        def send_async():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._send_message_async(message, agent_type, model_id))
-            loop.close()
-            
+        # Resposta em streaming: o texto aparece no chat conforme chega
+        self.chat_text.insert(tk.END, "\nAgente: ")
+        self.chat_text.see(tk.END)
+        cancel_event = threading.Event()
+        self._stream_cancel = cancel_event
+        self.stop_button.config(state=tk.NORMAL)
+        
+        def on_done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": str(e)}
             # Atualizar interface na thread principal
-            self.root.after(0, lambda: self._handle_response(result, message, agent_type, model_id))
+            self.root.after(0, lambda: self._handle_response(result, message, agent_type, model_id, streamed=True))
         
-        threading.Thread(target=send_async, daemon=True).start()
+        # Executar no event loop persistente (conexão HTTP reaproveitada entre mensagens)
+        self.openrouter_manager.submit(
+            self._stream_message_async(message, agent_type, model_id, cancel_event)).add_done_callback(on_done)
+    
+    async def _stream_message_async(self, message: str, agent_type: str, model_id: str,
+                                    cancel_event: threading.Event) -> Dict:
+        """Consome o stream do OpenRouter, repassando os pedaços para o chat"""
+        if not self.openrouter_manager:
+            return {"error": "OpenRouter Manager não inicializado"}
+        
+        try:
+            context_docs = self.rag_context if self.rag_system and self.rag_context else []
+            messages = [{"role": "user", "content": message}]
+            
+            result = {"error": "Stream encerrado sem resposta"}
+            async for event in self.openrouter_manager.stream_chat(
+                    model_id, messages, agent_type, context_docs, cancel_event=cancel_event):
+                if event["type"] == "delta":
+                    self._queue_stream_text(event["content"])
+                else:
+                    result = event
+            return result
+        
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def _queue_stream_text(self, text: str):
+        """Acumula texto recebido (thread do stream) e agenda uma única atualização do chat"""
+        with self._stream_lock:
+            self._stream_buffer.append(text)
+            if self._stream_flush_scheduled:
+                return
+            self._stream_flush_scheduled = True
+        # Agrupar pedaços que chegam juntos numa só inserção no Tk
+        self.root.after(30, self._flush_stream_text)
+    
+    def _flush_stream_text(self):
+        """Insere no chat o texto acumulado do stream (thread principal)"""
+        with self._stream_lock:
+            text = "".join(self._stream_buffer)
+            self._stream_buffer = []
+            self._stream_flush_scheduled = False
+        if text:
+            self.chat_text.insert(tk.END, text)
+            self.chat_text.see(tk.END)
     
-    def _handle_response(self, result, message, agent_type, model_id):
+    def _cancel_stream(self):
+        """Interrompe a resposta em streaming em andamento"""
+        if self._stream_cancel is not None:
+            self._stream_cancel.set()
+            self.status_label.config(text="Status: Cancelando...")
+    
+    def _handle_response(self, result, message, agent_type, model_id, streamed=False):
         """Processa resposta do agente"""
         self.status_label.config(text="Status: Pronto")
+        if streamed:
+            # Texto ainda no buffer entra antes da mensagem final
+            self._flush_stream_text()
+            self._stream_cancel = None
+            self.stop_button.config(state=tk.DISABLED)
+        
         if "error" in result:
             self.chat_text.insert(tk.END, f"\nErro: {result['error']}\n")
             self.log_text.insert(tk.END, f"Erro na resposta: {result['error']}\n")
         else:
             response = result.get("response", "")
-            self.chat_text.insert(tk.END, f"\nAgente: {response}\n")
+            if streamed:
+                self.chat_text.insert(tk.END, " [interrompido]\n" if result.get("cancelled") else "\n")
+                if result.get("ttft") is not None:
+                    self.log_text.insert(tk.END, f"Primeiro token em {result['ttft']:.2f}s "
+                                                 f"(total {result.get('elapsed', 0):.2f}s)\n")
+            else:
+                self.chat_text.insert(tk.END, f"\nAgente: {response}\n")
             
             # Salvar na memória
-            if self.openrouter_manager:
+            if self.openrouter_manager and response:
                 self.openrouter_manager.save_memory(message, response, agent_type, model_id, self.rag_context)
             
             # Responder por TTS se o switch estiver ativado
-            if hasattr(self, 'tts_response_var') and self.tts_response_var.get() and self.voice_module:
+            if hasattr(self, 'tts_response_var') and self.tts_response_var.get() and self.voice_module and response:
                 try:
                     self.log_text.insert(tk.END, "Reproduzindo resposta por voz...\n")
                     self.voice_module.speak(response)
                 except Exception as e:
                     self.log_text.insert(tk.END, f"Erro ao reproduzir resposta por voz: {e}\n")
             
-            self.log_text.insert(tk.END, f"Resposta recebida com sucesso\n")
+            if result.get("cancelled"):
+                self.log_text.insert(tk.END, "Resposta interrompida pelo usuário\n")
+            else:
+                self.log_text.insert(tk.END, f"Resposta recebida com sucesso\n")
         
         self.chat_text.see(tk.END)
         self.log_text.see(tk.END)
     
+    def _compare_models(self):
+        """Envia o prompt a vários modelos ao mesmo tempo e mostra as respostas conforme chegam"""
+        message = self.prompt_text.get(1.0, tk.END).strip()
+        if not message:
+            messagebox.showwarning("Aviso", "Digite uma mensagem")
+            return
+        
+        models = list(getattr(self, 'available_models', []))
+        if not self.openrouter_manager or not models:
+            messagebox.showwarning("Aviso", "Carregue os modelos OpenRouter primeiro")
+            return
+        
+        agent_type = self.current_agent_type.get()
+        
+        # Criar janela de comparação
+        compare_window = tk.Toplevel(self.root)
+        compare_window.title("Comparar Modelos")
+        compare_window.geometry("900x650")
+        
+        ttk.Label(compare_window, text="Selecione os modelos a comparar:").pack(anchor=tk.W, padx=10, pady=(10, 5))
+        models_list = tk.Listbox(compare_window, selectmode=tk.MULTIPLE, height=8, exportselection=False)
+        models_list.pack(fill=tk.X, padx=10)
+        for model in models:
+            models_list.insert(tk.END, f"{model.name} ({model.company}){' - gratuito' if model.is_free else ''}")
+        
+        results_text = scrolledtext.ScrolledText(compare_window, wrap=tk.WORD)
+        
+        def run_comparison():
+            selected = [models[index].id for index in models_list.curselection()]
+            if len(selected) < 2:
+                messagebox.showwarning("Aviso", "Selecione pelo menos dois modelos", parent=compare_window)
+                return
+            
+            results_text.delete(1.0, tk.END)
+            results_text.insert(tk.END, f"Enviando para {len(selected)} modelos em paralelo...\n")
+            context_docs = self.rag_context if self.rag_system and self.rag_context else []
+            messages = [{"role": "user", "content": message}]
+            
+            async def consume():
+                async for result in self.openrouter_manager.compare_models(selected, messages, agent_type, context_docs):
+                    self.root.after(0, lambda r=result: self._show_comparison_result(results_text, r))
+            
+            def on_done(future):
+                error = None if future.cancelled() else future.exception()
+                if error is not None:
+                    self.root.after(0, lambda: self._show_comparison_error(results_text, error))
+            
+            self.openrouter_manager.submit(consume()).add_done_callback(on_done)
+            self.log_text.insert(tk.END, f"Comparando {len(selected)} modelos\n")
+            self.log_text.see(tk.END)
+        
+        ttk.Button(compare_window, text="Comparar", command=run_comparison).pack(anchor=tk.W, padx=10, pady=5)
+        results_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+    
+    def _show_comparison_result(self, results_text, result):
+        """Acrescenta a resposta de um modelo à janela de comparação"""
+        usage = result.get("usage") or {}
+        cost = result.get("cost")
+        cost_text = "custo desconhecido" if cost is None else ("gratuito" if cost == 0 else f"US$ {cost:.6f}")
+        header = (f"\n=== {result['arrival']}º: {result['model']} | {result['latency']:.2f}s | "
+                  f"{usage.get('total_tokens', 0)} tokens | {cost_text} ===\n")
+        results_text.insert(tk.END, header)
+        if "error" in result:
+            results_text.insert(tk.END, f"Erro: {result['error']}\n")
+        else:
+            results_text.insert(tk.END, f"{result.get('response', '')}\n")
+        results_text.see(tk.END)
+    
+    def _show_comparison_error(self, results_text, error: BaseException):
+        """Informa na janela de comparação que a comparação foi interrompida"""
+        results_text.insert(tk.END, f"\nErro na comparação: {error}\n")
+        results_text.see(tk.END)
+        self.logger.error(f"Erro na comparação de modelos: {error}")
+    
     def _generate_prd(self):
         """Gera PRD baseado no prompt"""
         message = self.prompt_text.get(1.0, tk.END).strip()
@@ -1426,6 +1685,28 @@ Use "Buscar RAG" para incluir contexto da base de conhecimento.
         # Título
         ttk.Label(frame, text="Sistema RAG - Base de Conhecimento", font=("Arial", 14, "bold")).pack(anchor=tk.W, pady=5)
         
+        # Busca enquanto digita (Tab completa a palavra atual com a primeira sugestão)
+        search_frame = ttk.Frame(frame)
+        search_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(search_frame, text="Buscar:").pack(side=tk.LEFT, padx=5)
+        self.rag_search_var = tk.StringVar()
+        self.rag_search_entry = ttk.Entry(search_frame, textvariable=self.rag_search_var, width=60)
+        self.rag_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.rag_search_entry.bind("<KeyRelease>", self._on_rag_search_typed)
+        self.rag_search_entry.bind("<Return>", lambda event: self._search_rag_base())
+        self.rag_search_entry.bind("<Tab>", self._accept_rag_suggestion)
+        
+        self.rag_suggestions = []
+        self.rag_suggestions_var = tk.StringVar()
+        ttk.Label(search_frame, textvariable=self.rag_suggestions_var).pack(side=tk.LEFT, padx=5)
+        self._rag_search_job = None
+        # Consultas instantâneas rodam numa única thread de trabalho; a geração
+        # descarta resultados de consultas já superadas por novas teclas
+        self._rag_search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                                          thread_name_prefix="rag-live-search")
+        self._rag_search_generation = 0
+        
         # Frame para documentações
         docs_frame = ttk.LabelFrame(frame, text="Documentações Disponíveis")
         docs_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -1497,15 +1778,89 @@ Use "Buscar RAG" para incluir contexto da base de conhecimento.
                     messagebox.showerror("Erro", f"Erro ao adicionar URL: {e}")
 
     def _search_rag_base(self):
-        """Busca na base de conhecimento RAG"""
-        query = simpledialog.askstring("Buscar na Base", "Digite sua consulta:")
-        if query and self.rag_system:
+        """Busca na base de conhecimento RAG com a consulta do campo de busca"""
+        query = self.rag_search_var.get().strip()
+        if not query:
+            self.rag_search_entry.focus_set()
+            return
+        if self.rag_system:
             try:
                 results = self.rag_system.search_knowledge(query)
-                self.rag_view_text.delete(1.0, tk.END)
-                self.rag_view_text.insert(1.0, f"Resultados para: {query}\n\n{results}")
+                self._show_rag_results(query, results)
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro na busca: {e}")
+    
+    def _on_rag_search_typed(self, event=None):
+        """Agenda a busca instantânea (debounce de 150 ms entre teclas)"""
+        if event is not None and event.keysym in ("Return", "Tab", "Escape"):
+            return
+        if self._rag_search_job is not None:
+            self.root.after_cancel(self._rag_search_job)
+        self._rag_search_job = self.root.after(150, self._run_rag_live_search)
+    
+    def _run_rag_live_search(self):
+        """Sugestões para a palavra atual e resultados da consulta digitada (fora da thread do Tk)"""
+        self._rag_search_job = None
+        query = self.rag_search_var.get()
+        if not self.rag_system or not hasattr(self.rag_system, "complete"):
+            return
+        
+        self._rag_search_generation += 1
+        self._rag_search_executor.submit(self._rag_live_lookup, self._rag_search_generation, query)
+    
+    def _rag_live_lookup(self, generation: int, query: str):
+        """Consulta na thread de trabalho: complete() e a busca podem esperar o lock da ingestão"""
+        if generation != self._rag_search_generation:
+            # Já existe uma consulta mais nova na fila
+            return
+        
+        words = query.split()
+        typing_word = words[-1] if words and not query.endswith(" ") else ""
+        results = None
+        try:
+            suggestions = self.rag_system.complete(typing_word, limit=5) if typing_word else []
+            if query.strip():
+                results = self.rag_system.search_knowledge(query, limit=10)
+        except Exception as e:
+            self.logger.error(f"Erro na busca instantânea: {e}")
+            return
+        self.root.after(0, lambda: self._apply_rag_live_search(generation, query, suggestions, results))
+    
+    def _apply_rag_live_search(self, generation: int, query: str, suggestions: List[str],
+                               results: Optional[Dict[str, Any]]):
+        """Mostra o resultado na thread do Tk, se ainda for o da consulta atual"""
+        if generation != self._rag_search_generation:
+            return
+        self.rag_suggestions = suggestions
+        self.rag_suggestions_var.set(", ".join(suggestions))
+        if results is not None:
+            self._show_rag_results(query, results)
+    
+    def _accept_rag_suggestion(self, event=None):
+        """Substitui a palavra em digitação pela primeira sugestão"""
+        if not self.rag_suggestions:
+            return None
+        query = self.rag_search_var.get()
+        words = query.split()
+        if not words or query.endswith(" "):
+            return None
+        self.rag_search_var.set(" ".join(words[:-1] + [self.rag_suggestions[0]]) + " ")
+        self.rag_search_entry.icursor(tk.END)
+        self._on_rag_search_typed()
+        return "break"
+    
+    def _show_rag_results(self, query: str, results: Dict[str, Any]):
+        """Mostra os resultados da busca na área de visualização"""
+        self.rag_view_text.delete(1.0, tk.END)
+        if not results.get("success"):
+            self.rag_view_text.insert(1.0, f"Erro na busca: {results.get('error', 'Erro desconhecido')}")
+            return
+        
+        lines = [f"Resultados para: {query} ({results.get('total_found', 0)} encontrados)\n"]
+        for result in results.get("results", []):
+            lines.append(f"{result['title']} [{result['category']}] - relevância {result['relevance']}")
+            lines.append(f"    {result['snippet']}\n")
+        self.rag_view_text.insert(1.0, "\n".join(lines))
 
     def _on_model_selected(self, event=None):
         # Sincronizar o valor selecionado
@@ -1514,3 +1869,8 @@ Use "Buscar RAG" para incluir contexto da base de conhecimento.
     def run(self):
         """Executa a interface gráfica"""
         self.root.mainloop()
+        # Encerrar o event loop e as conexões do OpenRouter ao fechar a janela
+        if self.openrouter_manager and hasattr(self.openrouter_manager, "close"):
+            self.openrouter_manager.close()
+        if hasattr(self, "_rag_search_executor"):
+            self._rag_search_executor.shutdown(wait=False)
@@ -26,6 +26,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.advanced_rag_system import AdvancedRAGSystem
+from modules.rag_sync import DirectorySyncService
 
 logger = logging.getLogger("OPENROUTER_GUI")
 
@@ -36,6 +37,8 @@ class OpenRouterGUI:
         self.parent = parent
         self.window = None
         self.rag_system = AdvancedRAGSystem()
+        # Mantém data/docs (e as pastas configuradas) sincronizados com o índice
+        self.sync_service = DirectorySyncService(self.rag_system)
         
         # Cache de modelos
         self.all_models = []
@@ -71,6 +74,14 @@ class OpenRouterGUI:
         
         self._create_widgets()
         
+        self.sync_service.start()
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+    def _on_close(self):
+        """Para a sincronização de pastas e fecha a janela"""
+        self.sync_service.stop(timeout=5)
+        self.window.destroy()
+        
     def _create_widgets(self):
         """Cria widgets da interface"""
         # Frame principal
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do Pool de Conexões OpenRouter
+----------------------------------------
+Compara o custo por requisição de chat_with_model em dois modos, contra
+o servidor OpenRouter falso de tests/fake_openrouter.py:
+
+- antes: uma thread, um event loop e uma ClientSession novos por mensagem
+  (o que SuperAgentGUI._send_message fazia)
+- depois: OpenRouterManager.submit() no event loop persistente, com a
+  sessão keep-alive compartilhada
+
+O servidor local não tem TLS; `--handshake-ms` acrescenta uma pausa na
+primeira requisição de cada conexão para simular TCP + TLS de um host
+remoto (0 mede só o custo local de loop, sessão e conexão).
+
+Uso: python benchmarks/bench_openrouter_pool.py [--requests 50] [--handshake-ms 40]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.openrouter_manager import OpenRouterManager
+from tests.fake_openrouter import FakeOpenRouter
+
+MESSAGES = [{"role": "user", "content": "gere um workflow n8n"}]
+
+
+def per_message_loop(manager: OpenRouterManager, count: int) -> float:
+    """Modo antigo: thread + event loop + sessão novos a cada mensagem"""
+    started = time.perf_counter()
+    for _ in range(count):
+        result = {}
+
+        def send():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            result.update(loop.run_until_complete(manager.chat_with_model("fake/modelo", MESSAGES)))
+            loop.close()
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        thread.join()
+        assert result.get("success"), result
+    return time.perf_counter() - started
+
+
+def persistent_loop(manager: OpenRouterManager, count: int) -> float:
+    """Modo novo: submit() no loop persistente com sessão compartilhada"""
+    started = time.perf_counter()
+    for _ in range(count):
+        result = manager.submit(manager.chat_with_model("fake/modelo", MESSAGES)).result()
+        assert result.get("success"), result
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requisições, handshake simulado de {args.handshake_ms:.0f} ms")
+    for name, run in (("antes (loop por mensagem)", per_message_loop),
+                      ("depois (loop persistente)", persistent_loop)):
+        with FakeOpenRouter(handshake_delay=args.handshake_ms / 1000) as server:
+            manager = OpenRouterManager()
+            manager.api_key = "benchmark"
+            manager.base_url = server.url
+            # Aquecimento (imports, primeira conexão)
+            run(manager, 1)
+            elapsed = run(manager, args.requests)
+            manager.close()
+            print(f"{name:28s} {elapsed / args.requests * 1000:8.2f} ms/req  "
+                  f"{len(server.connections):4d} conexões TCP")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,14 +13,34 @@ Versão: 0.1.0
 """
 
 import os
+import re
 import json
 import logging
 import requests
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Iterator, Iterable, Tuple
 from pathlib import Path
 import hashlib
+import time
+import threading
+import multiprocessing
+
+from .rag_index import InvertedIndex
+from .rag_snapshot import write_snapshot, load_snapshot_index, SnapshotMapping, SNAPSHOT_AVAILABLE
+from .rag_filters import MetadataBitmaps
+from .rag_storage import KnowledgeBaseStore, write_atomic
+from .rag_chunker import Chunker
+from .rag_vectors import HashingEncoder, DenseVectorIndex, NUMPY_AVAILABLE
+from .rag_query_cache import QueryCache
+from .rag_tokenizer import Tokenizer, TOKENIZER_VERSION
+from .http_cache import HTTPCache
+from .doc_crawler import DocumentationCrawler, HREF_PATTERN
+from .prefix_index import PrefixIndex
+from .blob_store import BlobStore
+from .context_packer import ContextPacker
+from .sse_stream import SSEDecoder, StreamState
+from .rate_limiter import RateLimiter
 
 # Processamento de documentos
 try:
@@ -47,14 +67,6 @@ try:
 except ImportError:
     MARKDOWN_AVAILABLE = False
 
-try:
-    import nltk
-    from nltk.tokenize import word_tokenize, sent_tokenize
-    from nltk.corpus import stopwords
-    NLTK_AVAILABLE = True
-except ImportError:
-    NLTK_AVAILABLE = False
-
 try:
     import openai
     OPENAI_AVAILABLE = True
@@ -63,11 +75,16 @@ except ImportError:
 
 logger = logging.getLogger("ADVANCED_RAG")
 
+# Trechos entre aspas na consulta são buscados como frase exata
+QUERY_PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
 class DocumentProcessor:
     """Processador de diferentes tipos de documentos"""
     
-    def __init__(self):
+    def __init__(self, memory_budget: int = 1_000_000):
         self.logger = logger
+        # Máximo de caracteres mantidos em buffer pela extração em streaming
+        self.memory_budget = memory_budget
         self.supported_formats = {
             '.pdf': self._process_pdf,
             '.txt': self._process_text,
@@ -102,32 +119,77 @@ class DocumentProcessor:
                 "metadata": {}
             }
     
+    def iter_pdf_chunks(self, file_path: Path, memory_budget: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Extrai o PDF página a página, agrupando páginas em blocos de até `memory_budget` caracteres.
+        
+        Cada bloco traz o texto e o intervalo de páginas (page_start, page_end);
+        páginas maiores que o orçamento são fatiadas em vários blocos.
+        """
+        if not PDF_AVAILABLE:
+            raise RuntimeError("PyPDF2 não disponível")
+        
+        budget = max(1, memory_budget or self.memory_budget)
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            parts = []
+            size = 0
+            page_start = None
+            
+            for page_num, page in enumerate(pdf_reader.pages, 1):
+                text = f"\n--- Página {page_num} ---\n" + (page.extract_text() or "")
+                
+                if parts and size + len(text) > budget:
+                    yield {"text": "".join(parts), "page_start": page_start, "page_end": page_num - 1}
+                    parts, size, page_start = [], 0, None
+                
+                # Página sozinha já estoura o orçamento: fatiar
+                while len(text) > budget:
+                    yield {"text": text[:budget], "page_start": page_num, "page_end": page_num}
+                    text = text[budget:]
+                
+                if page_start is None:
+                    page_start = page_num
+                parts.append(text)
+                size += len(text)
+            
+            if parts:
+                yield {"text": "".join(parts), "page_start": page_start, "page_end": page_num}
+    
+    def read_pdf_metadata(self, file_path: Path) -> Dict[str, Any]:
+        """Lê apenas os metadados do PDF (sem extrair texto)"""
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            return {
+                "pages": len(pdf_reader.pages),
+                "title": str(getattr(pdf_reader.metadata, 'title', '') or ''),
+                "author": str(getattr(pdf_reader.metadata, 'author', '') or ''),
+                "format": "PDF"
+            }
+    
     def _process_pdf(self, file_path: Path) -> Dict[str, Any]:
         """Processa arquivo PDF"""
         if not PDF_AVAILABLE:
             return {"success": False, "error": "PyPDF2 não disponível"}
         
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                content = ""
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    content += f"\n--- Página {page_num + 1} ---\n"
-                    content += page.extract_text()
-                
-                metadata = {
-                    "pages": len(pdf_reader.pages),
-                    "title": getattr(pdf_reader.metadata, 'title', ''),
-                    "author": getattr(pdf_reader.metadata, 'author', ''),
-                    "format": "PDF"
-                }
-                
-                return {
-                    "success": True,
-                    "content": content,
-                    "metadata": metadata
-                }
+            parts = []
+            page_spans = []
+            offset = 0
+            
+            for chunk in self.iter_pdf_chunks(file_path):
+                parts.append(chunk["text"])
+                page_spans.append([chunk["page_start"], chunk["page_end"], offset, offset + len(chunk["text"])])
+                offset += len(chunk["text"])
+            
+            metadata = self.read_pdf_metadata(file_path)
+            metadata["page_spans"] = page_spans
+            
+            return {
+                "success": True,
+                "content": "".join(parts),
+                "metadata": metadata
+            }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -261,7 +323,21 @@ class OpenRouterClient:
         self.base_url = "https://openrouter.ai/api/v1"
         self.logger = logger
         self.models_cache = None
+        self._catalog_requested = False
+        # Mesmo limitador do OpenRouterManager quando a API key é a mesma
+        self.rate_limiter = RateLimiter.for_key(self.api_key)
         
+    def get_context_length(self, model_id: str) -> Optional[int]:
+        """context_length do modelo no catálogo da OpenRouter (None se desconhecido)"""
+        if self.models_cache is None and not self._catalog_requested:
+            # Uma única tentativa de baixar o catálogo
+            self._catalog_requested = True
+            self.get_models()
+        for model in (self.models_cache or {}).get("data", []):
+            if model.get("id") == model_id:
+                return model.get("context_length")
+        return None
+    
     def get_models(self) -> Dict[str, Any]:
         """Obtém lista de modelos disponíveis na OpenRouter"""
         try:
@@ -313,57 +389,134 @@ class OpenRouterClient:
             self.logger.error(f"Erro ao obter modelos OpenRouter: {e}")
             return {"success": False, "error": str(e)}
     
+    def _chat_request(self, model_id: str, prompt: str, context: str = "") -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Cabeçalhos e corpo da requisição de chat completions"""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://super-agent-mcp.local",
+            "X-Title": "SUPER_AGENT_MCP_DOCKER_N8N"
+        }
+        
+        messages = []
+        if context:
+            messages.append({
+                "role": "system",
+                "content": f"Contexto: {context}"
+            })
+        
+        messages.append({
+            "role": "user", 
+            "content": prompt
+        })
+        
+        data = {
+            "model": model_id,
+            "messages": messages,
+            "max_tokens": 2000,
+            "temperature": 0.7
+        }
+        return headers, data
+    
     def query_model(self, model_id: str, prompt: str, context: str = "") -> Dict[str, Any]:
         """Faz query para um modelo específico"""
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://super-agent-mcp.local",
-                "X-Title": "SUPER_AGENT_MCP_DOCKER_N8N"
-            }
-            
-            messages = []
-            if context:
-                messages.append({
-                    "role": "system",
-                    "content": f"Contexto: {context}"
-                })
+            headers, data = self._chat_request(model_id, prompt, context)
             
-            messages.append({
-                "role": "user", 
-                "content": prompt
-            })
+            for attempt in range(self.rate_limiter.max_retries + 1):
+                with self.rate_limiter.slot_sync(model_id):
+                    response = requests.post(
+                        f"{self.base_url}/chat/completions", 
+                        headers=headers, 
+                        json=data
+                    )
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    return {
+                        "success": True,
+                        "response": result.get("choices", [{}])[0].get("message", {}).get("content", ""),
+                        "model_used": model_id,
+                        "usage": result.get("usage", {}),
+                        "attempts": attempt + 1
+                    }
+                if not self.rate_limiter.should_retry(response.status_code, attempt):
+                    return {
+                        "success": False,
+                        "error": f"Erro {response.status_code}: {response.text}"
+                    }
+                time.sleep(self.rate_limiter.backoff(model_id, attempt, response.status_code,
+                                                     response.headers.get("Retry-After")))
+        except Exception as e:
+            self.logger.error(f"Erro ao consultar modelo {model_id}: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def query_model_stream(self, model_id: str, prompt: str, context: str = "",
+                           cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """Versão em streaming de query_model.
+        
+        Gera {"type": "delta", "content"} a cada pedaço da resposta e termina
+        com {"type": "done", "response", "usage", "ttft", ...} ou
+        {"type": "error", "error"}. `cancel_event` interrompe a leitura.
+        """
+        state = StreamState(model_id)
+        try:
+            headers, data = self._chat_request(model_id, prompt, context)
+            data["stream"] = True
             
-            data = {
-                "model": model_id,
-                "messages": messages,
-                "max_tokens": 2000,
-                "temperature": 0.7
-            }
+            for attempt in range(self.rate_limiter.max_retries + 1):
+                with self.rate_limiter.slot_sync(model_id):
+                    response = requests.post(f"{self.base_url}/chat/completions", headers=headers,
+                                             json=data, stream=True)
+                if response.status_code == 200 or not self.rate_limiter.should_retry(response.status_code, attempt):
+                    break
+                response.close()
+                time.sleep(self.rate_limiter.backoff(model_id, attempt, response.status_code,
+                                                     response.headers.get("Retry-After")))
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions", 
-                headers=headers, 
-                json=data
-            )
+            with response:
+                if response.status_code != 200:
+                    yield {"type": "error", "error": f"Erro {response.status_code}: {response.text}"}
+                    return
+                
+                decoder = SSEDecoder()
+                for chunk in response.iter_content(chunk_size=None):
+                    if cancel_event is not None and cancel_event.is_set():
+                        yield state.result(cancelled=True, model_used=model_id)
+                        return
+                    for payload in decoder.feed(chunk):
+                        event = state.parse(payload)
+                        if event["type"] == "error":
+                            yield event
+                            return
+                        if event["type"] == "delta":
+                            yield event
+                    if state.finished:
+                        break
+                for payload in decoder.close():
+                    event = state.parse(payload)
+                    if event["type"] != "skip":
+                        yield event
             
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    "success": True,
-                    "response": result.get("choices", [{}])[0].get("message", {}).get("content", ""),
-                    "model_used": model_id,
-                    "usage": result.get("usage", {})
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Erro {response.status_code}: {response.text}"
-                }
+            yield state.result(model_used=model_id)
         except Exception as e:
-            self.logger.error(f"Erro ao consultar modelo {model_id}: {e}")
-            return {"success": False, "error": str(e)}
+            self.logger.error(f"Erro no stream do modelo {model_id}: {e}")
+            yield {"type": "error", "error": str(e)}
+
+def _process_file_worker(file_path: str) -> Dict[str, Any]:
+    """Processa um arquivo dentro de um processo do pool de ingestão"""
+    processed = DocumentProcessor().process_file(Path(file_path))
+    # Devolver só o que é usado na indexação (menos dados para serializar entre processos)
+    return {
+        "success": processed.get("success", False),
+        "error": processed.get("error"),
+        "content": processed.get("content", ""),
+        # Listas e dicts (ex.: page_spans) seguem como estão, igual a add_document;
+        # outros objetos (ex.: NavigableString do título HTML) viram str
+        "metadata": {key: value if isinstance(value, (str, int, float, bool, list, dict)) or value is None
+                     else str(value)
+                     for key, value in processed.get("metadata", {}).items()}
+    }
 
 class AdvancedRAGSystem:
     """Sistema RAG avançado com documentações técnicas e OpenRouter"""
@@ -381,15 +534,59 @@ class AdvancedRAGSystem:
         # Inicializar componentes
         self.document_processor = DocumentProcessor()
         self.openrouter_client = OpenRouterClient()
+        self.chunker = Chunker()
+        self.tokenizer = Tokenizer()
         
         # Base de conhecimento
         self.knowledge_base = {
             "documents": {},
             "documentation_index": {},
+            "chunks": {},
             "url_cache": {},
+            "file_registry": {},
             "last_updated": None
         }
         
+        # Documentos de versões antigas (id pelo nome do arquivo) por caminho, para substituição
+        # (montado no primeiro registro de arquivo: None até lá)
+        self._legacy_files: Optional[Dict[str, List[str]]] = None
+        
+        # Índice invertido BM25 posicional de chunks, persistido como snapshot binário em
+        # data/index junto com a tabela de chunks (ou em knowledge_base["documentation_index"]
+        # e knowledge_base["chunks"] sem NumPy)
+        self.index = InvertedIndex()
+        self.snapshot_dir = self.data_dir / "index"
+        # Bônus máximo de proximidade entre os termos da consulta (0 desativa)
+        self.proximity_weight = 0.5
+        # Bitmaps de categoria/formato/fonte/data dos chunks (montados na primeira busca
+        # filtrada depois do load: None até lá)
+        self._filters: Optional[MetadataBitmaps] = MetadataBitmaps()
+        
+        # Autocompletar sobre o vocabulário do índice (reconstruído quando o índice muda)
+        self.prefix_index = PrefixIndex(normalize=self.tokenizer.normalize)
+        self._prefix_index_version = None
+        
+        # Persistência incremental (checkpoint + journal append-only)
+        self.store = KnowledgeBaseStore(self.data_dir)
+        
+        # Conteúdo dos documentos fora da RAM (blocos comprimidos lidos via mmap)
+        self.blob_store = BlobStore(self.data_dir / "content.blob")
+        
+        # Cache de buscas, invalidado pelos termos dos documentos alterados
+        self.query_cache = QueryCache()
+        
+        # Contexto de query_with_context dentro do orçamento de tokens do modelo
+        self.context_packer = ContextPacker()
+        self.context_candidates = 40
+        
+        # Cache HTTP em disco (corpos + ETag/Last-Modified) para add_url_content
+        self.http_cache = HTTPCache(self.data_dir / "cache" / "http")
+        
+        # Índice vetorial local para busca semântica (requer NumPy), aberto no primeiro uso
+        self.encoder = HashingEncoder()
+        self.vector_dir = self.data_dir / "vectors"
+        self._vector_index: Optional[DenseVectorIndex] = None
+        
         # Documentações técnicas pré-configuradas
         self.tech_docs = {
             "git": {
@@ -437,28 +634,268 @@ class AdvancedRAGSystem:
         self._load_knowledge_base()
     
     def _load_knowledge_base(self):
-        """Carrega base de conhecimento do arquivo"""
-        kb_file = self.data_dir / "knowledge_base.json"
+        """Carrega base de conhecimento do checkpoint e reaplica o journal"""
+        try:
+            checkpoint, records = self.store.load()
+            
+            if checkpoint is not None:
+                self.knowledge_base = checkpoint
+            migrated = self._migrate_inline_content(self.knowledge_base.get("documents", {}).values())
+            self._load_index()
+            
+            for record in records:
+                if record.get("op") == "put_document":
+                    migrated += self._migrate_inline_content([record["document"]])
+                self._apply_journal_record(record)
+            
+            self._sync_vector_index()
+            self._legacy_files = None
+            
+            if migrated:
+                # Regravar a base sem o conteúdo embutido
+                self._save_knowledge_base()
+                self.logger.info(f"Conteúdo de {migrated} documentos movido para o blob store")
+            
+            if checkpoint is not None or records:
+                self.logger.info(f"Base de conhecimento carregada ({len(records)} operações do journal)")
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar base de conhecimento: {e}")
+    
+    def _apply_journal_record(self, record: Dict[str, Any]):
+        """Reaplica uma operação do journal (operações são idempotentes)"""
+        op = record.get("op")
+        
+        if op == "put_document":
+            doc = record["document"]
+            self._remove_from_index(doc["id"])
+            self.knowledge_base["documents"][doc["id"]] = doc
+            self._update_documentation_index(doc["id"], self._document_text(doc), doc.get("category", "general"))
+        elif op == "delete_document":
+            self._remove_from_index(record["doc_id"])
+            self.knowledge_base["documents"].pop(record["doc_id"], None)
+        elif op == "put_url_cache":
+            self.knowledge_base.setdefault("url_cache", {})[record["key"]] = record["value"]
+        elif op == "put_file_entry":
+            self.knowledge_base.setdefault("file_registry", {})[record["key"]] = record["value"]
+        elif op == "delete_file_entry":
+            self.knowledge_base.setdefault("file_registry", {}).pop(record["key"], None)
+        else:
+            self.logger.warning(f"Operação desconhecida no journal: {op}")
+    
+    def _collect_legacy_files(self) -> Dict[str, List[str]]:
+        """Agrupa por caminho os documentos de arquivo que não estão no registro.
+        
+        Montado uma vez, no primeiro registro de arquivo, e depois mantido
+        por _register_file. Documentos novos sempre entram no registro: uma
+        base sem documentos legados fica marcada e não é varrida de novo.
+        """
+        if self._legacy_files is not None:
+            return self._legacy_files
+        self._legacy_files = {}
+        if self.knowledge_base.get("legacy_files_resolved"):
+            return self._legacy_files
         
-        if kb_file.exists():
+        referenced = {entry["doc_id"] for entry in self.knowledge_base.get("file_registry", {}).values()}
+        for doc_id, doc in self.knowledge_base.get("documents", {}).items():
+            if doc.get("filepath") and doc_id not in referenced:
+                key = str(Path(doc["filepath"]).resolve())
+                self._legacy_files.setdefault(key, []).append(doc_id)
+        if not self._legacy_files:
+            self.knowledge_base["legacy_files_resolved"] = True
+        return self._legacy_files
+    
+    def _load_index(self):
+        """Carrega o índice BM25 salvo ou reconstrói a partir dos documentos"""
+        saved_index = self.knowledge_base.get("documentation_index")
+        snapshot_name = self.knowledge_base.get("index_snapshot")
+        compatible = self.knowledge_base.get("tokenizer_version") == TOKENIZER_VERSION
+        
+        if compatible and snapshot_name and SNAPSHOT_AVAILABLE:
             try:
-                with open(kb_file, 'r', encoding='utf-8') as f:
-                    self.knowledge_base = json.load(f)
-                self.logger.info("Base de conhecimento carregada")
-            except Exception as e:
-                self.logger.error(f"Erro ao carregar base de conhecimento: {e}")
+                # Só o cabeçalho é lido: termos, documentos e chunks são paginados sob demanda
+                index = load_snapshot_index(self.snapshot_dir / snapshot_name)
+                if "chunks" not in self.knowledge_base:
+                    chunks = index.chunk_table()
+                    if chunks is None:
+                        raise ValueError("snapshot sem tabela de chunks")
+                    self.knowledge_base["chunks"] = chunks
+                self.index = index
+                self._filters = None
+                self._remove_stale_snapshots({snapshot_name})
+                return
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Snapshot do índice inválido ({e}), reconstruindo")
+        elif (compatible and "chunks" in self.knowledge_base
+              and InvertedIndex.is_serialized_index(saved_index)):
+            self.index = InvertedIndex.from_dict(saved_index)
+            self._filters = None
+            return
+        
+        # Índice legado (por documento inteiro, sem frequências ou de outro tokenizador): reindexar
+        self.index = InvertedIndex()
+        self._filters = MetadataBitmaps()
+        self.knowledge_base["chunks"] = {}
+        for doc_id, doc in self.knowledge_base.get("documents", {}).items():
+            self._update_documentation_index(doc_id, self._document_text(doc), doc.get("category", "general"))
+        self.logger.info(f"Índice BM25 reconstruído para {len(self.index)} chunks")
     
-    def _save_knowledge_base(self):
-        """Salva base de conhecimento no arquivo"""
-        kb_file = self.data_dir / "knowledge_base.json"
+    @property
+    def vector_index(self) -> Optional[DenseVectorIndex]:
+        """Índice vetorial (None sem NumPy); abrir lê o journal de linhas, então só no primeiro uso"""
+        if self._vector_index is None and NUMPY_AVAILABLE:
+            self._vector_index = DenseVectorIndex(self.vector_dir, dim=self.encoder.dim)
+        return self._vector_index
+    
+    def _sync_vector_index(self):
+        """Gera vetores para chunks que ainda não estão no índice vetorial.
+        
+        Chunks e vetores entram e saem juntos: com as mesmas contagens o
+        índice já está em dia e nem a tabela de chunks nem o índice
+        vetorial (se ainda não foi aberto) são percorridos.
+        """
+        if not NUMPY_AVAILABLE:
+            return
+        
+        chunks = self.knowledge_base.get("chunks", {})
+        if self._vector_index is None and DenseVectorIndex.stored_size(self.vector_dir) == len(chunks):
+            return
+        if len(self.vector_index) == len(chunks):
+            return
+        
+        stale = [chunk_id for chunk_id in list(self.vector_index.id_rows) if chunk_id not in chunks]
+        if stale:
+            self.vector_index.remove(stale)
+        missing = [chunk_id for chunk_id in chunks if chunk_id not in self.vector_index]
+        if not missing:
+            self.vector_index.save()
+            return
+        
+        keywords = self.tokenizer.tokenize_batch([self._chunk_text(chunk_id) for chunk_id in missing])
+        self.vector_index.add(missing, self.encoder.encode(keywords))
+        self.vector_index.save()
+        self.logger.info(f"Índice vetorial atualizado com {len(missing)} chunks")
+    
+    def _serialize_knowledge_base(self) -> str:
+        """Serializa a base inteira (chamado com o lock do store adquirido)"""
+        data = self.knowledge_base
+        if SNAPSHOT_AVAILABLE:
+            self._write_index_snapshot()
+            # A tabela de chunks vai no snapshot
+            data = {key: value for key, value in self.knowledge_base.items() if key != "chunks"}
+        else:
+            self.knowledge_base["documentation_index"] = self.index.to_dict()
+        data["tokenizer_version"] = self.knowledge_base["tokenizer_version"] = TOKENIZER_VERSION
+        data["last_updated"] = self.knowledge_base["last_updated"] = datetime.now().isoformat()
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    
+    def _write_index_snapshot(self):
+        """Grava o índice e a tabela de chunks num novo snapshot binário e passa a usá-lo.
+        
+        Cada checkpoint usa um arquivo novo: o checkpoint anterior continua
+        apontando para um snapshot íntegro até ser substituído.
+        """
+        previous = self.knowledge_base.get("index_snapshot")
+        name = f"index_{time.time_ns()}.snap"
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        write_snapshot(self.snapshot_dir / name, self.index, self.knowledge_base.get("chunks", {}))
         
+        # Reabrir a partir do snapshot descarta os postings e chunks materializados em memória
+        index = load_snapshot_index(self.snapshot_dir / name)
+        index.version = self.index.version
+        self.index = index
+        self.knowledge_base["chunks"] = index.chunk_table()
+        
+        self.knowledge_base.pop("documentation_index", None)
+        self.knowledge_base["index_snapshot"] = name
+        self._remove_stale_snapshots({name, previous})
+    
+    def _remove_stale_snapshots(self, keep: set):
+        """Apaga snapshots que nenhum checkpoint referencia"""
+        if not self.snapshot_dir.exists():
+            return
+        for path in self.snapshot_dir.glob("index_*.snap"):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    # Ainda mapeado (Windows): removido numa próxima vez
+                    pass
+    
+    def _save_knowledge_base(self):
+        """Grava checkpoint completo da base de conhecimento"""
         try:
-            with open(kb_file, 'w', encoding='utf-8') as f:
-                json.dump(self.knowledge_base, f, indent=2, ensure_ascii=False)
+            self.blob_store.flush()
+            self.store.checkpoint(self._serialize_knowledge_base)
             self.logger.info("Base de conhecimento salva")
         except Exception as e:
             self.logger.error(f"Erro ao salvar base de conhecimento: {e}")
     
+    def export_knowledge_base(self, output_file: Union[str, Path]) -> Dict[str, Any]:
+        """Exporta a base inteira (conteúdo e índice incluídos) num único JSON portável"""
+        try:
+            with self.store.lock:
+                data = {key: value for key, value in self.knowledge_base.items() if key != "index_snapshot"}
+                chunks = self.knowledge_base.get("chunks", {})
+                data["chunks"] = chunks.to_dict() if isinstance(chunks, SnapshotMapping) else chunks
+                data["documents"] = {}
+                for doc_id, doc in self.knowledge_base.get("documents", {}).items():
+                    exported = {key: value for key, value in doc.items() if key != "content_ref"}
+                    exported["content"] = self._document_text(doc)
+                    data["documents"][doc_id] = exported
+                data["documentation_index"] = self.index.to_dict()
+                data["tokenizer_version"] = TOKENIZER_VERSION
+                payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+            
+            write_atomic(Path(output_file), payload)
+            self.logger.info(f"Base de conhecimento exportada para {output_file}")
+            return {"success": True, "file": str(output_file), "documents": len(data["documents"])}
+        except Exception as e:
+            self.logger.error(f"Erro ao exportar base de conhecimento: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def import_knowledge_base(self, input_file: Union[str, Path]) -> Dict[str, Any]:
+        """Substitui a base pelo JSON de export_knowledge_base (ou um knowledge_base.json antigo)"""
+        try:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            with self.store.lock:
+                data.pop("index_snapshot", None)
+                for key in ("documents", "chunks", "url_cache", "file_registry"):
+                    data.setdefault(key, {})
+                self.knowledge_base = data
+                self._migrate_inline_content(data["documents"].values())
+                self._load_index()
+                self.knowledge_base.pop("documentation_index", None)
+                self._legacy_files = None
+                self.query_cache.invalidate_all()
+                if self.vector_index is not None:
+                    stale = [chunk_id for chunk_id in list(self.vector_index.id_rows) if chunk_id not in data["chunks"]]
+                    if stale:
+                        self.vector_index.remove(stale)
+            
+            self._sync_vector_index()
+            self._save_knowledge_base()
+            self.logger.info(f"Base de conhecimento importada de {input_file}")
+            return {"success": True, "documents": len(data["documents"])}
+        except Exception as e:
+            self.logger.error(f"Erro ao importar base de conhecimento: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def _persist(self, records: List[Dict[str, Any]]):
+        """Acrescenta operações ao journal e compacta em segundo plano se necessário"""
+        try:
+            # Blocos de conteúdo em disco antes das operações que os referenciam
+            self.blob_store.flush()
+            self.store.append(records)
+            if self.vector_index is not None:
+                # Metadados dos vetores gravados sob o lock: count coerente com as linhas já escritas
+                with self.store.lock:
+                    self.vector_index.save()
+            self.store.maybe_compact(self._serialize_knowledge_base)
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar base de conhecimento: {e}")
+    
     def add_document(self, file_path: Union[str, Path], category: str = "general") -> Dict[str, Any]:
         """Adiciona documento à base de conhecimento"""
         try:
@@ -467,33 +904,34 @@ class AdvancedRAGSystem:
             if not file_path.exists():
                 return {"success": False, "error": "Arquivo não encontrado"}
             
+            # Arquivo inalterado ou conteúdo já indexado: nada a reprocessar
+            check = self._check_file(file_path, category)
+            reused = self._reuse_existing(file_path, check)
+            if reused is not None:
+                return reused
+            
+            # PDFs são extraídos e indexados em streaming, bloco a bloco
+            if file_path.suffix.lower() == ".pdf" and PDF_AVAILABLE:
+                return self._add_pdf_streaming(file_path, category, check)
+            
             # Processar documento
             processed = self.document_processor.process_file(file_path)
             
             if not processed["success"]:
                 return processed
             
-            # Gerar ID único
-            file_hash = hashlib.md5(file_path.name.encode()).hexdigest()[:8]
-            doc_id = f"{category}_{file_hash}_{int(datetime.now().timestamp())}"
+            document = self._build_file_document(file_path, processed, category, check["entry"])
+            doc_id = document["id"]
+            self._store_content(document, processed["content"])
             
-            # Adicionar à base de conhecimento
-            self.knowledge_base["documents"][doc_id] = {
-                "id": doc_id,
-                "filename": file_path.name,
-                "filepath": str(file_path),
-                "category": category,
-                "content": processed["content"],
-                "metadata": processed["metadata"],
-                "added_at": datetime.now().isoformat(),
-                "hash": file_hash
-            }
+            # Adicionar à base de conhecimento, atualizar índice e substituir a versão anterior
+            with self.store.lock:
+                self.knowledge_base["documents"][doc_id] = document
+                self._update_documentation_index(doc_id, processed["content"], category)
+                records = self._register_file(check, document)
             
-            # Atualizar índice
-            self._update_documentation_index(doc_id, processed["content"], category)
-            
-            # Salvar
-            self._save_knowledge_base()
+            # Salvar apenas as alterações
+            self._persist(records)
             
             return {
                 "success": True,
@@ -505,66 +943,430 @@ class AdvancedRAGSystem:
             self.logger.error(f"Erro ao adicionar documento: {e}")
             return {"success": False, "error": str(e)}
     
-    def add_url_content(self, url: str, category: str = "web") -> Dict[str, Any]:
-        """Adiciona conteúdo de URL à base de conhecimento"""
+    def _add_pdf_streaming(self, file_path: Path, category: str, check: Dict[str, Any]) -> Dict[str, Any]:
+        """Indexa um PDF incrementalmente a partir de iter_pdf_chunks"""
+        document = self._build_file_document(file_path, {"metadata": {}}, category, check["entry"])
+        doc_id = document["id"]
+        
+        # O texto vai direto para o blob store, sem acumular o PDF inteiro em memória
+        writer = self.blob_store.writer()
+        page_spans = []
+        offset = 0
+        chunk_count = 0
+        
         try:
-            # Verificar cache
-            url_hash = hashlib.md5(url.encode()).hexdigest()
+            for block in self.document_processor.iter_pdf_chunks(file_path):
+                text = block["text"]
+                # Texto antes do primeiro marcador continua a página em que o bloco começa
+                chunks = self.chunker.chunk(text, {"format": "PDF"}, base_offset=offset, page=block["page_start"])
+                with self.store.lock:
+                    chunk_count += len(self._index_chunks(doc_id, text, chunks, chunk_count, text_offset=offset))
+                
+                writer.write(text)
+                page_spans.append([block["page_start"], block["page_end"], offset, offset + len(text)])
+                offset += len(text)
             
-            if url_hash in self.knowledge_base.get("url_cache", {}):
-                cached = self.knowledge_base["url_cache"][url_hash]
-                # Verificar se cache ainda é válido (24 horas)
-                cache_time = datetime.fromisoformat(cached["cached_at"])
-                if (datetime.now() - cache_time).hours < 24:
-                    return {"success": True, "message": "Conteúdo já em cache", "cached": True}
+            metadata = self.document_processor.read_pdf_metadata(file_path)
+        except Exception as e:
+            # Descartar os chunks já indexados
+            with self.store.lock:
+                self._remove_from_index(doc_id, chunk_count)
+            self.logger.error(f"Erro ao processar PDF {file_path}: {e}")
+            return {"success": False, "error": str(e)}
+        
+        metadata["page_spans"] = page_spans
+        document["content_ref"] = writer.close()
+        document["metadata"] = metadata
+        document["chunk_count"] = chunk_count
+        
+        with self.store.lock:
+            self.knowledge_base["documents"][doc_id] = document
+            self._update_filters(document, (f"{doc_id}#{number}" for number in range(chunk_count)))
+            records = self._register_file(check, document)
+        
+        self._persist(records)
+        
+        return {
+            "success": True,
+            "document_id": doc_id,
+            "message": f"Documento {file_path.name} adicionado com sucesso"
+        }
+    
+    def _build_file_document(self, file_path: Path, processed: Dict[str, Any], category: str,
+                             entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta o registro de documento a partir do resultado do DocumentProcessor"""
+        return {
+            "id": entry["doc_id"],
+            "filename": file_path.name,
+            "filepath": str(file_path),
+            "category": category,
+            "metadata": processed["metadata"],
+            "added_at": datetime.now().isoformat(),
+            "hash": entry["sha256"]
+        }
+    
+    def _store_content(self, document: Dict[str, Any], content: str):
+        """Grava o conteúdo no blob store; o registro do documento guarda só a referência"""
+        document.pop("content", None)
+        document["content_ref"] = self.blob_store.put(content)
+    
+    def _migrate_inline_content(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Move para o blob store o conteúdo embutido de documentos de versões anteriores"""
+        migrated = 0
+        for doc in documents:
+            if "content" in doc:
+                self._store_content(doc, doc["content"] or "")
+                migrated += 1
+        return migrated
+    
+    def _document_text(self, doc: Dict[str, Any], start: int = 0, end: Optional[int] = None) -> str:
+        """Conteúdo (ou o trecho [start:end]) de um documento, lido sob demanda"""
+        ref = doc.get("content_ref")
+        if ref is not None:
+            return self.blob_store.read(ref, start, end)
+        return doc.get("content", "")[start:end]
+    
+    @staticmethod
+    def _hash_file(file_path: Path, block_size: int = 1 << 20) -> str:
+        """SHA-256 do conteúdo do arquivo, lido em blocos"""
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(block_size), b''):
+                sha.update(block)
+        return sha.hexdigest()
+    
+    def _check_file(self, file_path: Path, category: str) -> Dict[str, Any]:
+        """Compara o arquivo com o registro de arquivos já ingeridos.
+        
+        Tamanho e mtime iguais aos registrados dispensam a leitura do
+        arquivo; caso contrário o SHA-256 do conteúdo define o id do
+        documento (`<categoria>_<sha256[:16]>`).
+        """
+        key = str(file_path.resolve())
+        stat = file_path.stat()
+        previous = self.knowledge_base.setdefault("file_registry", {}).get(key)
+        fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "category": category}
+        
+        if previous is not None and all(previous.get(name) == value for name, value in fingerprint.items()):
+            return {"status": "unchanged", "key": key, "entry": previous, "previous": previous}
+        
+        sha256 = self._hash_file(file_path)
+        entry = dict(fingerprint, sha256=sha256, doc_id=f"{category}_{sha256[:16]}")
+        
+        if previous is None:
+            status = "new"
+        elif previous.get("doc_id") == entry["doc_id"]:
+            status = "touched"
+        else:
+            status = "changed"
+        return {"status": status, "key": key, "entry": entry, "previous": previous}
+    
+    def _reuse_existing(self, file_path: Path, check: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Resolve sem reprocessar quando o conteúdo já está indexado (None caso contrário)"""
+        doc_id = check["entry"]["doc_id"]
+        if doc_id not in self.knowledge_base["documents"]:
+            return None
+        
+        if check["status"] != "unchanged":
+            # mtime alterado ou mesmo conteúdo em outro caminho: só atualizar o registro
+            with self.store.lock:
+                records = self._register_file(check)
+            self._persist(records)
+        
+        return {
+            "success": True,
+            "document_id": doc_id,
+            "skipped": True,
+            "message": f"Documento {file_path.name} sem alterações"
+        }
+    
+    def _register_file(self, check: Dict[str, Any], document: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Registra a versão atual do arquivo e remove as versões anteriores.
+        
+        Chamado com o lock do store adquirido e com `document` (se houver)
+        já indexado; devolve as operações a gravar no journal.
+        """
+        records = []
+        if document is not None:
+            records.append({"op": "put_document", "document": document})
+        
+        key = check["key"]
+        registry = self.knowledge_base.setdefault("file_registry", {})
+        registry[key] = check["entry"]
+        records.append({"op": "put_file_entry", "key": key, "value": check["entry"]})
+        
+        legacy_files = self._collect_legacy_files()
+        stale = legacy_files.pop(key, [])
+        if not legacy_files:
+            self.knowledge_base["legacy_files_resolved"] = True
+        if check["previous"] is not None:
+            stale.append(check["previous"]["doc_id"])
+        
+        documents = self.knowledge_base["documents"]
+        stale = [doc_id for doc_id in stale if doc_id != check["entry"]["doc_id"] and doc_id in documents]
+        if stale:
+            # Outro caminho com o mesmo conteúdo ainda usa o documento
+            referenced = {entry["doc_id"] for entry in registry.values()}
+            for doc_id in stale:
+                if doc_id in referenced:
+                    continue
+                self._remove_from_index(doc_id)
+                del documents[doc_id]
+                records.append({"op": "delete_document", "doc_id": doc_id})
+        
+        return records
+    
+    def add_documents(self, file_paths: List[Union[str, Path]], category: str = "general",
+                      workers: Optional[int] = None, timeout: float = 120.0) -> Dict[str, Any]:
+        """Adiciona vários documentos de uma vez, processando em paralelo.
+        
+        O parsing roda num pool de processos com `timeout` segundos por
+        arquivo; os resultados são indexados numa única passada e gravados
+        no journal com uma única escrita no final.
+        """
+        started = time.perf_counter()
+        paths = [Path(p) for p in file_paths]
+        failed = []
+        skipped = []
+        
+        # Arquivos inalterados são descartados antes do pool (stat, sem leitura)
+        existing = []
+        checks = {}
+        for path in paths:
+            if not path.exists():
+                failed.append({"file": str(path), "error": "Arquivo não encontrado"})
+                continue
+            check = self._check_file(path, category)
+            if check["status"] == "unchanged" and check["entry"]["doc_id"] in self.knowledge_base["documents"]:
+                skipped.append({"file": str(path), "document_id": check["entry"]["doc_id"]})
+                continue
+            checks[path] = check
+            existing.append(path)
+        
+        workers = max(1, min(workers or os.cpu_count() or 1, len(existing) or 1))
+        processed_files = []
+        
+        if workers == 1:
+            for path in existing:
+                processed_files.append((path, _process_file_worker(str(path))))
+        else:
+            pool = multiprocessing.Pool(processes=workers)
+            timed_out = False
+            try:
+                pending = [(path, pool.apply_async(_process_file_worker, (str(path),))) for path in existing]
+                for path, async_result in pending:
+                    try:
+                        processed_files.append((path, async_result.get(timeout=timeout)))
+                    except multiprocessing.TimeoutError:
+                        timed_out = True
+                        failed.append({"file": str(path), "error": f"Tempo limite de {timeout}s excedido"})
+                    except Exception as e:
+                        failed.append({"file": str(path), "error": str(e)})
+            finally:
+                # Um PDF travado prenderia o pool: encerrar os processos em vez de esperar
+                if timed_out:
+                    pool.terminate()
+                else:
+                    pool.close()
+                pool.join()
+        
+        # Indexar tudo numa única passada
+        added = []
+        records = []
+        with self.store.lock:
+            for path, processed in processed_files:
+                if not processed["success"]:
+                    failed.append({"file": str(path), "error": processed.get("error")})
+                    continue
+                
+                check = checks[path]
+                if check["entry"]["doc_id"] in self.knowledge_base["documents"]:
+                    # Conteúdo já indexado (nesta ou em ingestão anterior)
+                    records.extend(self._register_file(check))
+                    skipped.append({"file": str(path), "document_id": check["entry"]["doc_id"]})
+                    continue
+                
+                document = self._build_file_document(path, processed, category, check["entry"])
+                self._store_content(document, processed["content"])
+                self.knowledge_base["documents"][document["id"]] = document
+                self._update_documentation_index(document["id"], processed["content"], category)
+                records.extend(self._register_file(check, document))
+                added.append({"file": str(path), "document_id": document["id"]})
+        
+        # Persistir uma vez no final
+        if records:
+            self._persist(records)
+        
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"Ingestão em lote: {len(added)} adicionados, {len(skipped)} inalterados, "
+                         f"{len(failed)} falhas em {elapsed:.2f}s")
+        
+        return {
+            "success": not failed,
+            "added": added,
+            "skipped": skipped,
+            "failed": failed,
+            "workers": workers,
+            "elapsed": elapsed,
+            "message": f"{len(added)} de {len(paths)} documentos adicionados"
+        }
+    
+    def remove_file(self, file_path: Union[str, Path]) -> Dict[str, Any]:
+        """Remove da base o documento de um arquivo ingerido"""
+        return self.remove_files([file_path])
+    
+    def remove_files(self, file_paths: List[Union[str, Path]]) -> Dict[str, Any]:
+        """Remove vários arquivos do registro e do índice com uma única gravação.
+        
+        O documento só sai da base quando nenhum outro caminho registrado
+        tem o mesmo conteúdo.
+        """
+        removed = []
+        missing = []
+        records = []
+        
+        with self.store.lock:
+            registry = self.knowledge_base.setdefault("file_registry", {})
+            documents = self.knowledge_base["documents"]
             
-            # Baixar conteúdo
+            stale = set()
+            for file_path in file_paths:
+                key = str(Path(file_path).resolve())
+                entry = registry.pop(key, None)
+                if entry is None:
+                    missing.append(str(file_path))
+                    continue
+                records.append({"op": "delete_file_entry", "key": key})
+                removed.append({"file": str(file_path), "document_id": entry["doc_id"]})
+                stale.add(entry["doc_id"])
+            
+            if stale:
+                referenced = {entry["doc_id"] for entry in registry.values()}
+                for doc_id in stale - referenced:
+                    if doc_id not in documents:
+                        continue
+                    self._remove_from_index(doc_id)
+                    del documents[doc_id]
+                    records.append({"op": "delete_document", "doc_id": doc_id})
+        
+        if records:
+            self._persist(records)
+        
+        return {
+            "success": not missing,
+            "removed": removed,
+            "missing": missing,
+            "message": f"{len(removed)} de {len(file_paths)} arquivos removidos"
+        }
+    
+    def tracked_files(self, directory: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+        """Entradas do registro de arquivos que estão dentro de `directory`"""
+        prefix = os.path.join(str(Path(directory).resolve()), "")
+        with self.store.lock:
+            return {key: dict(entry) for key, entry in self.knowledge_base.get("file_registry", {}).items()
+                    if key.startswith(prefix)}
+    
+    def add_url_content(self, url: str, category: str = "web",
+                        max_age: Optional[float] = 24 * 3600) -> Dict[str, Any]:
+        """Adiciona conteúdo de URL à base de conhecimento.
+        
+        A URL passa pelo cache HTTP: dentro de `max_age` segundos desde a
+        última validação não há requisição; depois disso a requisição é
+        condicional e um 304 (ou corpo idêntico) não reprocessa nem
+        reindexa o documento.
+        """
+        try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Processar HTML
-            if BS4_AVAILABLE:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                content = soup.get_text()
-                title = soup.title.string if soup.title else url
-            else:
-                content = response.text
-                title = url
+            fetched = self.http_cache.fetch(url, headers=headers, timeout=10, max_age=max_age)
+            return self.add_fetched_content(url, fetched, category)
             
-            # Gerar ID
+        except Exception as e:
+            self.logger.error(f"Erro ao adicionar URL {url}: {e}")
+            return {"success": False, "error": str(e)}
+    
+    @staticmethod
+    def parse_fetched_page(url: str, fetched: Dict[str, Any]) -> Dict[str, Any]:
+        """Decodifica e interpreta o HTML uma única vez: texto, título e hrefs dos links"""
+        text = fetched["body"].decode(fetched["encoding"], errors="replace")
+        
+        if BS4_AVAILABLE:
+            soup = BeautifulSoup(text, 'html.parser')
+            hrefs = [a.get("href") for a in soup.find_all("a", href=True)]
+            return {
+                "content": soup.get_text(separator=" "),
+                "title": soup.title.string if soup.title and soup.title.string else url,
+                "hrefs": hrefs
+            }
+        return {"content": text, "title": url, "hrefs": HREF_PATTERN.findall(text)}
+    
+    def add_fetched_content(self, url: str, fetched: Dict[str, Any], category: str = "web",
+                            page: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Indexa uma página já baixada (resultado de HTTPCache.fetch/store).
+        
+        Páginas inalteradas que já estão na base não são reprocessadas.
+        `page` é o resultado de parse_fetched_page, quando o chamador (ex.:
+        o crawler, que também precisa dos links) já interpretou o HTML.
+        """
+        try:
+            url_hash = hashlib.md5(url.encode()).hexdigest()
             doc_id = f"{category}_url_{url_hash}"
             
-            # Adicionar à base
-            self.knowledge_base["documents"][doc_id] = {
+            if not fetched["changed"] and doc_id in self.knowledge_base["documents"]:
+                return {
+                    "success": True,
+                    "document_id": doc_id,
+                    "cached": True,
+                    "status": fetched["status"],
+                    "message": "Conteúdo não modificado"
+                }
+            
+            if page is None:
+                page = self.parse_fetched_page(url, fetched)
+            content = page["content"]
+            title = page["title"]
+            
+            document = {
                 "id": doc_id,
                 "url": url,
                 "title": title,
                 "category": category,
-                "content": content,
                 "metadata": {"format": "URL", "length": len(content)},
                 "added_at": datetime.now().isoformat()
             }
+            self._store_content(document, content)
             
-            # Cache URL
-            self.knowledge_base["url_cache"][url_hash] = {
+            url_cache_entry = {
                 "url": url,
                 "doc_id": doc_id,
-                "cached_at": datetime.now().isoformat()
+                "category": category,
+                "cached_at": datetime.now().isoformat(),
+                "etag": fetched["entry"].get("etag"),
+                "last_modified": fetched["entry"].get("last_modified")
             }
             
-            # Atualizar índice
-            self._update_documentation_index(doc_id, content, category)
+            # Adicionar à base, cache de URL e índice
+            with self.store.lock:
+                # Remover os chunks da versão anterior enquanto o registro antigo
+                # (chunk_count e conteúdo) ainda está na base
+                self._remove_from_index(doc_id)
+                self.knowledge_base["documents"][doc_id] = document
+                self.knowledge_base.setdefault("url_cache", {})[url_hash] = url_cache_entry
+                self._update_documentation_index(doc_id, content, category)
             
-            # Salvar
-            self._save_knowledge_base()
+            # Salvar apenas as alterações
+            self._persist([
+                {"op": "put_document", "document": document},
+                {"op": "put_url_cache", "key": url_hash, "value": url_cache_entry}
+            ])
             
             return {
                 "success": True,
                 "document_id": doc_id,
+                "cached": False,
+                "status": fetched["status"],
                 "message": f"Conteúdo de {url} adicionado com sucesso"
             }
             
@@ -572,100 +1374,428 @@ class AdvancedRAGSystem:
             self.logger.error(f"Erro ao adicionar URL {url}: {e}")
             return {"success": False, "error": str(e)}
     
+    def refresh_urls(self, category: str = None) -> Dict[str, Any]:
+        """Revalida as URLs já adicionadas (uma requisição condicional por URL)"""
+        started = time.perf_counter()
+        counts = {"not_modified": 0, "updated": 0, "failed": 0}
+        
+        for entry in list(self.knowledge_base.get("url_cache", {}).values()):
+            doc = self.knowledge_base["documents"].get(entry.get("doc_id"), {})
+            url_category = entry.get("category") or doc.get("category", "web")
+            if category is not None and url_category != category:
+                continue
+            
+            result = self.add_url_content(entry["url"], url_category, max_age=None)
+            if not result["success"]:
+                counts["failed"] += 1
+            elif result.get("cached"):
+                counts["not_modified"] += 1
+            else:
+                counts["updated"] += 1
+        
+        elapsed = time.perf_counter() - started
+        return {
+            "success": counts["failed"] == 0,
+            **counts,
+            "elapsed": elapsed,
+            "message": f"{counts['updated']} URLs atualizadas, {counts['not_modified']} sem alterações"
+        }
+    
+    def crawl_tech_docs(self, names: Optional[List[str]] = None, max_pages: int = 200,
+                        max_depth: int = 3, concurrency: int = 16, per_host: int = 4) -> Dict[str, Any]:
+        """Indexa as documentações de `tech_docs` (todas ou só `names`) com o crawler assíncrono.
+        
+        Cada documentação entra na categoria de mesmo nome.
+        """
+        names = names or list(self.tech_docs)
+        unknown = [name for name in names if name not in self.tech_docs]
+        if unknown:
+            return {"success": False, "error": f"Documentações desconhecidas: {', '.join(unknown)}"}
+        
+        crawler = DocumentationCrawler(self, max_pages=max_pages, max_depth=max_depth,
+                                       concurrency=concurrency, per_host=per_host)
+        return crawler.crawl([(self.tech_docs[name]["url"], name) for name in names])
+    
+    def _extract_keywords(self, text: str) -> List[str]:
+        """Extrai a lista de termos (com repetições) usada pelo índice e pelas consultas"""
+        return self.tokenizer.tokenize(text)
+    
     def _update_documentation_index(self, doc_id: str, content: str, category: str):
-        """Atualiza índice de documentação para busca rápida"""
-        if "documentation_index" not in self.knowledge_base:
-            self.knowledge_base["documentation_index"] = {}
+        """Divide o documento em chunks e indexa cada chunk"""
+        self._remove_from_index(doc_id)
         
-        # Extrair palavras-chave
-        if NLTK_AVAILABLE:
-            try:
-                words = word_tokenize(content.lower())
-                stop_words = set(stopwords.words('english') + stopwords.words('portuguese'))
-                keywords = [word for word in words if word.isalnum() and word not in stop_words]
-            except:
-                keywords = content.lower().split()
-        else:
-            keywords = content.lower().split()
+        document = self.knowledge_base["documents"].get(doc_id, {})
+        chunks = self.chunker.chunk(content, document.get("metadata", {}))
+        chunk_ids = self._index_chunks(doc_id, content, chunks)
+        self._update_filters(document or {"category": category}, chunk_ids)
+        
+        if document:
+            document["chunk_count"] = len(chunk_ids)
+    
+    @staticmethod
+    def _chunk_attributes(document: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        """Atributos filtráveis de um documento (herdados pelos seus chunks)"""
+        metadata = document.get("metadata", {})
+        file_format = metadata.get("format")
+        if not file_format and document.get("filepath"):
+            file_format = Path(document["filepath"]).suffix.lstrip(".").upper() or None
+        return {
+            "category": document.get("category", "general"),
+            "format": file_format,
+            "source": "url" if document.get("url") else "file",
+            "date": (document.get("added_at") or "")[:10] or None
+        }
+    
+    @property
+    def filters(self) -> MetadataBitmaps:
+        """Bitmaps de metadados, montados no primeiro uso a partir da tabela de chunks"""
+        if self._filters is None:
+            self._rebuild_filters()
+        return self._filters
+    
+    def _update_filters(self, document: Dict[str, Any], chunk_ids: Iterable[str]):
+        # Bitmaps ainda não montados: a tabela de chunks já reflete a alteração
+        if self._filters is not None:
+            attributes = self._chunk_attributes(document)
+            self._filters.add_many((chunk_id, attributes) for chunk_id in chunk_ids)
+    
+    def _rebuild_filters(self):
+        """Reconstrói os bitmaps de metadados a partir da tabela de chunks"""
+        self._filters = MetadataBitmaps()
+        documents = self.knowledge_base.get("documents", {})
+        attributes = {}
+        items = []
+        # Só os ids da tabela: o documento sai do próprio id ("<doc_id>#<n>"), sem ler os registros
+        for chunk_id in self.knowledge_base.get("chunks", {}):
+            doc_id = chunk_id.rpartition("#")[0]
+            if doc_id not in attributes:
+                document = documents.get(doc_id)
+                attributes[doc_id] = self._chunk_attributes(document) if document is not None else None
+            if attributes[doc_id] is not None:
+                items.append((chunk_id, attributes[doc_id]))
+        # Uma única montagem dos bitmaps (O(n) por valor, não O(n) por chunk)
+        self._filters.add_many(items)
+    
+    def _index_chunks(self, doc_id: str, text: str, chunks: List[Dict[str, Any]],
+                      first_number: int = 0, text_offset: int = 0) -> List[str]:
+        """Registra e indexa chunks; `text` começa no offset `text_offset` do documento"""
+        chunk_table = self.knowledge_base.setdefault("chunks", {})
+        chunk_ids = []
+        
+        # Todos os chunks do documento numa única chamada do tokenizador
+        analyses = self.tokenizer.analyze_batch(
+            [text[chunk["start"] - text_offset:chunk["end"] - text_offset] for chunk in chunks])
+        keyword_lists = [keywords for keywords, _, _ in analyses]
+        
+        for number, (chunk, (keywords, positions, offsets)) in enumerate(zip(chunks, analyses), first_number):
+            chunk_id = f"{doc_id}#{number}"
+            chunk_table[chunk_id] = dict(chunk, doc_id=doc_id)
+            self.index.add_document(chunk_id, keywords, positions, offsets)
+            chunk_ids.append(chunk_id)
+        
+        if self.vector_index is not None and chunk_ids:
+            self.vector_index.add(chunk_ids, self.encoder.encode(keyword_lists))
         
-        # Adicionar ao índice
-        for keyword in set(keywords[:100]):  # Limitar a 100 palavras-chave
-            if keyword not in self.knowledge_base["documentation_index"]:
-                self.knowledge_base["documentation_index"][keyword] = []
+        if chunk_ids:
+            category = self.knowledge_base["documents"].get(doc_id, {}).get("category")
+            self.query_cache.invalidate({term for keywords in keyword_lists for term in keywords}, category)
+        
+        return chunk_ids
+    
+    def _remove_from_index(self, doc_id: str, chunk_count: Optional[int] = None):
+        """Remove os chunks de um documento do índice e da tabela de chunks"""
+        chunk_table = self.knowledge_base.setdefault("chunks", {})
+        if chunk_count is None:
+            chunk_count = self.knowledge_base["documents"].get(doc_id, {}).get("chunk_count", 0)
+        
+        removed = []
+        removed_terms = set()
+        for number in range(chunk_count):
+            chunk_id = f"{doc_id}#{number}"
+            if chunk_id not in chunk_table:
+                continue
+            # Sem o texto (documento ainda não gravado) o vocabulário inteiro é varrido
+            text = self._chunk_text(chunk_id)
+            keywords = self._extract_keywords(text) if text else None
+            self.index.remove_document(chunk_id, keywords)
+            if self._filters is not None:
+                self._filters.remove(chunk_id)
+            del chunk_table[chunk_id]
+            removed.append(chunk_id)
+            if keywords is not None:
+                removed_terms.update(keywords)
+        
+        if self.vector_index is not None and removed:
+            self.vector_index.remove(removed)
+        
+        if removed:
+            category = self.knowledge_base["documents"].get(doc_id, {}).get("category")
+            self.query_cache.invalidate(removed_terms, category)
+    
+    def _chunk_text(self, chunk_id: str) -> str:
+        """Texto de um chunk, recortado do conteúdo do documento"""
+        chunk = self.knowledge_base.get("chunks", {}).get(chunk_id)
+        if chunk is None:
+            return ""
+        doc = self.knowledge_base["documents"].get(chunk["doc_id"])
+        if doc is None:
+            return ""
+        return self._document_text(doc, chunk["start"], chunk["end"])
+    
+    def _build_chunk_result(self, chunk_id: str, score: float, category: str = None,
+                            query_terms: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Monta o resultado de busca de um chunk (None se filtrado ou inexistente)"""
+        chunk = self.knowledge_base.get("chunks", {}).get(chunk_id)
+        doc = self.knowledge_base["documents"].get(chunk["doc_id"]) if chunk else None
+        if doc is None:
+            return None
+        
+        # Filtrar por categoria se especificada
+        if category and doc.get("category") != category:
+            return None
+        
+        text = self._document_text(doc, chunk["start"], chunk["end"])
+        return {
+            "document_id": chunk["doc_id"],
+            "chunk_id": chunk_id,
+            "title": doc.get("title", doc.get("filename", "Sem título")),
+            "category": doc.get("category", "general"),
+            "relevance": round(score, 4),
+            "snippet": self._make_snippet(chunk_id, text, query_terms),
+            "page": chunk.get("page"),
+            "heading": chunk.get("heading"),
+            "metadata": doc.get("metadata", {})
+        }
+    
+    def _make_snippet(self, chunk_id: str, text: str, query_terms: Optional[List[str]] = None,
+                      length: int = 200) -> str:
+        """Trecho de `length` caracteres em torno da janela mais densa de termos da consulta.
+        
+        A janela vem das posições nos postings e os limites dos offsets de
+        token guardados no índice; sem termos encontrados, o início do chunk.
+        """
+        start, end = 0, min(len(text), length)
+        window = self.index.best_window(chunk_id, query_terms) if query_terms else None
+        span = self.index.char_span(chunk_id, window[0], window[1]) if window else None
+        
+        if span is not None:
+            span_start, span_end = span
+            span_end = len(text) if span_end is None else span_end
+            padding = max(0, length - (span_end - span_start)) // 2
+            start = max(0, span_start - padding)
+            end = min(len(text), start + length)
+            start = max(0, min(start, end - length))
+        
+        snippet = text[start:end].strip()
+        if start > 0:
+            snippet = "..." + snippet
+        if end < len(text):
+            snippet += "..."
+        return snippet
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Termos do vocabulário que começam com `prefix`, dos mais frequentes aos menos.
+        
+        Os termos são os do índice (minúsculos, sem acentos e com stemming
+        leve), que buscados de novo casam exatamente com os postings.
+        """
+        with self.store.lock:
+            if self._prefix_index_version != self.index.version:
+                self.prefix_index.build((term, term, df) for term, df in self.index.document_frequencies())
+                self._prefix_index_version = self.index.version
+        return self.prefix_index.complete(prefix, limit)
+    
+    def _parse_query(self, query: str) -> Tuple[List[str], List[List[Tuple[str, int]]]]:
+        """Termos da consulta e frases exatas entre aspas ("docker compose up").
+        
+        Cada frase vira [(termo, distância até o primeiro termo)], com as
+        mesmas posições usadas na indexação.
+        """
+        phrases = []
+        for phrase_text in QUERY_PHRASE_PATTERN.findall(query):
+            terms, positions, _ = self.tokenizer.analyze(phrase_text)
+            if len(terms) > 1:
+                phrases.append([(term, position - positions[0]) for term, position in zip(terms, positions)])
+        return self._extract_keywords(query), phrases
+    
+    def search_knowledge(self, query: str, category: str = None, limit: int = 5,
+                         mode: str = "keyword", use_cache: bool = True,
+                         filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Busca rápida na base de conhecimento.
+        
+        mode="keyword" usa o ranking BM25 por chunk, com frases exatas entre
+        aspas e bônus de proximidade; mode="semantic" usa o índice vetorial
+        (ver search_semantic). `filters` restringe por category, format,
+        source ("file"/"url"), date_from e date_to (ver MetadataBitmaps.select)
+        antes da pontuação. Resultados ficam no cache de
+        consultas até que um documento com termos da consulta seja alterado.
+        """
+        key = QueryCache.make_key(query, category, limit, mode, filters)
+        if use_cache:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+        
+        # Sob o lock do store: a ingestão em outras threads (ex.: crawler) não altera
+        # o índice no meio da busca nem invalida o cache antes do put
+        with self.store.lock:
+            if mode == "semantic":
+                result = self.search_semantic(query, category=category, limit=limit, filters=filters)
+                terms = None  # Vetores podem ser afetados por qualquer documento
+            else:
+                result = self._search_keyword(query, category, limit, filters)
+                terms = self._extract_keywords(query)
             
-            if doc_id not in self.knowledge_base["documentation_index"][keyword]:
-                self.knowledge_base["documentation_index"][keyword].append(doc_id)
+            if use_cache and result.get("success"):
+                self.query_cache.put(key, result, terms, category)
+        return result
     
-    def search_knowledge(self, query: str, category: str = None, limit: int = 5) -> Dict[str, Any]:
-        """Busca rápida na base de conhecimento"""
+    def _select_chunks(self, category: Optional[str], filters: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """Chunks que atendem aos filtros de metadados (None = sem filtro)"""
+        if category:
+            filters = dict(filters or {}, category=category)
+        selected = self.filters.select(filters)
+        if selected is None:
+            return None
+        return self.filters.members(selected)
+    
+    def _search_keyword(self, query: str, category: str = None, limit: int = 5,
+                        filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Busca por palavras-chave com ranking BM25 por chunk"""
         try:
-            query_lower = query.lower()
             results = []
             
-            # Buscar por palavras-chave no índice
-            query_words = query_lower.split()
-            matching_docs = set()
+            # Só os postings dos termos da consulta são visitados, intersectados com os filtros
+            terms, phrases = self._parse_query(query)
+            with self.store.lock:
+                allowed = self._select_chunks(category, filters)
+                ranked = self.index.search(terms, phrases=phrases, proximity_weight=self.proximity_weight,
+                                           candidates=set(allowed) if allowed is not None else None)
+                
+                for chunk_id, score in ranked:
+                    result = self._build_chunk_result(chunk_id, score, None, terms)
+                    if result is not None:
+                        results.append(result)
             
-            for word in query_words:
-                if word in self.knowledge_base.get("documentation_index", {}):
-                    matching_docs.update(self.knowledge_base["documentation_index"][word])
+            return {
+                "success": True,
+                "query": query,
+                "results": results[:limit],
+                "total_found": len(results)
+            }
             
-            # Filtrar por categoria se especificada
-            for doc_id in matching_docs:
-                if doc_id in self.knowledge_base["documents"]:
-                    doc = self.knowledge_base["documents"][doc_id]
-                    
-                    if category and doc.get("category") != category:
+        except Exception as e:
+            self.logger.error(f"Erro na busca: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def search_semantic(self, query: str, category: str = None, limit: int = 5,
+                        nprobe: Optional[int] = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Busca semântica top-k no índice vetorial local.
+        
+        A consulta é codificada com pesos IDF do índice BM25. Com o IVF
+        construído (build_vector_clusters), `nprobe` limita a busca aos
+        clusters mais próximos; com filtros, só os vetores dos chunks
+        selecionados são pontuados.
+        """
+        if self.vector_index is None:
+            return {"success": False, "error": "NumPy não disponível para busca semântica"}
+        
+        try:
+            terms = self._extract_keywords(query)
+            results = []
+            with self.store.lock:
+                query_vector = self.encoder.encode([terms], weight=self.index.idf)[0]
+                
+                allowed = self._select_chunks(category, filters)
+                for chunk_id, score in self.vector_index.search(query_vector, limit, nprobe=nprobe, allowed=allowed):
+                    if score <= 0:
                         continue
-                    
-                    # Calcular relevância simples
-                    content_lower = doc["content"].lower()
-                    relevance = sum(1 for word in query_words if word in content_lower)
-                    
-                    results.append({
-                        "document_id": doc_id,
-                        "title": doc.get("title", doc.get("filename", "Sem título")),
-                        "category": doc.get("category", "general"),
-                        "relevance": relevance,
-                        "snippet": content_lower[:200] + "..." if len(content_lower) > 200 else content_lower,
-                        "metadata": doc.get("metadata", {})
-                    })
-            
-            # Ordenar por relevância
-            results.sort(key=lambda x: x["relevance"], reverse=True)
+                    result = self._build_chunk_result(chunk_id, score, None, terms)
+                    if result is not None:
+                        results.append(result)
             
             return {
                 "success": True,
                 "query": query,
+                "mode": "semantic",
                 "results": results[:limit],
                 "total_found": len(results)
             }
             
         except Exception as e:
-            self.logger.error(f"Erro na busca: {e}")
+            self.logger.error(f"Erro na busca semântica: {e}")
             return {"success": False, "error": str(e)}
     
+    def build_vector_clusters(self, n_lists: Optional[int] = None) -> Dict[str, Any]:
+        """Constrói o modo IVF do índice vetorial para bases grandes"""
+        if self.vector_index is None:
+            return {"success": False, "error": "NumPy não disponível para busca semântica"}
+        
+        self.vector_index.build_ivf(n_lists=n_lists)
+        return {"success": True, "vectors": len(self.vector_index)}
+    
     def get_openrouter_models(self) -> Dict[str, Any]:
         """Obtém modelos da OpenRouter organizados"""
         return self.openrouter_client.get_models()
     
-    def query_with_context(self, question: str, model_id: str, context_docs: List[str] = None) -> Dict[str, Any]:
-        """Faz pergunta com contexto da base de conhecimento"""
+    def _context_candidates(self, question: str, context_docs: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Chunks candidatos ao contexto, com a relevância para a pergunta"""
+        chunk_table = self.knowledge_base.get("chunks", {})
+        candidates = []
+        
+        if context_docs:
+            # Chunks dos documentos escolhidos: os que casam com a pergunta primeiro, depois em ordem
+            chunk_ids = [f"{doc_id}#{number}" for doc_id in context_docs
+                         for number in range(self.knowledge_base["documents"].get(doc_id, {}).get("chunk_count", 0))]
+            chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id in chunk_table]
+            terms, phrases = self._parse_query(question)
+            scores = dict(self.index.search(terms, phrases=phrases, proximity_weight=self.proximity_weight,
+                                            candidates=set(chunk_ids))) if chunk_ids else {}
+            hits = [(chunk_id, scores.get(chunk_id, 0.0)) for chunk_id in chunk_ids]
+        else:
+            search_result = self.search_knowledge(question, limit=self.context_candidates)
+            hits = [(hit["chunk_id"], hit["relevance"]) for hit in search_result.get("results", [])]
+        
+        for chunk_id, score in hits:
+            chunk = chunk_table.get(chunk_id)
+            if chunk is None:
+                continue
+            doc = self.knowledge_base["documents"].get(chunk["doc_id"], {})
+            candidates.append({
+                "id": chunk_id,
+                "document_id": chunk["doc_id"],
+                "title": doc.get("title", doc.get("filename", chunk["doc_id"])),
+                "text": self._chunk_text(chunk_id),
+                "score": score,
+                "start": chunk["start"]
+            })
+        return candidates
+    
+    def query_with_context(self, question: str, model_id: str, context_docs: List[str] = None,
+                           context_length: Optional[int] = None,
+                           max_context_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Faz pergunta com contexto da base de conhecimento.
+        
+        O contexto é montado pelo ContextPacker dentro do orçamento de tokens
+        do modelo (`context_length` informado ou o do catálogo da OpenRouter),
+        limitado por `max_context_tokens`. A decisão do empacotamento (orçamento,
+        tokens usados, chunks incluídos, cortados e descartados) volta em "packing".
+        """
         try:
-            # Buscar contexto se não fornecido
-            if not context_docs:
-                search_result = self.search_knowledge(question, limit=3)
-                if search_result["success"]:
-                    context_docs = [doc["document_id"] for doc in search_result["results"]]
-            
-            # Construir contexto
-            context_content = ""
-            for doc_id in context_docs:
-                if doc_id in self.knowledge_base["documents"]:
-                    doc = self.knowledge_base["documents"][doc_id]
-                    context_content += f"\n--- {doc.get('title', doc_id)} ---\n"
-                    context_content += doc["content"][:1000]  # Limitar contexto
-                    context_content += "\n"
+            if context_length is None:
+                context_length = self.openrouter_client.get_context_length(model_id)
+            budget = self.context_packer.budget_for(context_length, question)
+            if max_context_tokens is not None:
+                budget = min(budget, max_context_tokens)
+            
+            packing = self.context_packer.pack(self._context_candidates(question, context_docs), budget)
+            context_content = packing.pop("context")
+            packing["context_length"] = context_length
+            
+            chunk_table = self.knowledge_base.get("chunks", {})
+            context_chunks = packing["included"]
+            context_docs = list(dict.fromkeys(chunk_table[chunk_id]["doc_id"] for chunk_id in context_chunks
+                                              if chunk_id in chunk_table))
             
             # Fazer query
             result = self.openrouter_client.query_model(model_id, question, context_content)
@@ -676,6 +1806,8 @@ class AdvancedRAGSystem:
                 "answer": result.get("response", ""),
                 "model_used": model_id,
                 "context_documents": context_docs,
+                "context_chunks": context_chunks,
+                "packing": packing,
                 "usage": result.get("usage", {}),
                 "error": result.get("error")
             }
@@ -695,14 +1827,21 @@ class AdvancedRAGSystem:
         for doc in docs.values():
             category = doc.get("category", "general")
             categories[category] = categories.get(category, 0) + 1
-            total_size += len(doc.get("content", ""))
+            total_size += doc["content_ref"]["length"] if "content_ref" in doc else len(doc.get("content", ""))
         
         return {
             "total_documents": len(docs),
             "categories": categories,
             "total_content_size": total_size,
-            "index_keywords": len(self.knowledge_base.get("documentation_index", {})),
+            "total_chunks": len(self.knowledge_base.get("chunks", {})),
+            "index_keywords": self.index.vocabulary_size,
+            "vector_index_size": len(self.vector_index) if self.vector_index is not None else 0,
+            "query_cache": self.query_cache.stats(),
             "cached_urls": len(self.knowledge_base.get("url_cache", {})),
+            "http_cache": self.http_cache.get_stats(),
+            "filters": self._filters.stats() if self._filters is not None else None,
+            "content_store": self.blob_store.get_stats(),
+            "tracked_files": len(self.knowledge_base.get("file_registry", {})),
             "last_updated": self.knowledge_base.get("last_updated")
         }
 
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Async Runtime
+-------------
+Event loop de longa duração, numa thread daemon, com uma sessão HTTP
+compartilhada para todo o tráfego do OpenRouter.
+
+Antes cada mensagem criava uma thread, um event loop e uma
+aiohttp.ClientSession novos, pagando conexão TCP, handshake TLS e
+resolução DNS a cada requisição. Aqui o loop e a sessão vivem enquanto
+o processo viver: o conector mantém conexões keep-alive reaproveitáveis
+e guarda a resolução DNS em cache.
+
+Código síncrono (Tk) agenda corrotinas com `submit()`, que devolve um
+concurrent.futures.Future; `add_done_callback` + `root.after` levam o
+resultado de volta à thread da interface.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Coroutine, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger("ASYNC_RUNTIME")
+
+
+class AsyncRuntime:
+    """Event loop em segundo plano com sessão aiohttp persistente"""
+
+    def __init__(self, limit: int = 32, limit_per_host: int = 16, dns_ttl: int = 300,
+                 keepalive_timeout: float = 60.0, timeout: float = 300.0):
+        """
+        Args:
+            limit: conexões simultâneas no pool
+            limit_per_host: conexões simultâneas por host
+            dns_ttl: segundos que uma resolução DNS fica em cache
+            keepalive_timeout: segundos que uma conexão ociosa é mantida
+            timeout: tempo máximo total de uma requisição
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+
+    def _run(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        ready.set()
+        self.loop.run_forever()
+
+    def start(self):
+        """Inicia o event loop (idempotente)"""
+        with self._lock:
+            if self.is_running():
+                return
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="openrouter-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info("Event loop do OpenRouter iniciado")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop(self) -> bool:
+        """True quando chamado de dentro do event loop do runtime"""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Agenda uma corrotina no loop; seguro para chamar de qualquer thread"""
+        self.start()
+        self.submitted += 1
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Sessão compartilhada (só pode ser usada dentro do loop do runtime)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=self.dns_ttl, use_dns_cache=True,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def close(self, timeout: float = 5.0):
+        """Fecha a sessão e encerra o loop"""
+        with self._lock:
+            if not self.is_running():
+                return
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(self._session.close(), self.loop).result(timeout)
+                self._session = None
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self.loop.close()
+            self._thread = None
+            self.loop = None
+            logger.info("Event loop do OpenRouter encerrado")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado do loop e do pool de conexões"""
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        return {
+            "running": self.is_running(),
+            "submitted": self.submitted,
+            "session_open": connector is not None,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_ttl": self.dns_ttl
+        }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Blob Store
+----------
+Armazenamento do conteúdo dos documentos fora da memória.
+
+Os textos são divididos em blocos de `block_chars` caracteres, cada bloco
+comprimido (zlib ou zstd) e acrescentado ao fim de um único arquivo. O
+documento guarda só a referência (posição e tamanho de cada bloco); a
+leitura é feita sob demanda via mmap e descomprime apenas os blocos do
+trecho pedido (um snippet ou o contexto de uma consulta).
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import os
+import mmap
+import zlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger("BLOB_STORE")
+
+CODECS = ("zlib", "zstd", "none")
+
+
+class BlobWriter:
+    """Escrita incremental de um texto em blocos (ex.: páginas de um PDF)"""
+
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.blocks: List[List[int]] = []
+        self.length = 0
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def write(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.store.block_chars:
+            pending = "".join(self._buffer)
+            size = self.store.block_chars
+            cut = len(pending) - len(pending) % size
+            for start in range(0, cut, size):
+                self._emit(pending[start:start + size])
+            self._buffer = [pending[cut:]] if cut < len(pending) else []
+            self._buffered = len(pending) - cut
+
+    def _emit(self, text: str):
+        self.blocks.append(self.store._append_block(text))
+        self.length += len(text)
+
+    def close(self) -> Dict[str, Any]:
+        """Grava o bloco final e devolve a referência do texto"""
+        if self._buffered:
+            self._emit("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        return {
+            "codec": self.store.codec,
+            "block_chars": self.store.block_chars,
+            "length": self.length,
+            "blocks": self.blocks
+        }
+
+
+class BlobStore:
+    """Arquivo append-only de blocos comprimidos com leitura via mmap"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, codec: str = "zlib", level: int = 6,
+                 block_chars: int = 65536, temp_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            path: arquivo de dados; None usa um arquivo temporário anônimo
+                (descartado ao fechar), para conteúdo que não é persistido
+            codec: "zlib", "zstd" (requer zstandard) ou "none"
+            level: nível de compressão
+            block_chars: caracteres por bloco (granularidade da leitura parcial)
+            temp_dir: diretório do arquivo temporário quando `path` é None
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Codec desconhecido: {codec}")
+        if codec == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard não disponível, usando zlib")
+            codec = "zlib"
+
+        self.path = Path(path) if path is not None else None
+        self.codec = codec
+        self.level = level
+        self.block_chars = block_chars
+        self.logger = logger
+
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a+b', buffering=0)
+        else:
+            self._file = tempfile.TemporaryFile(dir=str(temp_dir) if temp_dir else None, buffering=0)
+        self._file.seek(0, os.SEEK_END)
+        self.size = self._file.tell()
+
+        self._lock = threading.RLock()
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+        self._dirty = False
+
+        if codec == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level)
+            self._decompressor = zstandard.ZstdDecompressor()
+
+    def _compress(self, data: bytes, codec: str) -> bytes:
+        if codec == "zlib":
+            return zlib.compress(data, self.level)
+        if codec == "zstd":
+            return self._compressor.compress(data)
+        return data
+
+    def _decompress(self, data: bytes, codec: str) -> bytes:
+        if codec == "zlib":
+            return zlib.decompress(data)
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Conteúdo comprimido com zstd, mas zstandard não está disponível")
+            if not hasattr(self, "_decompressor"):
+                self._decompressor = zstandard.ZstdDecompressor()
+            return self._decompressor.decompress(data)
+        return data
+
+    def _append_block(self, text: str) -> List[int]:
+        payload = self._compress(text.encode('utf-8'), self.codec)
+        with self._lock:
+            offset = self.size
+            self._file.write(payload)
+            self.size += len(payload)
+            self._dirty = True
+        return [offset, len(payload)]
+
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self)
+
+    def put(self, text: str) -> Dict[str, Any]:
+        """Acrescenta um texto e devolve sua referência"""
+        writer = self.writer()
+        writer.write(text)
+        return writer.close()
+
+    def _read_bytes(self, offset: int, size: int) -> bytes:
+        with self._lock:
+            if offset + size > self._mapped_size:
+                # O arquivo cresceu desde o último mapeamento
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mapped_size = len(self._map)
+            return self._map[offset:offset + size]
+
+    def read(self, ref: Dict[str, Any], start: int = 0, end: Optional[int] = None) -> str:
+        """Texto (ou o trecho [start:end]) de uma referência, descomprimindo só os blocos necessários"""
+        length = ref["length"]
+        end = length if end is None else min(end, length)
+        if start >= end:
+            return ""
+
+        block_chars = ref["block_chars"]
+        first = start // block_chars
+        last = (end - 1) // block_chars
+        codec = ref.get("codec", "zlib")
+        text = "".join(self._decompress(self._read_bytes(offset, size), codec).decode('utf-8')
+                       for offset, size in ref["blocks"][first:last + 1])
+        base = first * block_chars
+        return text[start - base:end - base]
+
+    def flush(self):
+        """Garante em disco os blocos gravados (antes de referenciá-los no journal)"""
+        with self._lock:
+            if self._dirty:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+                self._mapped_size = 0
+            self._file.close()
+
+    @staticmethod
+    def stored_size(ref: Dict[str, Any]) -> int:
+        """Bytes ocupados pela referência no arquivo"""
+        return sum(size for _, size in ref["blocks"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path) if self.path else None,
+            "codec": self.codec,
+            "size_bytes": self.size,
+            "mapped_bytes": self._mapped_size
+        }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Context Packer
+--------------
+Monta o contexto enviado aos modelos dentro de um orçamento de tokens.
+
+O orçamento sai do context_length do modelo (OpenRouterModel ou catálogo
+da API), descontando a pergunta, o prompt de sistema e a reserva para a
+resposta. Os trechos candidatos entram por ordem de relevância, sem
+duplicatas, até o orçamento acabar; o último que não cabe inteiro é
+cortado no limite de uma palavra. Os escolhidos são reordenados por
+documento e posição, para que trechos vizinhos sejam lidos em sequência.
+
+A contagem de tokens é uma estimativa local (sem tokenizador do modelo):
+palavras longas contam como várias unidades de ~4 caracteres e cada sinal
+de pontuação como uma.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import re
+import hashlib
+import logging
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger("CONTEXT_PACKER")
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# context_length de modelos sem essa informação no catálogo
+DEFAULT_CONTEXT_LENGTH = 4096
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa rápida do número de tokens de um texto"""
+    return sum((len(piece) + 3) // 4 for piece in TOKEN_PATTERN.findall(text))
+
+
+class ContextPacker:
+    """Seleciona e formata trechos de contexto dentro de um orçamento de tokens"""
+
+    def __init__(self, estimator: Callable[[str], int] = estimate_tokens, reserve_output: int = 2000,
+                 context_fraction: float = 0.6, max_budget: Optional[int] = None,
+                 min_fragment_tokens: int = 48, overhead_tokens: int = 64):
+        """
+        Args:
+            estimator: função texto -> tokens
+            reserve_output: tokens reservados para a resposta (max_tokens)
+            context_fraction: fração máxima da janela usada pelo contexto
+            max_budget: teto absoluto do contexto em tokens (None = sem teto)
+            min_fragment_tokens: menor trecho cortado que ainda vale incluir
+            overhead_tokens: margem para a formatação das mensagens
+        """
+        self.estimator = estimator
+        self.reserve_output = reserve_output
+        self.context_fraction = context_fraction
+        self.max_budget = max_budget
+        self.min_fragment_tokens = min_fragment_tokens
+        self.overhead_tokens = overhead_tokens
+
+    def budget_for(self, context_length: Optional[int], prompt: str = "") -> int:
+        """Tokens disponíveis para o contexto num modelo com `context_length`"""
+        window = context_length or DEFAULT_CONTEXT_LENGTH
+        # Em janelas pequenas a reserva da resposta não pode consumir tudo
+        reserve = min(self.reserve_output, window // 4)
+        available = window - reserve - self.estimator(prompt) - self.overhead_tokens
+        budget = min(available, int(window * self.context_fraction))
+        if self.max_budget is not None:
+            budget = min(budget, self.max_budget)
+        return max(0, budget)
+
+    @staticmethod
+    def _fingerprint(text: str) -> str:
+        return hashlib.sha1(" ".join(text.lower().split()).encode('utf-8')).hexdigest()
+
+    def _truncate(self, text: str, tokens: int) -> str:
+        """Prefixo do texto com no máximo `tokens`, cortado no fim de uma palavra"""
+        marker = " [...]"
+        tokens -= self.estimator(marker)
+        used = 0
+        end = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            cost = (len(match.group()) + 3) // 4
+            if used + cost > tokens:
+                break
+            used += cost
+            end = match.end()
+        return text[:end].rstrip() + marker
+
+    def pack(self, candidates: List[Dict[str, Any]], budget: int) -> Dict[str, Any]:
+        """Escolhe os trechos e monta o contexto.
+
+        Cada candidato tem `text` e opcionalmente `score`, `title`, `id`,
+        `document_id` e `start` (posição no documento). Devolve o contexto e
+        o relatório da decisão: orçamento, tokens usados, trechos incluídos,
+        cortados e descartados (com o motivo).
+        """
+        ranked = sorted(enumerate(candidates), key=lambda item: (-item[1].get("score", 0.0), item[0]))
+
+        selected = []
+        skipped = []
+        truncated = []
+        seen_ids = set()
+        seen_texts = set()
+        used = 0
+
+        for rank, (_, candidate) in enumerate(ranked):
+            item_id = candidate.get("id", rank)
+            text = candidate.get("text", "").strip()
+            fingerprint = self._fingerprint(text)
+            if not text or item_id in seen_ids or fingerprint in seen_texts:
+                skipped.append({"id": item_id, "reason": "duplicate" if text else "empty"})
+                continue
+
+            header = f"--- {candidate.get('title') or candidate.get('document_id') or 'Contexto'} ---"
+            cost = self.estimator(header) + self.estimator(text)
+            remaining = budget - used
+            if cost > remaining:
+                # Cortar o trecho se ainda couber uma parte útil; senão tentar os menores
+                text_budget = remaining - self.estimator(header)
+                if text_budget < self.min_fragment_tokens:
+                    skipped.append({"id": item_id, "reason": "budget", "tokens": cost})
+                    continue
+                text = self._truncate(text, text_budget)
+                cost = self.estimator(header) + self.estimator(text)
+                truncated.append(item_id)
+
+            seen_ids.add(item_id)
+            seen_texts.add(fingerprint)
+            used += cost
+            selected.append({
+                "id": item_id,
+                "document_id": candidate.get("document_id"),
+                "header": header,
+                "text": text,
+                "tokens": cost,
+                "rank": rank,
+                "start": candidate.get("start", 0)
+            })
+
+        # Ordem de leitura: documentos pelo melhor trecho, trechos pela posição no documento
+        document_rank: Dict[Any, int] = {}
+        for item in selected:
+            document_rank.setdefault(item["document_id"] or item["id"], item["rank"])
+        selected.sort(key=lambda item: (document_rank[item["document_id"] or item["id"]], item["start"]))
+
+        context = "\n\n".join(f"{item['header']}\n{item['text']}" for item in selected)
+        return {
+            "context": context,
+            "budget": budget,
+            "used_tokens": used,
+            "included": [item["id"] for item in selected],
+            "truncated": truncated,
+            "skipped": skipped
+        }
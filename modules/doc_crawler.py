@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Documentation Crawler
+---------------------
+Crawler assíncrono das documentações técnicas (AdvancedRAGSystem.tech_docs).
+
+- uma única sessão aiohttp com pool de conexões e cache de DNS
+- limite de requisições simultâneas global e por host
+- fronteira com deduplicação de URLs (sem fragmento) e limites de
+  profundidade e de páginas
+- cada página é interpretada uma única vez (AdvancedRAGSystem.parse_fetched_page,
+  no executor, fora do event loop); os links entram na fronteira antes da
+  ingestão, que segue numa thread enquanto as demais páginas são baixadas
+  (as alterações no índice e as buscas são serializadas pelo lock do store
+  do AdvancedRAGSystem)
+- requisições condicionais via HTTPCache: páginas inalteradas não são
+  reindexadas, mas seus links continuam sendo seguidos
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import re
+import time
+import asyncio
+import logging
+import posixpath
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable
+from urllib.parse import urljoin, urldefrag, urlsplit
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger("DOC_CRAWLER")
+
+HREF_PATTERN = re.compile(r'href\s*=\s*["\']([^"\'#]+)', re.IGNORECASE)
+
+# Recursos que não são páginas de documentação
+SKIPPED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".css", ".js", ".map",
+    ".zip", ".gz", ".tar", ".tgz", ".exe", ".dmg", ".mp4", ".mp3", ".woff", ".woff2", ".ttf", ".pdf"
+}
+
+
+def normalize_url(url: str) -> str:
+    """URL canônica para a deduplicação (sem fragmento, host em minúsculas)"""
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    normalized = f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}"
+    if parts.query:
+        normalized += f"?{parts.query}"
+    return normalized
+
+
+def scope_prefix(root_url: str) -> Tuple[str, str]:
+    """(host, prefixo de caminho) que delimitam o crawl de uma documentação"""
+    parts = urlsplit(root_url)
+    path = parts.path or "/"
+    # ".../Content/FreeTier/freetier_topic-Landing.htm" -> ".../Content/FreeTier/"
+    if "." in posixpath.basename(path):
+        path = posixpath.dirname(path)
+    return parts.netloc.lower(), path.rstrip("/") + "/"
+
+
+class DocumentationCrawler:
+    """Crawler asyncio que alimenta o AdvancedRAGSystem com páginas de documentação"""
+
+    def __init__(self, rag_system, max_pages: int = 200, max_depth: int = 3, concurrency: int = 16,
+                 per_host: int = 4, timeout: float = 15.0,
+                 on_page: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """
+        Args:
+            rag_system: instância de AdvancedRAGSystem
+            max_pages: páginas por documentação (raiz)
+            max_depth: profundidade máxima de links a partir da raiz
+            concurrency: requisições simultâneas no total
+            per_host: requisições simultâneas por host
+            timeout: tempo limite de cada requisição em segundos
+            on_page: callback(url, resultado) chamado após cada página
+        """
+        self.rag_system = rag_system
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.on_page = on_page
+        self.logger = logger
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+
+    def crawl(self, roots: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Executa o crawl de [(url_raiz, categoria), ...] e devolve as estatísticas"""
+        if not AIOHTTP_AVAILABLE:
+            return {"success": False, "error": "aiohttp não disponível"}
+        return asyncio.run(self.crawl_async(roots))
+
+    async def crawl_async(self, roots: List[Tuple[str, str]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        stats = {"fetched": 0, "not_modified": 0, "indexed": 0, "unchanged": 0, "failed": 0}
+        errors: List[Dict[str, str]] = []
+
+        queue: asyncio.Queue = asyncio.Queue()
+        seen: Set[str] = set()
+        # raiz -> páginas já aceitas na fronteira
+        budgets: Dict[str, int] = {}
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        scopes = {root: scope_prefix(root) for root, _ in roots}
+
+        def enqueue(url: str, depth: int, root: str, category: str):
+            url = normalize_url(url)
+            if url in seen or budgets[root] >= self.max_pages:
+                return
+            seen.add(url)
+            budgets[root] += 1
+            queue.put_nowait((url, depth, root, category))
+
+        for root, category in roots:
+            budgets[root] = 0
+            enqueue(root, 0, root, category)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                         ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        loop = asyncio.get_running_loop()
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers) as session:
+
+            async def worker():
+                while True:
+                    url, depth, root, category = await queue.get()
+                    try:
+                        host = urlsplit(url).netloc
+                        limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+                        async with limit:
+                            fetched = await self._fetch(session, url, loop)
+                        if fetched is None:
+                            continue
+
+                        stats["fetched"] += 1
+                        if fetched["status"] == "not_modified":
+                            stats["not_modified"] += 1
+
+                        # Um único parse (fora do loop) serve aos links e à ingestão
+                        page = await loop.run_in_executor(None, self.rag_system.parse_fetched_page, url, fetched)
+
+                        # Links na fronteira antes da ingestão: a profundidade não espera a indexação
+                        if depth < self.max_depth:
+                            for link in self._extract_links(url, page["hrefs"], scopes[root]):
+                                enqueue(link, depth + 1, root, category)
+
+                        # Ingestão em thread: o loop continua baixando as próximas páginas
+                        result = await loop.run_in_executor(
+                            None, self.rag_system.add_fetched_content, url, fetched, category, page)
+                        if not result.get("success"):
+                            stats["failed"] += 1
+                            errors.append({"url": url, "error": result.get("error", "")})
+                        elif result.get("cached"):
+                            stats["unchanged"] += 1
+                        else:
+                            stats["indexed"] += 1
+                        if self.on_page:
+                            self.on_page(url, result)
+                    except Exception as e:
+                        stats["failed"] += 1
+                        errors.append({"url": url, "error": str(e)})
+                        self.logger.warning(f"Erro ao processar {url}: {e}")
+                    finally:
+                        queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"Crawl concluído: {stats['fetched']} páginas ({stats['indexed']} indexadas, "
+                         f"{stats['not_modified']} não modificadas) em {elapsed:.1f}s")
+        return {
+            "success": stats["failed"] == 0,
+            **stats,
+            "errors": errors,
+            "elapsed": elapsed,
+            "pages_per_second": stats["fetched"] / elapsed if elapsed else 0.0
+        }
+
+    async def _fetch(self, session, url: str, loop) -> Optional[Dict[str, Any]]:
+        """GET condicional; devolve o resultado do HTTPCache (None para não-HTML)"""
+        http_cache = self.rag_system.http_cache
+        headers = await loop.run_in_executor(None, http_cache.conditional_headers, url)
+
+        async with session.get(url, headers=headers) as response:
+            if response.status != 304:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "")
+                if content_type and "html" not in content_type:
+                    return None
+            body = await response.read()
+            encoding = response.charset or "utf-8"
+            return await loop.run_in_executor(
+                None, http_cache.store, url, response.status, response.headers, body, encoding)
+
+    @staticmethod
+    def _extract_links(base_url: str, hrefs: List[str], scope: Tuple[str, str]) -> List[str]:
+        """Links da página que ficam dentro do host e do prefixo da documentação"""
+        host, prefix = scope
+        links = []
+        for href in hrefs:
+            url = urljoin(base_url, href.strip())
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https") or parts.netloc.lower() != host:
+                continue
+            path = parts.path or "/"
+            if not (path + "/").startswith(prefix) and not path.startswith(prefix):
+                continue
+            if posixpath.splitext(path)[1].lower() in SKIPPED_EXTENSIONS:
+                continue
+            links.append(url)
+        return links
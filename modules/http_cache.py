@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP Cache
+----------
+Cache HTTP em disco com revalidação condicional, usado pelo
+AdvancedRAGSystem para conteúdo de URLs.
+
+Cada URL guarda o corpo da resposta (<chave>.body) e os metadados
+(<chave>.json) com os validadores ETag / Last-Modified. Nas consultas
+seguintes a requisição é condicional (If-None-Match / If-Modified-Since):
+um 304 Not Modified custa só a ida e volta e não transfere o corpo.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import requests
+
+from .rag_storage import write_atomic
+
+logger = logging.getLogger("HTTP_CACHE")
+
+
+class HTTPCache:
+    """Corpos de resposta + validadores em disco, com requisições condicionais"""
+
+    def __init__(self, cache_dir: Path, session: Optional[requests.Session] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+        # Sessão compartilhada: conexões keep-alive reaproveitadas entre páginas
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self.stats = {"fresh": 0, "not_modified": 0, "modified": 0, "new": 0}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, url: str):
+        key = self._key(url)
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def get_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """Metadados em cache da URL (None se não houver)"""
+        meta_file, body_file = self._paths(url)
+        if not meta_file.exists() or not body_file.exists():
+            return None
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        _, body_file = self._paths(url)
+        try:
+            return body_file.read_bytes()
+        except OSError:
+            return None
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+              max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Obtém a URL usando o cache.
+
+        Com `max_age` (segundos), uma entrada validada há menos tempo que
+        isso é devolvida sem requisição. Caso contrário a requisição é
+        condicional. O resultado traz `status` ("fresh", "not_modified",
+        "modified" ou "new"), `changed` (corpo diferente do que estava em
+        cache), `body` e `encoding`.
+        """
+        entry = self.get_entry(url)
+
+        if entry is not None and max_age is not None and time.time() - entry.get("validated_at", 0) < max_age:
+            return self._result("fresh", entry, changed=False, body=self.read_body(url))
+
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(url, entry))
+
+        response = self.session.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+
+        return self.store(url, response.status_code, response.headers, response.content,
+                          response.encoding, previous=entry)
+
+    def conditional_headers(self, url: str, entry: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Cabeçalhos If-None-Match / If-Modified-Since para a entrada em cache"""
+        entry = entry if entry is not None else self.get_entry(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, status_code: int, headers, body: bytes, encoding: Optional[str] = None,
+              previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Registra a resposta de uma requisição (síncrona ou não) e devolve o resultado do cache"""
+        now = time.time()
+        if previous is None:
+            previous = self.get_entry(url)
+
+        if status_code == 304 and previous is not None:
+            previous["validated_at"] = now
+            # O servidor pode renovar os validadores no 304
+            previous["etag"] = headers.get("ETag", previous.get("etag"))
+            previous["last_modified"] = headers.get("Last-Modified", previous.get("last_modified"))
+            self._write_meta(url, previous)
+            return self._result("not_modified", previous, changed=False, body=self.read_body(url))
+
+        body_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "encoding": encoding or "utf-8",
+            "sha256": body_hash,
+            "size": len(body),
+            "fetched_at": now,
+            "validated_at": now
+        }
+
+        _, body_file = self._paths(url)
+        write_atomic(body_file, body)
+        self._write_meta(url, entry)
+
+        # Sem validadores o servidor reenvia tudo: o hash ainda evita reindexar
+        if previous is None:
+            return self._result("new", entry, changed=True, body=body)
+        return self._result("modified", entry, changed=previous.get("sha256") != body_hash, body=body)
+
+    def _write_meta(self, url: str, entry: Dict[str, Any]):
+        meta_file, _ = self._paths(url)
+        write_atomic(meta_file, json.dumps(entry, ensure_ascii=False))
+
+    def _result(self, status: str, entry: Dict[str, Any], changed: bool, body: Optional[bytes]) -> Dict[str, Any]:
+        with self._lock:
+            self.stats[status] += 1
+        return {
+            "status": status,
+            "changed": changed,
+            "from_cache": status in ("fresh", "not_modified"),
+            "body": body,
+            "encoding": entry.get("encoding") or "utf-8",
+            "entry": entry
+        }
+
+    def invalidate(self, url: str):
+        """Remove a URL do cache"""
+        for path in self._paths(url):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["entries"] = sum(1 for _ in self.cache_dir.glob("*.json"))
+        return stats
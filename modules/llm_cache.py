@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+LLM Cache
+---------
+Cache em disco de respostas de chat completions, endereçado pelo
+conteúdo da requisição.
+
+A chave é o SHA-256 do JSON canônico de (modelo, lista completa de
+mensagens — incluindo prompt de sistema e contexto RAG —, temperature e
+max_tokens): qualquer diferença no que seria enviado gera outra chave.
+Cada resposta fica em data/cache/llm/<chave>.json. Uma entrada expira
+`ttl` segundos depois de gravada (campo "cached_at"), por mais que seja
+lida; o horário de modificação do arquivo marca só o último acesso e,
+quando o total passa de `max_bytes`, as entradas menos usadas
+recentemente são removidas (LRU).
+
+O cache é opcional: é ligado por "enabled" em
+config/llm_cache_config.json ou pelo argumento `response_cache=` do
+OpenRouterManager, e devolve respostas repetidas em milissegundos e sem
+custo de tokens.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .rag_storage import write_atomic
+
+logger = logging.getLogger("LLM_CACHE")
+
+CONFIG_FILE = Path("config") / "llm_cache_config.json"
+
+
+def load_cache_config(config_file: Path = CONFIG_FILE) -> Dict[str, Any]:
+    """Configuração do cache (vazia se o arquivo não existir)"""
+    config_file = Path(config_file)
+    if not config_file.exists():
+        return {}
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Erro ao carregar configurações do cache de respostas: {e}")
+        return {}
+
+
+class LLMCache:
+    """Respostas de LLM em disco com TTL e remoção LRU por tamanho"""
+
+    def __init__(self, cache_dir: Path = Path("data") / "cache" / "llm", ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 100 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: pasta das entradas
+            ttl: segundos desde a gravação até a entrada expirar
+            max_bytes: tamanho máximo somado das entradas
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+        self.total_bytes = sum(path.stat().st_size for path in self.cache_dir.glob("*.json"))
+
+    @staticmethod
+    def make_key(model_id: str, messages: List[Dict[str, Any]], temperature: Optional[float],
+                 max_tokens: Optional[int]) -> str:
+        """Chave determinística da requisição"""
+        canonical = json.dumps({"model": model_id, "messages": messages, "temperature": temperature,
+                                "max_tokens": max_tokens},
+                               sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Resposta em cache (None se ausente ou expirada); um acerto só atualiza a ordem do LRU"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self.stats["misses"] += 1
+                return None
+
+            try:
+                entry = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._remove(path, stat.st_size)
+                self.stats["misses"] += 1
+                return None
+
+            # O TTL conta da gravação: acessos frequentes não prolongam a validade
+            if time.time() - entry.get("cached_at", stat.st_mtime) > self.ttl:
+                self._remove(path, stat.st_size)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            # mtime = último acesso (ordem do LRU)
+            os.utime(path, None)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Grava a resposta e remove as entradas menos usadas se passar do limite"""
+        payload = json.dumps(dict(entry, cached_at=time.time()), ensure_ascii=False).encode('utf-8')
+        path = self._path(key)
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            write_atomic(path, payload)
+            self.total_bytes += len(payload) - previous
+            self.stats["stores"] += 1
+            if self.total_bytes > self.max_bytes:
+                self._evict(keep=path)
+
+    def _remove(self, path: Path, size: int):
+        try:
+            path.unlink()
+            self.total_bytes -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep: Path):
+        """Remove as entradas de acesso mais antigo até caber em max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        for _, size, path in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path, size)
+            self.stats["evicted"] += 1
+
+    def clear(self):
+        """Apaga todas as entradas"""
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Acertos, falhas, taxa de acerto e ocupação"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats,
+                        hit_rate=self.stats["hits"] / lookups if lookups else 0.0,
+                        entries=sum(1 for _ in self.cache_dir.glob("*.json")),
+                        total_bytes=self.total_bytes,
+                        max_bytes=self.max_bytes,
+                        ttl=self.ttl)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Model Catalog
+-------------
+Catálogo de modelos do OpenRouter persistido em disco.
+
+O arquivo (data/cache/openrouter_models.json.gz) guarda os modelos em
+formato de tabela — a lista de campos uma única vez e uma linha por
+modelo — comprimido com gzip, junto com o horário da busca e os
+validadores HTTP (ETag / Last-Modified) da resposta de /models. Na
+inicialização o catálogo é lido do disco sem rede; a atualização é uma
+requisição condicional feita em segundo plano, e `diff` informa quais
+modelos entraram, saíram ou mudaram.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import gzip
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence
+
+from .rag_storage import write_atomic
+
+logger = logging.getLogger("MODEL_CATALOG")
+
+CATALOG_VERSION = 1
+
+
+class ModelCatalog:
+    """Linhas do catálogo + validadores em um arquivo gzip"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.logger = logger
+        self.fetched_at: Optional[float] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+
+    def load(self, fields: Sequence[str]) -> Optional[List[Dict[str, Any]]]:
+        """Modelos salvos como dicionários {campo: valor} (None se não houver catálogo válido)"""
+        if not self.path.exists():
+            return None
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Catálogo de modelos ilegível, ignorado: {e}")
+            return None
+
+        # Catálogo de outra versão ou com outros campos: buscar de novo
+        if data.get("version") != CATALOG_VERSION or data.get("fields") != list(fields):
+            self.logger.info("Catálogo de modelos em formato antigo, será baixado novamente")
+            return None
+
+        self.fetched_at = data.get("fetched_at")
+        self.etag = data.get("etag")
+        self.last_modified = data.get("last_modified")
+        return [dict(zip(data["fields"], row)) for row in data.get("rows", [])]
+
+    def save(self, fields: Sequence[str], rows: List[List[Any]], etag: Optional[str] = None,
+             last_modified: Optional[str] = None, fetched_at: Optional[float] = None):
+        """Grava o catálogo inteiro de forma atômica"""
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.etag = etag
+        self.last_modified = last_modified
+        self._write(list(fields), rows)
+
+    def touch(self, fields: Sequence[str], rows: List[List[Any]]):
+        """Resposta 304: o catálogo continua válido, só o horário da busca muda"""
+        self.fetched_at = time.time()
+        self._write(list(fields), rows)
+
+    def _write(self, fields: List[str], rows: List[List[Any]]):
+        payload = json.dumps({
+            "version": CATALOG_VERSION,
+            "fetched_at": self.fetched_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fields": fields,
+            "rows": rows
+        }, ensure_ascii=False, separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, gzip.compress(payload.encode('utf-8'), mtime=0))
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Cabeçalhos If-None-Match / If-Modified-Since da última resposta"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def age(self) -> Optional[float]:
+        """Segundos desde a última busca (None se nunca buscado)"""
+        return None if self.fetched_at is None else time.time() - self.fetched_at
+
+    @staticmethod
+    def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Ids adicionados, removidos e alterados entre dois catálogos {id: modelo}"""
+        return {
+            "added": [model_id for model_id in new if model_id not in old],
+            "removed": [model_id for model_id in old if model_id not in new],
+            "changed": [model_id for model_id, model in new.items()
+                        if model_id in old and old[model_id] != model]
+        }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Model Router
+------------
+Estatísticas de desempenho por modelo e escolha automática do modelo.
+
+Cada requisição ao OpenRouter registra o tempo até o primeiro byte (ou
+primeiro token, em streaming), a latência total, os tokens gerados e o
+status HTTP. As amostras ficam numa janela deslizante por `model_id`
+(últimas `window` requisições, descartando as mais velhas que
+`window_seconds`), de onde saem p50/p95, tokens por segundo e as taxas de
+erro e de 429.
+
+Para rotear, os modelos que atendem às restrições (só gratuitos,
+context_length mínimo, empresa) são ordenados pela latência p95 recente
+penalizada pela taxa de erro. Modelos sem amostras suficientes recebem a
+latência padrão, o que garante que também sejam experimentados.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Any, Iterable, Optional
+
+logger = logging.getLogger("MODEL_ROUTER")
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Percentil por posição (nearest-rank) de uma lista de valores"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class ModelStats:
+    """Janela deslizante de amostras de um modelo"""
+
+    def __init__(self, window: int = 100, window_seconds: float = 900.0):
+        self.window_seconds = window_seconds
+        # (horário, ttfb, latência, tokens de saída, status HTTP; 0 = falha de rede,
+        # 408 = requisição abandonada por uma reserva mais rápida)
+        self.samples = deque(maxlen=window)
+
+    def record(self, ttfb: Optional[float], latency: float, tokens: int, status: int):
+        self.samples.append((time.time(), ttfb, latency, tokens, status))
+
+    def _recent(self):
+        cutoff = time.time() - self.window_seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return list(self.samples)
+
+    def summary(self) -> Dict[str, Any]:
+        """p50/p95 de latência e ttfb, tokens/s e taxas de erro da janela"""
+        samples = self._recent()
+        ok = [s for s in samples if s[4] == 200]
+        latencies = [s[2] for s in ok]
+        ttfbs = [s[1] for s in ok if s[1] is not None]
+        generated = sum(s[3] for s in ok)
+        generating_time = sum(s[2] - (s[1] or 0.0) for s in ok if s[3])
+        return {
+            "requests": len(samples),
+            "successes": len(ok),
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p95": percentile(latencies, 0.95),
+            "ttfb_p50": percentile(ttfbs, 0.5),
+            "ttfb_p95": percentile(ttfbs, 0.95),
+            "tokens_per_second": generated / generating_time if generating_time > 0 else None,
+            "error_rate": (len(samples) - len(ok)) / len(samples) if samples else 0.0,
+            "rate_limit_rate": sum(1 for s in samples if s[4] == 429) / len(samples) if samples else 0.0
+        }
+
+
+class ModelRouter:
+    """Escolhe modelos pela latência p95 recente e decide quando disparar requisições de reserva"""
+
+    def __init__(self, window: int = 100, window_seconds: float = 900.0, default_latency: float = 15.0,
+                 min_samples: int = 3, error_penalty: float = 4.0, hedge_factor: float = 1.0,
+                 min_hedge_delay: float = 1.0):
+        """
+        Args:
+            window: amostras mantidas por modelo
+            window_seconds: idade máxima de uma amostra
+            default_latency: latência assumida para modelos sem histórico
+            min_samples: sucessos necessários para confiar no p95 medido
+            error_penalty: peso da taxa de erro (p95 * (1 + penalty * taxa))
+            hedge_factor: múltiplo do p95 esperado antes de disparar a reserva
+            min_hedge_delay: espera mínima antes da reserva, em segundos
+        """
+        self.window = window
+        self.window_seconds = window_seconds
+        self.default_latency = default_latency
+        self.min_samples = min_samples
+        self.error_penalty = error_penalty
+        self.hedge_factor = hedge_factor
+        self.min_hedge_delay = min_hedge_delay
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_id: str, ttfb: Optional[float], latency: float, tokens: int = 0, status: int = 200):
+        """Registra uma requisição concluída (status 0 para falha sem resposta HTTP)"""
+        with self._lock:
+            stats = self._stats.get(model_id)
+            if stats is None:
+                stats = self._stats[model_id] = ModelStats(self.window, self.window_seconds)
+            stats.record(ttfb, latency, tokens, status)
+
+    def stats(self, model_id: Optional[str] = None) -> Dict[str, Any]:
+        """Resumo de um modelo, ou de todos os modelos com amostras"""
+        with self._lock:
+            if model_id is not None:
+                stats = self._stats.get(model_id)
+                return stats.summary() if stats else ModelStats().summary()
+            return {name: stats.summary() for name, stats in self._stats.items()}
+
+    def expected_latency(self, model_id: str) -> float:
+        """p95 recente da latência total (ou a padrão, sem histórico suficiente)"""
+        summary = self.stats(model_id)
+        if summary["successes"] < self.min_samples or summary["latency_p95"] is None:
+            return self.default_latency
+        return summary["latency_p95"]
+
+    def score(self, model_id: str) -> float:
+        """Custo estimado do modelo: menor é melhor"""
+        summary = self.stats(model_id)
+        return self.expected_latency(model_id) * (1.0 + self.error_penalty * summary["error_rate"])
+
+    def hedge_delay(self, model_id: str) -> float:
+        """Quanto esperar pelo modelo principal antes de disparar a reserva"""
+        return max(self.min_hedge_delay, self.expected_latency(model_id) * self.hedge_factor)
+
+    @staticmethod
+    def eligible(models: Iterable[Any], free_only: bool = False, min_context_length: int = 0,
+                 company: Optional[str] = None, exclude: Iterable[str] = ()) -> List[Any]:
+        """Modelos (OpenRouterModel) que atendem às restrições"""
+        excluded = set(exclude)
+        return [
+            model for model in models
+            if model.id not in excluded
+            and (not free_only or model.is_free)
+            and (model.context_length or 0) >= min_context_length
+            and (not company or model.company.lower() == company.lower())
+        ]
+
+    def rank(self, models: Iterable[Any], **constraints) -> List[Any]:
+        """Modelos elegíveis do melhor para o pior"""
+        candidates = self.eligible(models, **constraints)
+        return sorted(candidates, key=lambda model: (self.score(model.id), model.id))
@@ -22,13 +22,27 @@ import os
 import json
 import logging
 import requests
+import time
 import asyncio
 import aiohttp
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+import concurrent.futures
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
 from pathlib import Path
 from datetime import datetime
 import openai
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+
+from .prefix_index import PrefixIndex
+from .context_packer import ContextPacker
+from .sse_stream import SSEDecoder, StreamState
+from .async_runtime import AsyncRuntime
+from .model_catalog import ModelCatalog
+from .model_router import ModelRouter
+from .rate_limiter import RateLimiter, QueueFullError
+from .llm_cache import LLMCache, load_cache_config
 
 @dataclass
 class OpenRouterModel:
@@ -42,10 +56,16 @@ class OpenRouterModel:
     is_free: bool
     tags: List[str]
 
+# Colunas do catálogo em disco
+MODEL_FIELDS = [field.name for field in fields(OpenRouterModel)]
+
+# Sessão HTTP em uso por compare_models (compartilhada pelas requisições paralelas)
+_shared_session: ContextVar[Optional[aiohttp.ClientSession]] = ContextVar("openrouter_shared_session", default=None)
+
 class OpenRouterManager:
     """Gerenciador principal do OpenRouter"""
     
-    def __init__(self):
+    def __init__(self, catalog_path: Optional[Path] = None, response_cache: Optional[LLMCache] = None):
         self.logger = logging.getLogger("OpenRouterManager")
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         self.base_url = "https://openrouter.ai/api/v1"
@@ -53,6 +73,28 @@ class OpenRouterManager:
         self.last_update = None
         self.cache_duration = 3600  # 1 hora
         
+        # Busca por prefixo no catálogo (id, nome e empresa)
+        self.model_index = PrefixIndex()
+        
+        # Catálogo persistido: disponível na inicialização, atualizado em segundo plano
+        self.catalog = ModelCatalog(catalog_path or Path("data") / "cache" / "openrouter_models.json.gz")
+        self._load_catalog()
+        
+        # Contexto RAG dentro do orçamento de tokens de cada modelo
+        self.context_packer = ContextPacker()
+        
+        # Event loop e sessão HTTP persistentes (conexões keep-alive reaproveitadas)
+        self.runtime = AsyncRuntime()
+        
+        # Latência, vazão e erros recentes por modelo (roteamento automático)
+        self.router = ModelRouter()
+        
+        # Token buckets por key/modelo, fila limitada e retentativas (compartilhado por API key)
+        self.rate_limiter = RateLimiter.for_key(self.api_key)
+        
+        # Cache de respostas em disco (opcional: config/llm_cache_config.json)
+        self.response_cache = response_cache if response_cache is not None else self._load_response_cache()
+        
         # Configurar OpenAI client
         if self.api_key:
             openai.api_key = self.api_key
@@ -84,6 +126,40 @@ class OpenRouterManager:
         
         self.logger.info("OpenRouter Manager inicializado")
     
+    def _load_response_cache(self) -> Optional[LLMCache]:
+        """Cria o cache de respostas se estiver habilitado na configuração"""
+        config = load_cache_config()
+        if not config.get("enabled"):
+            return None
+        return LLMCache(Path(config.get("directory", Path("data") / "cache" / "llm")),
+                        ttl=config.get("ttl_hours", 168) * 3600,
+                        max_bytes=int(config.get("max_mb", 100) * 1024 * 1024))
+    
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Executa uma corrotina no event loop persistente do manager.
+        
+        Pode ser chamado de qualquer thread (inclusive a do Tk); devolve um
+        concurrent.futures.Future com o resultado.
+        """
+        return self.runtime.submit(coro)
+    
+    @asynccontextmanager
+    async def _open_session(self):
+        """Sessão HTTP: a compartilhada dentro do loop persistente, uma temporária fora dele"""
+        shared = _shared_session.get()
+        if shared is not None and not shared.closed:
+            # Dentro de compare_models: todas as requisições usam a mesma sessão
+            yield shared
+        elif self.runtime.in_loop():
+            yield await self.runtime.session()
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+    
+    def close(self):
+        """Fecha a sessão compartilhada e encerra o event loop"""
+        self.runtime.close()
+    
     def check_api_key(self) -> bool:
         """Verifica se a API key está configurada"""
         if not self.api_key:
@@ -91,73 +167,143 @@ class OpenRouterManager:
             return False
         return True
     
-    async def get_models(self, force_refresh: bool = False) -> List[OpenRouterModel]:
-        """Obtém lista de modelos disponíveis"""
-        if not self.check_api_key():
-            return []
+    def _model_from_data(self, model_data: Dict) -> OpenRouterModel:
+        """Converte uma entrada de /models em OpenRouterModel"""
+        # Extrair empresa do nome do modelo se não estiver disponível
+        company = model_data.get("company", "Unknown")
+        if company == "Unknown":
+            # Tentar extrair empresa do nome do modelo
+            name = model_data.get("name", "")
+            if ":" in name:
+                company = name.split(":")[0].strip()
+            elif " " in name and any(keyword in name.lower() for keyword in ["gpt", "claude", "gemini", "llama"]):
+                # Detectar empresas conhecidas
+                if "gpt" in name.lower():
+                    company = "OpenAI"
+                elif "claude" in name.lower():
+                    company = "Anthropic"
+                elif "gemini" in name.lower():
+                    company = "Google"
+                elif "llama" in name.lower():
+                    company = "Meta"
+                else:
+                    company = name.split(" ")[0]
+        
+        return OpenRouterModel(
+            id=model_data["id"],
+            name=model_data["name"],
+            description=model_data.get("description", ""),
+            context_length=model_data.get("context_length", 0),
+            pricing=model_data.get("pricing", {}),
+            company=company,
+            is_free=self._is_model_free(model_data),
+            tags=model_data.get("tags", [])
+        )
+    
+    def _load_catalog(self):
+        """Carrega o catálogo salvo em disco (sem rede) para o cache em memória"""
+        rows = self.catalog.load(MODEL_FIELDS)
+        if not rows:
+            return
+        self.models_cache = {row["id"]: OpenRouterModel(**row) for row in rows}
+        self.last_update = datetime.fromtimestamp(self.catalog.fetched_at) if self.catalog.fetched_at else None
+        self._build_model_index()
+        self.logger.info(f"Catálogo em disco: {len(self.models_cache)} modelos")
+    
+    def _catalog_rows(self) -> List[List[Any]]:
+        return [[getattr(model, field) for field in MODEL_FIELDS] for model in self.models_cache.values()]
+    
+    def is_catalog_fresh(self) -> bool:
+        """True se o catálogo foi buscado há menos de cache_duration segundos"""
+        if not self.models_cache or not self.last_update:
+            return False
+        return (datetime.now() - self.last_update).total_seconds() < self.cache_duration
+    
+    async def refresh_models(self, force: bool = False) -> Dict[str, Any]:
+        """Atualiza o catálogo com uma requisição condicional a /models.
         
-        # Verificar cache
-        if not force_refresh and self.models_cache and self.last_update:
-            time_diff = (datetime.now() - self.last_update).total_seconds()
-            if time_diff < self.cache_duration:
-                return list(self.models_cache.values())
+        Devolve o status ("fresh" sem requisição, "not_modified" para 304 ou
+        "modified") e os ids adicionados, removidos e alterados.
+        """
+        no_changes = {"added": [], "removed": [], "changed": []}
+        if not self.check_api_key():
+            return {"error": "API key não configurada"}
+        if not force and self.is_catalog_fresh():
+            return {"success": True, "status": "fresh", **no_changes}
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._open_session() as session:
                 headers = {
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 }
+                if self.models_cache:
+                    headers.update(self.catalog.conditional_headers())
                 
                 async with session.get(f"{self.base_url}/models", headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        models = []
-                        
-                        for model_data in data.get("data", []):
-                            # Extrair empresa do nome do modelo se não estiver disponível
-                            company = model_data.get("company", "Unknown")
-                            if company == "Unknown":
-                                # Tentar extrair empresa do nome do modelo
-                                name = model_data.get("name", "")
-                                if ":" in name:
-                                    company = name.split(":")[0].strip()
-                                elif " " in name and any(keyword in name.lower() for keyword in ["gpt", "claude", "gemini", "llama"]):
-                                    # Detectar empresas conhecidas
-                                    if "gpt" in name.lower():
-                                        company = "OpenAI"
-                                    elif "claude" in name.lower():
-                                        company = "Anthropic"
-                                    elif "gemini" in name.lower():
-                                        company = "Google"
-                                    elif "llama" in name.lower():
-                                        company = "Meta"
-                                    else:
-                                        company = name.split(" ")[0]
-                            
-                            model = OpenRouterModel(
-                                id=model_data["id"],
-                                name=model_data["name"],
-                                description=model_data.get("description", ""),
-                                context_length=model_data.get("context_length", 0),
-                                pricing=model_data.get("pricing", {}),
-                                company=company,
-                                is_free=self._is_model_free(model_data),
-                                tags=model_data.get("tags", [])
-                            )
-                            models.append(model)
-                            self.models_cache[model.id] = model
-                        
+                    if response.status == 304:
+                        self.catalog.touch(MODEL_FIELDS, self._catalog_rows())
                         self.last_update = datetime.now()
-                        self.logger.info(f"Carregados {len(models)} modelos")
-                        return models
-                    else:
+                        self.logger.info("Catálogo de modelos sem alterações (304)")
+                        return {"success": True, "status": "not_modified", **no_changes}
+                    
+                    if response.status != 200:
                         self.logger.error(f"Erro ao obter modelos: {response.status}")
-                        return []
-                        
+                        return {"error": f"Erro ao obter modelos: {response.status}"}
+                    
+                    data = await response.json()
+                    models = {}
+                    for model_data in data.get("data", []):
+                        model = self._model_from_data(model_data)
+                        models[model.id] = model
+                    
+                    changes = ModelCatalog.diff(self.models_cache, models)
+                    self.models_cache = models
+                    self.last_update = datetime.now()
+                    self._build_model_index()
+                    self.catalog.save(MODEL_FIELDS, self._catalog_rows(),
+                                      etag=response.headers.get("ETag"),
+                                      last_modified=response.headers.get("Last-Modified"))
+                    
+                    self.logger.info(f"Carregados {len(models)} modelos ({len(changes['added'])} novos, "
+                                     f"{len(changes['changed'])} alterados, {len(changes['removed'])} removidos)")
+                    return {"success": True, "status": "modified", **changes}
+        
         except Exception as e:
             self.logger.error(f"Erro ao obter modelos: {e}")
+            return {"error": str(e)}
+    
+    async def get_models(self, force_refresh: bool = False) -> List[OpenRouterModel]:
+        """Obtém lista de modelos disponíveis"""
+        if not self.check_api_key():
             return []
+        
+        # Catálogo em memória/disco ainda válido não faz requisição
+        result = await self.refresh_models(force=force_refresh)
+        if "error" in result and self.models_cache:
+            # Sem rede ou com erro na API, o catálogo salvo ainda serve
+            self.logger.warning("Usando catálogo de modelos salvo em disco")
+        return list(self.models_cache.values())
+    
+    def _build_model_index(self):
+        """Reconstrói o índice de prefixos do catálogo em cache"""
+        entries = []
+        for model in self.models_cache.values():
+            # Gratuitos primeiro entre modelos com o mesmo prefixo
+            weight = 1.0 if model.is_free else 0.0
+            entries.append((model.id, model.id, weight))
+            words = f"{model.id} {model.name} {model.company}".replace("/", " ").replace(":", " ").replace("-", " ")
+            entries.extend((word, model.id, weight) for word in words.split())
+        self.model_index.build(entries)
+    
+    def search_models(self, query: str, limit: Optional[int] = None) -> List[OpenRouterModel]:
+        """Modelos em que cada palavra de `query` é prefixo do id, nome ou empresa
+        (ex.: "claude son", "anthropic/cl"); consulta vazia devolve o catálogo inteiro"""
+        if not query.strip():
+            models = list(self.models_cache.values())
+            return models[:limit] if limit is not None else models
+        return [self.models_cache[model_id] for model_id in self.model_index.filter(query, limit)
+                if model_id in self.models_cache]
     
     def _is_model_free(self, model_data: Dict) -> bool:
         """Verifica se o modelo é gratuito"""
@@ -217,62 +363,350 @@ class OpenRouterManager:
         companies = list(set(m.company for m in models))
         return sorted(companies)
     
+    def _request_headers(self) -> Dict[str, str]:
+        """Cabeçalhos exigidos pela API do OpenRouter"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/your-repo",  # OpenRouter requer
+            "X-Title": "SUPER_AGENT_MCP_DOCKER_N8N"  # OpenRouter requer
+        }
+    
+    def _prepare_messages(self, model_id: str, messages: List[Dict], agent_type: str,
+                          context_docs: Optional[List[str]]) -> Tuple[List[Dict], Optional[Dict]]:
+        """Mensagens completas (prompt do agente + contexto empacotado) e relatório do empacotamento"""
+        system_prompt = self.agent_types.get(agent_type, {}).get("system_prompt", "")
+        
+        packing = None
+        if context_docs:
+            # Contexto limitado pelo context_length do modelo selecionado
+            model = self.models_cache.get(model_id)
+            prompt_text = system_prompt + "".join(str(message.get("content", "")) for message in messages)
+            budget = self.context_packer.budget_for(model.context_length if model else None, prompt_text)
+            packing = self.context_packer.pack(
+                [{"id": i, "title": f"Contexto {i + 1}", "text": str(doc)} for i, doc in enumerate(context_docs)],
+                budget)
+            system_prompt += f"\n\nContexto adicional:\n{packing.pop('context')}"
+        
+        return [{"role": "system", "content": system_prompt}] + messages, packing
+    
     async def chat_with_model(self, model_id: str, messages: List[Dict], 
-                            agent_type: str = "chat", context_docs: Optional[List[str]] = None) -> Dict:
-        """Chat com modelo específico"""
+                            agent_type: str = "chat", context_docs: Optional[List[str]] = None,
+                            use_cache: bool = True) -> Dict:
+        """Chat com modelo específico
+        
+        Com o cache de respostas habilitado, uma requisição idêntica (modelo,
+        mensagens completas, temperature e max_tokens) é respondida do disco.
+        `use_cache=False` ignora a entrada existente e grava a resposta nova.
+        """
         if not self.check_api_key():
             return {"error": "API key não configurada"}
         
+        started = time.perf_counter()
+        ttfb = None
         try:
             # Preparar mensagens com contexto do agente
-            system_prompt = self.agent_types.get(agent_type, {}).get("system_prompt", "")
+            full_messages, packing = self._prepare_messages(model_id, messages, agent_type, context_docs)
             
-            if context_docs:
-                context_text = "\n\n".join(context_docs)
-                system_prompt += f"\n\nContexto adicional:\n{context_text}"
+            payload = {
+                "model": model_id,
+                "messages": full_messages,
+                "temperature": 0.7,
+                "max_tokens": 2000
+            }
             
-            full_messages = [{"role": "system", "content": system_prompt}] + messages
+            cache_key = None
+            loop = asyncio.get_running_loop()
+            if self.response_cache is not None:
+                cache_key = LLMCache.make_key(model_id, full_messages, payload["temperature"], payload["max_tokens"])
+                # Leitura e escrita do cache são E/S de disco: fora do event loop
+                cached = (await loop.run_in_executor(None, self.response_cache.get, cache_key)
+                          if use_cache else None)
+                if cached is not None:
+                    self.logger.info(f"Resposta de {model_id} obtida do cache")
+                    return {
+                        "success": True,
+                        "response": cached["response"],
+                        "usage": cached.get("usage", {}),
+                        "model": model_id,
+                        "packing": packing,
+                        "attempts": 0,
+                        "cached": True
+                    }
             
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://github.com/your-repo",  # OpenRouter requer
-                    "X-Title": "SUPER_AGENT_MCP_DOCKER_N8N"  # OpenRouter requer
-                }
-                
-                payload = {
-                    "model": model_id,
-                    "messages": full_messages,
-                    "temperature": 0.7,
-                    "max_tokens": 2000
-                }
+            async with self._open_session() as session:
+                headers = self._request_headers()
                 
                 self.logger.info(f"Enviando requisição para modelo: {model_id}")
                 self.logger.debug(f"Headers: {headers}")
                 self.logger.debug(f"Payload: {payload}")
                 
-                async with session.post(f"{self.base_url}/chat/completions", 
-                                      headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "success": True,
-                            "response": data["choices"][0]["message"]["content"],
-                            "usage": data.get("usage", {}),
-                            "model": model_id
-                        }
-                    else:
-                        error_text = await response.text()
-                        self.logger.error(f"Erro na API OpenRouter: Status {response.status}, Response: {error_text}")
-                        return {"error": f"Erro na API: {error_text}"}
-                        
+                for attempt in range(self.rate_limiter.max_retries + 1):
+                    # Fichas da key/modelo e vaga na fila antes de cada tentativa
+                    async with self.rate_limiter.slot(model_id):
+                        started = time.perf_counter()
+                        ttfb = None
+                        async with session.post(f"{self.base_url}/chat/completions", 
+                                              headers=headers, json=payload) as response:
+                            ttfb = time.perf_counter() - started
+                            if response.status == 200:
+                                data = await response.json()
+                                usage = data.get("usage", {})
+                                self.router.record(model_id, ttfb, time.perf_counter() - started,
+                                                   usage.get("completion_tokens", 0), 200)
+                                content = data["choices"][0]["message"]["content"]
+                                if cache_key is not None:
+                                    await loop.run_in_executor(None, self.response_cache.put, cache_key,
+                                                               {"model": model_id, "response": content,
+                                                                "usage": usage})
+                                return {
+                                    "success": True,
+                                    "response": content,
+                                    "usage": usage,
+                                    "model": model_id,
+                                    "packing": packing,
+                                    "attempts": attempt + 1,
+                                    "cached": False
+                                }
+                            
+                            error_text = await response.text()
+                            self.router.record(model_id, ttfb, time.perf_counter() - started, 0, response.status)
+                            if not self.rate_limiter.should_retry(response.status, attempt):
+                                self.logger.error(f"Erro na API OpenRouter: Status {response.status}, Response: {error_text}")
+                                return {"error": f"Erro na API: {error_text}", "status": response.status,
+                                        "attempts": attempt + 1}
+                            delay = self.rate_limiter.backoff(model_id, attempt, response.status,
+                                                              response.headers.get("Retry-After"))
+                    # Espera fora da fila: a vaga fica livre para outras requisições
+                    await asyncio.sleep(delay)
+        
+        except QueueFullError as e:
+            self.logger.warning(f"Requisição recusada pelo limitador: {e}")
+            return {"error": str(e), "queue_full": True}
         except Exception as e:
+            self.router.record(model_id, ttfb, time.perf_counter() - started, 0, 0)
             self.logger.error(f"Erro no chat: {e}")
             return {"error": str(e)}
     
+    async def stream_chat(self, model_id: str, messages: List[Dict], agent_type: str = "chat",
+                          context_docs: Optional[List[str]] = None,
+                          cancel_event: Optional[threading.Event] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Chat em streaming: gerador assíncrono de eventos da resposta.
+        
+        Produz {"type": "delta", "content"} para cada pedaço de texto e
+        termina com {"type": "done", ...} (resposta completa, usage, ttft,
+        elapsed, cancelled e packing) ou {"type": "error", "error"}.
+        
+        `cancel_event` (threading.Event, para poder ser acionado pela thread
+        da interface) interrompe a leitura e fecha a conexão; o evento final
+        traz o texto recebido até ali com cancelled=True. Cancelar a task que
+        consome o gerador também fecha a conexão.
+        """
+        if not self.check_api_key():
+            yield {"type": "error", "error": "API key não configurada"}
+            return
+        
+        state = StreamState(model_id)
+        try:
+            full_messages, packing = self._prepare_messages(model_id, messages, agent_type, context_docs)
+            payload = {
+                "model": model_id,
+                "messages": full_messages,
+                "temperature": 0.7,
+                "max_tokens": 2000,
+                "stream": True
+            }
+            
+            self.logger.info(f"Iniciando stream com modelo: {model_id}")
+            async with self._open_session() as session:
+                for attempt in range(self.rate_limiter.max_retries + 1):
+                    # A vaga na fila fica ocupada durante todo o stream
+                    async with self.rate_limiter.slot(model_id):
+                        state.started = time.perf_counter()
+                        async with session.post(f"{self.base_url}/chat/completions",
+                                                headers=self._request_headers(), json=payload) as response:
+                            if response.status != 200:
+                                error_text = await response.text()
+                                self._record_stream(state, response.status)
+                                # Só se tenta de novo antes do primeiro token
+                                if not self.rate_limiter.should_retry(response.status, attempt):
+                                    self.logger.error(f"Erro na API OpenRouter: Status {response.status}, "
+                                                      f"Response: {error_text}")
+                                    yield {"type": "error", "error": f"Erro na API: {error_text}",
+                                           "status": response.status}
+                                    return
+                                delay = self.rate_limiter.backoff(model_id, attempt, response.status,
+                                                                  response.headers.get("Retry-After"))
+                            else:
+                                decoder = SSEDecoder()
+                                async for chunk in response.content.iter_any():
+                                    if cancel_event is not None and cancel_event.is_set():
+                                        yield state.result(cancelled=True, packing=packing)
+                                        return
+                                    for data in decoder.feed(chunk):
+                                        event = state.parse(data)
+                                        if event["type"] == "error":
+                                            self._record_stream(state, 0)
+                                        if event["type"] != "skip":
+                                            yield event
+                                        if event["type"] == "error":
+                                            return
+                                    if state.finished:
+                                        break
+                                for data in decoder.close():
+                                    event = state.parse(data)
+                                    if event["type"] != "skip":
+                                        yield event
+                                break
+                    await asyncio.sleep(delay)
+            
+            cancelled = bool(cancel_event is not None and cancel_event.is_set())
+            if not cancelled:
+                self._record_stream(state, 200)
+            yield state.result(cancelled=cancelled, packing=packing)
+        
+        except QueueFullError as e:
+            self.logger.warning(f"Stream recusado pelo limitador: {e}")
+            yield {"type": "error", "error": str(e), "queue_full": True}
+        except Exception as e:
+            self._record_stream(state, 0)
+            self.logger.error(f"Erro no stream: {e}")
+            yield {"type": "error", "error": str(e)}
+    
+    def estimate_cost(self, model_id: str, usage: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Custo em USD de uma resposta pelo pricing do modelo (None se o modelo for desconhecido)"""
+        model = self.models_cache.get(model_id)
+        if model is None or not usage:
+            return None
+        
+        def price(key: str) -> float:
+            try:
+                return float(model.pricing.get(key) or 0)
+            except (TypeError, ValueError):
+                return 0.0
+        
+        return (price("prompt") * usage.get("prompt_tokens", 0)
+                + price("completion") * usage.get("completion_tokens", 0)
+                + price("request"))
+    
+    async def _timed_chat(self, model_id: str, messages: List[Dict], agent_type: str,
+                          context_docs: Optional[List[str]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        # Sem cache de respostas: uma entrada em cache mediria 0 s e custo de tokens que não houve
+        result = await self.chat_with_model(model_id, messages, agent_type, context_docs, use_cache=False)
+        result["model"] = model_id
+        result["latency"] = time.perf_counter() - started
+        result["cost"] = self.estimate_cost(model_id, result.get("usage"))
+        return result
+    
+    async def compare_models(self, model_ids: List[str], messages: List[Dict], agent_type: str = "chat",
+                             context_docs: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Envia a mesma mensagem a vários modelos ao mesmo tempo.
+        
+        Gerador assíncrono: cada resultado sai assim que o modelo responde
+        (ordem de chegada), com latency, usage e cost (USD, pelo pricing do
+        catálogo). Todas as requisições compartilham uma sessão HTTP e vão
+        de fato aos modelos, sem passar pelo cache de respostas.
+        """
+        async with self._open_session() as session:
+            # As tasks copiam o contexto na criação e enxergam a sessão compartilhada
+            token = _shared_session.set(session)
+            try:
+                tasks = [asyncio.ensure_future(self._timed_chat(model_id, messages, agent_type, context_docs))
+                         for model_id in dict.fromkeys(model_ids)]
+            finally:
+                _shared_session.reset(token)
+            
+            try:
+                for arrival, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                    result = await next_done
+                    result["arrival"] = arrival
+                    yield result
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    def _record_stream(self, state: StreamState, status: int):
+        """Registra no roteador uma resposta em streaming (ttfb = primeiro token)"""
+        tokens = state.usage.get("completion_tokens") or len(state.parts)
+        self.router.record(state.model_id, state.ttft, time.perf_counter() - state.started, tokens, status)
+    
+    def select_model(self, free_only: bool = False, min_context_length: int = 0,
+                     company: Optional[str] = None, exclude: Tuple[str, ...] = ()) -> Optional[str]:
+        """Modelo com o melhor p95 recente entre os que atendem às restrições"""
+        ranked = self.router.rank(self.models_cache.values(), free_only=free_only,
+                                  min_context_length=min_context_length, company=company, exclude=exclude)
+        return ranked[0].id if ranked else None
+    
+    async def chat_routed(self, messages: List[Dict], agent_type: str = "chat",
+                          context_docs: Optional[List[str]] = None, free_only: bool = False,
+                          min_context_length: int = 0, company: Optional[str] = None,
+                          hedge: bool = True) -> Dict:
+        """Chat com o modelo escolhido pelo roteador.
+        
+        O melhor modelo recebe a requisição; se ele passar da latência
+        esperada (p95 recente), uma requisição de reserva vai para o segundo
+        colocado e vale a primeira resposta bem-sucedida. Um erro do modelo
+        principal também aciona o próximo candidato. O resultado traz
+        "routing" com os modelos tentados e o que respondeu.
+        """
+        ranked = self.router.rank(self.models_cache.values(), free_only=free_only,
+                                  min_context_length=min_context_length, company=company)
+        if not ranked:
+            return {"error": "Nenhum modelo atende às restrições"}
+        
+        candidates = [model.id for model in ranked]
+        routing = {"candidates": candidates[:5], "attempted": [], "hedged": False, "used": None}
+        pending: Dict[asyncio.Task, str] = {}
+        
+        def launch(model_id: str):
+            routing["attempted"].append(model_id)
+            task = asyncio.ensure_future(self.chat_with_model(model_id, messages, agent_type, context_docs))
+            pending[task] = model_id
+        
+        next_index = 0
+        last_error = {"error": "Nenhuma resposta"}
+        try:
+            launch(candidates[0])
+            next_index = 1
+            while pending:
+                timeout = None
+                if hedge and len(pending) == 1 and next_index < len(candidates) and not routing["hedged"]:
+                    timeout = self.router.hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    # Principal acima da latência esperada: disparar a reserva
+                    routing["hedged"] = True
+                    self.logger.info(f"Requisição de reserva para {candidates[next_index]}")
+                    launch(candidates[next_index])
+                    next_index += 1
+                    continue
+                
+                for task in done:
+                    model_id = pending.pop(task)
+                    result = task.result()
+                    if result.get("success"):
+                        routing["used"] = model_id
+                        result["routing"] = routing
+                        return result
+                    last_error = result
+                
+                # Falha sem outra requisição em andamento: tentar o próximo candidato
+                if not pending and next_index < len(candidates) and len(routing["attempted"]) < 3:
+                    launch(candidates[next_index])
+                    next_index += 1
+            
+            last_error["routing"] = routing
+            return last_error
+        finally:
+            # Requisições que perderam a corrida são canceladas sem entrar nas
+            # estatísticas: não falharam, e a lentidão já aparece no p95
+            for task in pending:
+                task.cancel()
+    
     async def generate_prd(self, model_id: str, project_description: str, 
-                          context_docs: Optional[List[str]] = None) -> Dict:
+                          context_docs: Optional[List[str]] = None, use_cache: bool = True) -> Dict:
         """Gera PRD completo para projeto"""
         prompt = f"""
         Crie um Product Requirements Document (PRD) completo e detalhado para o seguinte projeto:
@@ -297,10 +731,10 @@ class OpenRouterManager:
         """
         
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat_with_model(model_id, messages, "prompt", context_docs)
+        return await self.chat_with_model(model_id, messages, "prompt", context_docs, use_cache=use_cache)
     
     async def generate_tasks(self, model_id: str, prd_content: str, 
-                           context_docs: Optional[List[str]] = None) -> Dict:
+                           context_docs: Optional[List[str]] = None, use_cache: bool = True) -> Dict:
         """Gera arquivo de tasks baseado no PRD"""
         prompt = f"""
         Com base no seguinte PRD, crie um arquivo de tasks detalhado para desenvolvimento:
@@ -329,10 +763,10 @@ class OpenRouterManager:
         """
         
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat_with_model(model_id, messages, "prompt", context_docs)
+        return await self.chat_with_model(model_id, messages, "prompt", context_docs, use_cache=use_cache)
     
     async def generate_n8n_workflow(self, model_id: str, workflow_description: str,
-                                  context_docs: Optional[List[str]] = None) -> Dict:
+                                  context_docs: Optional[List[str]] = None, use_cache: bool = True) -> Dict:
         """Gera workflow N8N com Docker Compose"""
         prompt = f"""
         Crie um workflow N8N completo para:
@@ -351,10 +785,11 @@ class OpenRouterManager:
         """
         
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat_with_model(model_id, messages, "n8n", context_docs)
+        return await self.chat_with_model(model_id, messages, "n8n", context_docs, use_cache=use_cache)
     
     async def generate_deploy_script(self, model_id: str, project_info: str,
-                                   target_platform: str, context_docs: Optional[List[str]] = None) -> Dict:
+                                   target_platform: str, context_docs: Optional[List[str]] = None,
+                                   use_cache: bool = True) -> Dict:
         """Gera script de deploy para plataforma específica"""
         prompt = f"""
         Crie um script de deploy completo para {target_platform}:
@@ -374,7 +809,7 @@ class OpenRouterManager:
         """
         
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat_with_model(model_id, messages, "deploy", context_docs)
+        return await self.chat_with_model(model_id, messages, "deploy", context_docs, use_cache=use_cache)
     
     def save_memory(self, prompt: str, response: str, agent_type: str, 
                    model_id: str, context_used: Optional[List[str]] = None):
@@ -474,5 +909,9 @@ class OpenRouterManager:
             "api_key_configured": bool(self.api_key),
             "models_cached": len(self.models_cache),
             "last_update": self.last_update.isoformat() if self.last_update else None,
-            "agent_types": list(self.agent_types.keys())
+            "agent_types": list(self.agent_types.keys()),
+            "runtime": self.runtime.get_stats(),
+            "model_stats": self.router.stats(),
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "response_cache": self.response_cache.get_stats() if self.response_cache is not None else None
         } 
\ No newline at end of file
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Prefix Index
+------------
+Índice de prefixos (vocabulário ordenado + bisect) para autocompletar:
+termos da base RAG e modelos do catálogo OpenRouter.
+
+As chaves ficam numa lista ordenada; os itens com um prefixo formam um
+intervalo contíguo encontrado com duas buscas binárias. Prefixos curtos
+(que cobrem muitos itens) têm o resultado memorizado, de modo que as
+consultas do "search-as-you-type" levam microssegundos.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import Dict, List, Any, Callable, Hashable, Iterable, Optional, Tuple
+
+# Maior code point: prefixo + MAX_CHAR é maior que qualquer chave com esse prefixo
+MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Chaves ordenadas -> valores, com completar por prefixo e filtro por palavras"""
+
+    def __init__(self, normalize: Callable[[str], str] = str.lower, memo_prefix_length: int = 2):
+        """
+        Args:
+            normalize: normalização aplicada às chaves e às consultas
+            memo_prefix_length: prefixos até este tamanho têm o resultado memorizado
+        """
+        self.normalize = normalize
+        self.memo_prefix_length = memo_prefix_length
+        self._keys: List[str] = []
+        self._values: List[Hashable] = []
+        self._weights: List[float] = []
+        self._memo: Dict[Tuple[str, int], List[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build(self, entries: Iterable[Tuple[str, Hashable, float]]):
+        """Reconstrói o índice a partir de (chave, valor, peso); um valor pode ter várias chaves"""
+        # Ordenar só pela chave: os valores não precisam ser comparáveis
+        normalized = sorted(((self.normalize(key), weight, value) for key, value, weight in entries if key),
+                            key=lambda entry: entry[0])
+        self._keys = [key for key, _, _ in normalized]
+        self._weights = [weight for _, weight, _ in normalized]
+        self._values = [value for _, _, value in normalized]
+        self._memo = {}
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        low = bisect_left(self._keys, prefix)
+        high = bisect_left(self._keys, prefix + MAX_CHAR, low)
+        return low, high
+
+    def _best(self, low: int, high: int) -> Dict[Hashable, float]:
+        """Maior peso de cada valor no intervalo (valores na ordem das chaves)"""
+        best: Dict[Hashable, float] = {}
+        values, weights = self._values, self._weights
+        for i in range(low, high):
+            value = values[i]
+            if value not in best or weights[i] > best[value]:
+                best[value] = weights[i]
+        return best
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Hashable]:
+        """Valores cujas chaves começam com `prefix`, por peso (empate: ordem alfabética)"""
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+
+        memo_key = (prefix, limit)
+        if len(prefix) <= self.memo_prefix_length and memo_key in self._memo:
+            return list(self._memo[memo_key])
+
+        best = self._best(*self._range(prefix))
+        result = [value for value, _ in heapq.nlargest(limit, best.items(), key=lambda item: item[1])]
+
+        if len(prefix) <= self.memo_prefix_length:
+            self._memo[memo_key] = result
+        return list(result)
+
+    def filter(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """Valores em que cada palavra da consulta é prefixo de alguma chave"""
+        words = self.normalize(query).split()
+        if not words:
+            return []
+
+        ranges = sorted((self._range(word) for word in words), key=lambda r: r[1] - r[0])
+        best = self._best(*ranges[0])
+        for low, high in ranges[1:]:
+            if not best:
+                break
+            allowed = set(self._values[low:high])
+            best = {value: weight for value, weight in best.items() if value in allowed}
+
+        if limit is None:
+            return [value for value, _ in sorted(best.items(), key=lambda item: item[1], reverse=True)]
+        return [value for value, _ in heapq.nlargest(limit, best.items(), key=lambda item: item[1])]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._keys), "values": len(set(self._values)), "memoized": len(self._memo)}
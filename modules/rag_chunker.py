@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Chunker
+-----------
+Divide documentos em chunks para indexação e recuperação no
+AdvancedRAGSystem:
+- Markdown: divisão por títulos (cada seção vira um ou mais chunks)
+- PDF: divisão por página (usando os marcadores "--- Página N ---")
+- Demais formatos: janelas fixas de tokens com sobreposição
+
+Os chunks são descritos por offsets (start, end) no conteúdo do documento,
+sem duplicar o texto.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import re
+import logging
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger("RAG_CHUNKER")
+
+TOKEN_PATTERN = re.compile(r"\S+")
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+PAGE_MARKER_PATTERN = re.compile(r"--- Página (\d+) ---")
+
+
+class Chunker:
+    """Gera chunks (start, end, page, heading) para um documento"""
+
+    def __init__(self, window_tokens: int = 200, overlap_tokens: int = 40):
+        if overlap_tokens >= window_tokens:
+            raise ValueError("overlap_tokens deve ser menor que window_tokens")
+        self.window_tokens = window_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def chunk(self, content: str, metadata: Optional[Dict[str, Any]] = None,
+              base_offset: int = 0, page: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Escolhe a estratégia pelo formato do documento.
+
+        `base_offset` desloca os offsets retornados (usado quando o texto é
+        um bloco de um documento maior, como na extração de PDF em streaming).
+        `page` é a página do texto anterior ao primeiro marcador do bloco
+        (continuação de uma página fatiada entre blocos).
+        """
+        doc_format = (metadata or {}).get("format", "")
+
+        if doc_format == "MARKDOWN":
+            chunks = self._chunk_markdown(content)
+        elif doc_format == "PDF":
+            chunks = self._chunk_pages(content, page)
+        else:
+            chunks = self._chunk_windows(content, 0, len(content))
+
+        if base_offset:
+            for chunk in chunks:
+                chunk["start"] += base_offset
+                chunk["end"] += base_offset
+        return chunks
+
+    def _chunk_windows(self, content: str, start: int, end: int,
+                       extra: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Janelas de `window_tokens` tokens com `overlap_tokens` de sobreposição"""
+        tokens = [match.span() for match in TOKEN_PATTERN.finditer(content, start, end)]
+        if not tokens:
+            return []
+
+        step = self.window_tokens - self.overlap_tokens
+        chunks = []
+        for first in range(0, len(tokens), step):
+            window = tokens[first:first + self.window_tokens]
+            chunk = {"start": window[0][0], "end": window[-1][1]}
+            if extra:
+                chunk.update(extra)
+            chunks.append(chunk)
+            if first + self.window_tokens >= len(tokens):
+                break
+        return chunks
+
+    def _chunk_markdown(self, content: str) -> List[Dict[str, Any]]:
+        """Uma seção por título; seções longas são subdivididas em janelas"""
+        headings = list(HEADING_PATTERN.finditer(content))
+        boundaries = [(0, None)] + [(match.start(), match.group(2).strip()) for match in headings]
+
+        chunks = []
+        for position, (start, heading) in enumerate(boundaries):
+            end = boundaries[position + 1][0] if position + 1 < len(boundaries) else len(content)
+            extra = {"heading": heading} if heading else None
+            chunks.extend(self._chunk_windows(content, start, end, extra))
+        return chunks
+
+    def _chunk_pages(self, content: str, page: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Um ou mais chunks por página, com o número da página"""
+        leading = {"page": page} if page is not None else None
+        markers = list(PAGE_MARKER_PATTERN.finditer(content))
+        if not markers:
+            return self._chunk_windows(content, 0, len(content), leading)
+
+        chunks = []
+        if markers[0].start() > 0:
+            chunks.extend(self._chunk_windows(content, 0, markers[0].start(), leading))
+
+        for position, marker in enumerate(markers):
+            end = markers[position + 1].start() if position + 1 < len(markers) else len(content)
+            chunks.extend(self._chunk_windows(content, marker.end(), end, {"page": int(marker.group(1))}))
+        return chunks
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Filters
+-----------
+Bitmaps de metadados para filtrar buscas do AdvancedRAGSystem por
+categoria, formato, tipo de fonte e data de inclusão.
+
+Cada chunk recebe um slot inteiro; para cada valor de atributo há um
+bitmap (int do Python) com os slots dos chunks que têm esse valor. Um
+filtro é resolvido com OR entre os valores de um atributo e AND entre
+atributos, antes da pontuação: o BM25 só visita os chunks selecionados,
+e quanto mais estreito o filtro, menos trabalho a busca faz.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Union
+
+# Atributos indexados (filtros de data usam date_from / date_to sobre "date")
+ATTRIBUTES = ("category", "format", "source", "date")
+
+FilterValue = Union[str, Iterable[str]]
+
+
+class MetadataBitmaps:
+    """Bitmaps atributo -> valor -> slots de chunks"""
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        # id -> atributos com que foi registrado (para limpar os bits na remoção)
+        self._attributes: Dict[str, Dict[str, str]] = {}
+        self.bitmaps: Dict[str, Dict[str, int]] = {name: {} for name in ATTRIBUTES}
+        self._sorted_dates: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._slots
+
+    def add(self, item_id: str, attributes: Dict[str, Optional[str]]):
+        """Registra (ou atualiza) os atributos de um chunk"""
+        self.add_many([(item_id, attributes)])
+
+    def add_many(self, items: Iterable[Tuple[str, Dict[str, Optional[str]]]]):
+        """Registra vários chunks de uma vez.
+
+        Os slots de cada valor são acumulados e o bitmap é montado uma única
+        vez (bytearray -> int) e combinado com um só OR: carregar n chunks
+        custa O(n) por valor, em vez de recriar o int a cada chunk.
+        """
+        # Chunks de um mesmo documento compartilham o dict de atributos: agrupar por ele
+        # (o grupo guarda a referência, então o id() não é reaproveitado durante o laço)
+        groups: Dict[int, Tuple[Dict[str, Optional[str]], Dict[str, str], List[int]]] = {}
+        for item_id, attributes in items:
+            if item_id in self._slots:
+                self.remove(item_id)
+
+            slot = self._free.pop() if self._free else len(self._ids)
+            if slot == len(self._ids):
+                self._ids.append(item_id)
+            else:
+                self._ids[slot] = item_id
+            self._slots[item_id] = slot
+
+            group = groups.get(id(attributes))
+            if group is None:
+                stored = {name: attributes[name] for name in ATTRIBUTES if attributes.get(name) is not None}
+                group = groups[id(attributes)] = (attributes, stored, [])
+            group[2].append(slot)
+            self._attributes[item_id] = group[1]
+
+        positions: Dict[Tuple[str, str], List[int]] = {}
+        for _, stored, slots in groups.values():
+            for name, value in stored.items():
+                positions.setdefault((name, value), []).extend(slots)
+
+        for (name, value), slots in positions.items():
+            values = self.bitmaps[name]
+            if name == "date" and value not in values:
+                self._sorted_dates = None
+            values[value] = values.get(value, 0) | self._bitmap_from_slots(slots)
+
+    @staticmethod
+    def _bitmap_from_slots(slots: List[int]) -> int:
+        data = bytearray(max(slots) // 8 + 1)
+        for slot in slots:
+            data[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(data, "little")
+
+    def remove(self, item_id: str):
+        slot = self._slots.pop(item_id, None)
+        if slot is None:
+            return
+
+        mask = ~(1 << slot)
+        for name, value in self._attributes.pop(item_id).items():
+            values = self.bitmaps[name]
+            values[value] &= mask
+            if not values[value]:
+                del values[value]
+                if name == "date":
+                    self._sorted_dates = None
+
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def _dates(self) -> List[str]:
+        if self._sorted_dates is None:
+            self._sorted_dates = sorted(self.bitmaps["date"])
+        return self._sorted_dates
+
+    def _union(self, name: str, value: FilterValue) -> int:
+        values = [value] if isinstance(value, str) else list(value)
+        bitmap = 0
+        for item in values:
+            bitmap |= self.bitmaps[name].get(item, 0)
+        return bitmap
+
+    def select(self, filters: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Bitmap dos chunks que atendem aos filtros (None = sem restrição).
+
+        `filters` aceita category, format e source (um valor ou uma lista de
+        valores) e date_from / date_to ("AAAA-MM-DD", inclusivos).
+        """
+        if not filters:
+            return None
+
+        selected = None
+        for name in ("category", "format", "source"):
+            value = filters.get(name)
+            if value is None:
+                continue
+            bitmap = self._union(name, value)
+            selected = bitmap if selected is None else selected & bitmap
+            if not selected:
+                return 0
+
+        date_from, date_to = filters.get("date_from"), filters.get("date_to")
+        if date_from is not None or date_to is not None:
+            dates = self._dates()
+            low = bisect_left(dates, date_from[:10]) if date_from else 0
+            high = bisect_right(dates, date_to[:10]) if date_to else len(dates)
+            bitmap = self._union("date", dates[low:high])
+            selected = bitmap if selected is None else selected & bitmap
+
+        return selected
+
+    def members(self, bitmap: int) -> List[str]:
+        """Ids dos chunks de um bitmap (custo proporcional aos bytes não nulos)"""
+        ids = self._ids
+        members = []
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        for index, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                members.append(ids[index * 8 + low.bit_length() - 1])
+                byte ^= low
+        return members
+
+    def contains(self, bitmap: int, item_id: str) -> bool:
+        slot = self._slots.get(item_id)
+        return slot is not None and bool(bitmap >> slot & 1)
+
+    @staticmethod
+    def count(bitmap: int) -> int:
+        return bin(bitmap).count("1")
+
+    def values(self) -> Dict[str, List[str]]:
+        """Valores disponíveis de cada atributo (para montar filtros na interface)"""
+        return {name: sorted(values) for name, values in self.bitmaps.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self._slots),
+            "slots": len(self._ids),
+            "values": {name: len(values) for name, values in self.bitmaps.items()}
+        }
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Index
+---------
+Índice invertido posicional com pontuação BM25 usado pelo AdvancedRAGSystem.
+
+Cada termo guarda seus postings (doc_id -> posições do termo no documento)
+e cada documento guarda seu comprimento em termos e o offset de caractere
+de cada token. Com isso consultas por frase ("docker compose up"), bônus
+de proximidade e snippets centrados nos termos encontrados saem só dos
+postings, sem reler o texto dos documentos.
+
+As posições são ordinais entre todos os tokens do texto (inclusive
+stopwords, que não são indexadas), de modo que a distância entre termos
+é a mesma da frase original.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import math
+import heapq
+import logging
+from typing import Dict, List, Any, Optional, Iterable, Sequence, Set, Tuple
+
+logger = logging.getLogger("RAG_INDEX")
+
+INDEX_FORMAT_VERSION = 2
+
+# Frase da consulta: [(termo, distância até o primeiro termo da frase)]
+Phrase = List[Tuple[str, int]]
+
+
+class InvertedIndex:
+    """Índice invertido com postings (doc_id, posições) e ranking BM25"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, List[int]]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        # doc_id -> offset de caractere de cada token (índice = posição)
+        self.offsets: Dict[str, List[int]] = {}
+        self.total_length = 0
+        # Incrementado a cada alteração (estruturas derivadas sabem quando reconstruir)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self.postings)
+
+    @property
+    def average_length(self) -> float:
+        if not self.doc_lengths:
+            return 0.0
+        return self.total_length / len(self.doc_lengths)
+
+    def add_document(self, doc_id: str, terms: Sequence[str], positions: Optional[Sequence[int]] = None,
+                     offsets: Optional[Sequence[int]] = None):
+        """Indexa (ou reindexa) um documento.
+
+        `positions` traz a posição de cada termo (por padrão 0, 1, 2...) e
+        `offsets` o offset de caractere de cada token, usado nos snippets.
+        """
+        if doc_id in self.doc_lengths:
+            self.remove_document(doc_id)
+
+        self.doc_lengths[doc_id] = 0
+        self.offsets[doc_id] = []
+        self.extend_document(doc_id, terms, positions, offsets)
+
+    def extend_document(self, doc_id: str, terms: Sequence[str], positions: Optional[Sequence[int]] = None,
+                        offsets: Optional[Sequence[int]] = None):
+        """Acrescenta termos a um documento já indexado (indexação incremental por partes).
+
+        Posições e offsets são relativos à parte acrescentada e continuam
+        a numeração das partes anteriores.
+        """
+        if positions is None:
+            positions = range(len(terms))
+        base = len(self.offsets.get(doc_id, ()))
+        if base == 0 and doc_id in self.doc_lengths and self.doc_lengths[doc_id]:
+            # Documento sem offsets: continuar depois da última posição conhecida
+            base = max((max(plist) for plist in self._document_postings(doc_id).values()), default=-1) + 1
+
+        for term, position in zip(terms, positions):
+            self.postings.setdefault(term, {}).setdefault(doc_id, []).append(base + position)
+
+        if offsets is not None:
+            self.offsets.setdefault(doc_id, []).extend(offsets)
+
+        self.doc_lengths[doc_id] = self.doc_lengths.get(doc_id, 0) + len(terms)
+        self.total_length += len(terms)
+        self.version += 1
+
+    def _document_postings(self, doc_id: str) -> Dict[str, List[int]]:
+        return {term: postings[doc_id] for term, postings in self.postings.items() if doc_id in postings}
+
+    def remove_document(self, doc_id: str, terms: Optional[Iterable[str]] = None):
+        """Remove um documento do índice.
+
+        Se os termos do documento forem informados, só os postings desses
+        termos são visitados; caso contrário o vocabulário inteiro é varrido.
+        """
+        if doc_id not in self.doc_lengths:
+            return
+
+        candidates = set(terms) if terms is not None else list(self.postings.keys())
+        for term in candidates:
+            postings = self.postings.get(term)
+            if postings and doc_id in postings:
+                del postings[doc_id]
+                if not postings:
+                    del self.postings[term]
+
+        self.offsets.pop(doc_id, None)
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.version += 1
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def document_frequencies(self) -> Iterable[Tuple[str, int]]:
+        """(termo, número de documentos) de todo o vocabulário"""
+        return ((term, len(postings)) for term, postings in self.postings.items())
+
+    def idf(self, term: str) -> float:
+        """IDF do BM25 (variante sempre positiva)"""
+        df = self.document_frequency(term)
+        n = len(self.doc_lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def positions(self, doc_id: str, term: str) -> List[int]:
+        """Posições de um termo no documento"""
+        return self.postings.get(term, {}).get(doc_id, [])
+
+    def search(self, query_terms: Iterable[str], limit: Optional[int] = None,
+               phrases: Optional[List[Phrase]] = None, proximity_weight: float = 0.0,
+               rerank_depth: int = 100, candidates: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Retorna [(doc_id, score)] ordenado por relevância BM25.
+
+        Documentos que não contêm todas as `phrases` são descartados. Com
+        `proximity_weight`, os `rerank_depth` melhores recebem um bônus
+        proporcional à compacidade da menor janela com os termos da consulta.
+        `candidates` restringe a busca a esses documentos (filtros de
+        metadados); cada posting é intersectado antes da pontuação.
+        """
+        if not self.doc_lengths or candidates is not None and not candidates:
+            return []
+
+        terms = set(query_terms)
+        for phrase in phrases or ():
+            terms.update(term for term, _ in phrase)
+
+        avgdl = self.average_length or 1.0
+        k1, b = self.k1, self.b
+        scores: Dict[str, float] = {}
+
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            idf = self.idf(term)
+            if candidates is None:
+                matches = postings.items()
+            elif len(candidates) < len(postings):
+                # Filtro estreito: percorrer os candidatos em vez do posting
+                matches = [(doc_id, postings[doc_id]) for doc_id in candidates if doc_id in postings]
+            else:
+                matches = [(doc_id, term_positions) for doc_id, term_positions in postings.items()
+                           if doc_id in candidates]
+            for doc_id, term_positions in matches:
+                tf = len(term_positions)
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        for phrase in phrases or ():
+            scores = {doc_id: score for doc_id, score in scores.items() if self.phrase_positions(doc_id, phrase)}
+
+        if proximity_weight and len(terms) > 1 and scores:
+            top = heapq.nlargest(max(rerank_depth, limit or 0), scores.items(), key=lambda item: item[1])
+            for doc_id, score in top:
+                window = self.best_window(doc_id, terms)
+                if window is not None and window[2] > 1:
+                    start, end, matched = window
+                    scores[doc_id] = score * (1 + proximity_weight * matched / (end - start + 1))
+
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def phrase_positions(self, doc_id: str, phrase: Phrase) -> List[int]:
+        """Posições onde a frase começa no documento"""
+        if not phrase:
+            return []
+        first_term, first_offset = phrase[0]
+        starts = {position - first_offset for position in self.positions(doc_id, first_term)}
+        for term, offset in phrase[1:]:
+            if not starts:
+                break
+            starts &= {position - offset for position in self.positions(doc_id, term)}
+        return sorted(starts)
+
+    def best_window(self, doc_id: str, terms: Iterable[str], max_span: int = 40) -> Optional[Tuple[int, int, int]]:
+        """Janela mais densa de termos da consulta: (posição inicial, final, termos distintos).
+
+        Prioriza o número de termos distintos e, no empate, a janela mais curta
+        (no máximo `max_span` posições).
+        """
+        hits = sorted((position, term) for term in set(terms) for position in self.positions(doc_id, term))
+        if not hits:
+            return None
+
+        best = None
+        counts: Dict[str, int] = {}
+        left = 0
+        for right, (position, term) in enumerate(hits):
+            counts[term] = counts.get(term, 0) + 1
+            while position - hits[left][0] >= max_span:
+                left_term = hits[left][1]
+                counts[left_term] -= 1
+                if not counts[left_term]:
+                    del counts[left_term]
+                left += 1
+            # Encolher pela esquerda enquanto o termo da ponta se repete na janela
+            while counts[hits[left][1]] > 1:
+                counts[hits[left][1]] -= 1
+                left += 1
+            candidate = (len(counts), -(position - hits[left][0]), hits[left][0], position)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+        return best[2], best[3], best[0]
+
+    def char_span(self, doc_id: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Intervalo de caracteres (início do token `start`, início do token após `end`)"""
+        offsets = self.offsets.get(doc_id)
+        if not offsets or start >= len(offsets):
+            return None
+        char_end = offsets[end + 1] if end + 1 < len(offsets) else None
+        return offsets[start], char_end
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa o índice para persistência em JSON"""
+        return {
+            "version": INDEX_FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+            "offsets": self.offsets
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvertedIndex":
+        """Reconstrói o índice a partir de to_dict()"""
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        index.postings = {term: dict(postings) for term, postings in data.get("postings", {}).items()}
+        index.doc_lengths = dict(data.get("doc_lengths", {}))
+        index.offsets = dict(data.get("offsets", {}))
+        index.total_length = sum(index.doc_lengths.values())
+        return index
+
+    @staticmethod
+    def is_serialized_index(data: Any) -> bool:
+        """Indica se `data` veio de to_dict() desta versão (e não de um formato antigo)"""
+        return (isinstance(data, dict) and "postings" in data and "doc_lengths" in data
+                and data.get("version") == INDEX_FORMAT_VERSION)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Query Cache
+---------------
+Cache LRU de resultados de busca do AdvancedRAGSystem.
+
+As entradas são chaveadas por (consulta normalizada, categoria, limite,
+modo) e registram os termos da consulta. Quando um documento entra ou sai
+do índice, só as entradas que compartilham termos com ele (e cuja
+categoria pode incluí-lo) são descartadas; o contador de geração permite
+invalidar tudo de uma vez sem varrer o cache.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Set
+
+
+class QueryCache:
+    """Cache LRU de buscas com invalidação por termos e por geração"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        # chave -> {"result", "terms", "category", "generation", "size"}
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._term_keys: Dict[str, Set[Tuple]] = {}
+        # Entradas que dependem de qualquer documento (ex.: busca semântica)
+        self._global_keys: Set[Tuple] = set()
+        self._min_generation = 0
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(query: str, category: Optional[str], limit: int, mode: str,
+                 filters: Optional[Dict[str, Any]] = None) -> Tuple:
+        frozen = tuple(sorted((name, value if isinstance(value, (str, type(None))) else tuple(value))
+                              for name, value in (filters or {}).items()))
+        return (" ".join(query.lower().split()), category, limit, mode, frozen)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["generation"] < self._min_generation:
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["result"]
+
+    def put(self, key: Tuple, result: Dict[str, Any], terms: Optional[Iterable[str]], category: Optional[str]):
+        """Guarda um resultado; `terms=None` invalida a entrada a qualquer alteração"""
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+
+            terms = frozenset(terms) if terms is not None else None
+            size = self._estimate_size(result)
+            self._entries[key] = {
+                "result": result,
+                "terms": terms,
+                "category": category,
+                "generation": self.generation,
+                "size": size
+            }
+            self._memory_bytes += size
+
+            if terms is None:
+                self._global_keys.add(key)
+            else:
+                for term in terms:
+                    self._term_keys.setdefault(term, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, terms: Iterable[str], category: Optional[str]) -> int:
+        """Descarta as entradas afetadas por um documento com estes termos e categoria"""
+        with self._lock:
+            self.generation += 1
+            stale = set(self._global_keys)
+            for term in set(terms):
+                stale.update(self._term_keys.get(term, ()))
+
+            removed = 0
+            for key in stale:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry["category"] is not None and category is not None and entry["category"] != category:
+                    continue
+                self._discard(key)
+                removed += 1
+
+            self.invalidations += removed
+            return removed
+
+    def invalidate_all(self):
+        """Invalida tudo (as entradas antigas são descartadas ao serem lidas)"""
+        with self._lock:
+            self.generation += 1
+            self._min_generation = self.generation
+
+    def _discard(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._memory_bytes -= entry["size"]
+        if entry["terms"] is None:
+            self._global_keys.discard(key)
+            return
+        for term in entry["terms"]:
+            keys = self._term_keys.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._term_keys[term]
+
+    @staticmethod
+    def _estimate_size(result: Dict[str, Any]) -> int:
+        """Estimativa barata do tamanho do resultado em bytes"""
+        size = sys.getsizeof(result)
+        for item in result.get("results", []):
+            size += sys.getsizeof(item) + sum(sys.getsizeof(value) for value in item.values())
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+                "memory_bytes": self._memory_bytes
+            }
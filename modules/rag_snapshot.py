@@ -0,0 +1,483 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Snapshot
+------------
+Snapshot binário versionado do índice invertido do AdvancedRAGSystem.
+
+Em vez de carregar o índice inteiro com json.load na inicialização, o
+checkpoint grava o índice num arquivo binário aberto via mmap:
+
+- tabela de strings ordenada para o vocabulário e outra para os ids dos
+  documentos (chunks), com busca binária direto no arquivo
+- arrays NumPy para os postings (documentos e posições de cada termo),
+  comprimentos e offsets de caractere dos documentos
+- a tabela de chunks do AdvancedRAGSystem (id -> registro JSON), para que
+  o checkpoint JSON não precise carregá-la inteira (versão 2)
+
+Abrir o snapshot custa só a leitura do cabeçalho; cada termo ou documento
+é lido (e paginado pelo sistema operacional) na primeira vez que uma
+consulta precisa dele. Alterações posteriores ficam em memória por cima do
+snapshot até o próximo checkpoint.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import os
+import json
+import mmap
+import struct
+import threading
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, List, Any, Callable, Iterator, Optional, Set, Tuple, Union
+
+try:
+    import numpy as np
+    SNAPSHOT_AVAILABLE = True
+except ImportError:
+    SNAPSHOT_AVAILABLE = False
+
+from .rag_index import InvertedIndex
+
+MAGIC = b"RAGSNAP\0"
+SNAPSHOT_VERSION = 2
+# Versão 1: sem a tabela de chunks
+SUPPORTED_VERSIONS = (1, 2)
+
+# magic, versão, tamanho do cabeçalho JSON
+PREAMBLE = struct.Struct("<8sII")
+
+# Seções do arquivo: nome -> dtype
+SECTIONS = {
+    "terms_blob": "u1",       # vocabulário (UTF-8 concatenado, ordenado)
+    "terms_ptr": "<i8",       # início de cada termo em terms_blob (+ fim)
+    "term_postings": "<i8",   # início dos postings de cada termo (+ fim)
+    "post_docs": "<i4",       # número do documento de cada posting
+    "post_ptr": "<i8",        # início das posições de cada posting (+ fim)
+    "positions": "<i4",
+    "docs_blob": "u1",        # ids dos documentos (UTF-8 concatenado, ordenado)
+    "docs_ptr": "<i8",
+    "doc_lengths": "<i4",
+    "offsets_ptr": "<i8",     # início dos offsets de cada documento (+ fim)
+    "offsets": "<i8",
+    "chunk_ids_blob": "u1",   # ids da tabela de chunks (UTF-8 concatenado, ordenado)
+    "chunk_ids_ptr": "<i8",
+    "chunks_blob": "u1",      # registro JSON de cada chunk, na ordem dos ids
+    "chunks_ptr": "<i8"
+}
+
+
+def _align(value: int) -> int:
+    return (value + 7) & ~7
+
+
+def _string_table(values: List[str]) -> Tuple[bytes, array]:
+    encoded = [value.encode('utf-8') for value in values]
+    pointers = array('q', [0])
+    pointers.extend(accumulate(len(item) for item in encoded))
+    return b"".join(encoded), pointers
+
+
+def write_snapshot(path: Union[str, Path], index: InvertedIndex, chunks: Optional[Mapping[str, Any]] = None):
+    """Grava o índice (e a tabela de chunks, se informada) no formato binário.
+
+    Escrita atômica: temporário + fsync + os.replace.
+    """
+    if not SNAPSHOT_AVAILABLE:
+        raise RuntimeError("NumPy não disponível para o snapshot binário")
+
+    path = Path(path)
+    postings = index.postings
+    doc_lengths = index.doc_lengths
+    offsets = index.offsets
+    # Índice carregado de outro snapshot: ler sem materializar tudo em memória
+    read_postings = postings.peek if isinstance(postings, SnapshotMapping) else postings.__getitem__
+
+    def read_offsets(doc_id: str) -> Optional[List[int]]:
+        if not isinstance(offsets, SnapshotMapping):
+            return offsets.get(doc_id)
+        try:
+            return offsets.peek(doc_id)
+        except KeyError:
+            return None
+
+    terms = sorted(postings)
+    doc_ids = sorted(doc_lengths)
+    doc_numbers = {doc_id: number for number, doc_id in enumerate(doc_ids)}
+
+    term_postings = array('q', [0])
+    post_docs = array('i')
+    post_ptr = array('q', [0])
+    positions = array('i')
+    for term in terms:
+        entries = sorted((doc_numbers[doc_id], term_positions)
+                         for doc_id, term_positions in read_postings(term).items())
+        for number, term_positions in entries:
+            post_docs.append(number)
+            positions.extend(term_positions)
+            post_ptr.append(len(positions))
+        term_postings.append(len(post_docs))
+
+    lengths = array('i', (doc_lengths[doc_id] for doc_id in doc_ids))
+    offsets_ptr = array('q', [0])
+    doc_offsets = array('q')
+    for doc_id in doc_ids:
+        doc_offsets.extend(read_offsets(doc_id) or ())
+        offsets_ptr.append(len(doc_offsets))
+
+    chunk_ids = sorted(chunks) if chunks is not None else []
+    read_chunk = chunks.peek if isinstance(chunks, SnapshotMapping) else (chunks or {}).__getitem__
+    chunk_records = [json.dumps(read_chunk(chunk_id), ensure_ascii=False, separators=(',', ':'))
+                     for chunk_id in chunk_ids]
+
+    terms_blob, terms_ptr = _string_table(terms)
+    docs_blob, docs_ptr = _string_table(doc_ids)
+    chunk_ids_blob, chunk_ids_ptr = _string_table(chunk_ids)
+    chunks_blob, chunks_ptr = _string_table(chunk_records)
+    data = {
+        "terms_blob": terms_blob, "terms_ptr": terms_ptr, "term_postings": term_postings,
+        "post_docs": post_docs, "post_ptr": post_ptr, "positions": positions,
+        "docs_blob": docs_blob, "docs_ptr": docs_ptr, "doc_lengths": lengths,
+        "offsets_ptr": offsets_ptr, "offsets": doc_offsets,
+        "chunk_ids_blob": chunk_ids_blob, "chunk_ids_ptr": chunk_ids_ptr,
+        "chunks_blob": chunks_blob, "chunks_ptr": chunks_ptr
+    }
+
+    # Offsets das seções relativos ao início dos dados (alinhados em 8 bytes)
+    sections = {}
+    position = 0
+    for name, dtype in SECTIONS.items():
+        payload = np.frombuffer(data[name], dtype=np.uint8) if isinstance(data[name], bytes) \
+            else np.asarray(data[name]).astype(dtype, copy=False)
+        data[name] = payload
+        sections[name] = [position, dtype, int(payload.size)]
+        position = _align(position + payload.nbytes)
+
+    header = json.dumps({
+        "k1": index.k1,
+        "b": index.b,
+        "total_length": index.total_length,
+        "terms": len(terms),
+        "documents": len(doc_ids),
+        "chunks": len(chunk_ids) if chunks is not None else None,
+        "sections": sections
+    }).encode('utf-8')
+    data_start = _align(PREAMBLE.size + len(header))
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        for name in SECTIONS:
+            f.seek(data_start + sections[name][0])
+            data[name].tofile(f)
+        f.truncate(data_start + position)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class IndexSnapshot:
+    """Leitura de um snapshot binário via mmap"""
+
+    def __init__(self, path: Union[str, Path]):
+        if not SNAPSHOT_AVAILABLE:
+            raise RuntimeError("NumPy não disponível para o snapshot binário")
+
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < PREAMBLE.size:
+            raise ValueError("Snapshot truncado")
+        magic, version, header_size = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("Arquivo não é um snapshot do índice")
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Versão de snapshot não suportada: {version}")
+
+        header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_size].decode('utf-8'))
+        data_start = _align(PREAMBLE.size + header_size)
+        self.k1 = header["k1"]
+        self.b = header["b"]
+        self.total_length = header["total_length"]
+        self.term_count = header["terms"]
+        self.doc_count = header["documents"]
+        # None: snapshot gravado sem a tabela de chunks
+        self.chunk_count = header.get("chunks")
+        # Ids de documento já decodificados (um mesmo chunk aparece nos postings de muitos termos)
+        self._doc_ids: Dict[int, str] = {}
+
+        # Views sobre o mmap: nada é copiado, as páginas são lidas sob demanda
+        self._sections: Dict[str, Any] = {}
+        self._blob_starts: Dict[str, int] = {}
+        for name, (offset, dtype, count) in header["sections"].items():
+            self._sections[name] = np.frombuffer(self._map, dtype=dtype, count=count, offset=data_start + offset)
+            self._blob_starts[name] = data_start + offset
+
+    def _string(self, blob: str, pointers: str, number: int) -> str:
+        start = self._blob_starts[blob]
+        ptr = self._sections[pointers]
+        return self._map[start + int(ptr[number]):start + int(ptr[number + 1])].decode('utf-8')
+
+    def _find(self, blob: str, pointers: str, count: int, key: str) -> int:
+        """Busca binária na tabela de strings (-1 se ausente)"""
+        target = key.encode('utf-8')
+        start = self._blob_starts[blob]
+        ptr = self._sections[pointers]
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            value = self._map[start + int(ptr[middle]):start + int(ptr[middle + 1])]
+            if value < target:
+                low = middle + 1
+            elif value > target:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def find_term(self, term: str) -> int:
+        return self._find("terms_blob", "terms_ptr", self.term_count, term)
+
+    def find_doc(self, doc_id: str) -> int:
+        return self._find("docs_blob", "docs_ptr", self.doc_count, doc_id)
+
+    def term(self, number: int) -> str:
+        return self._string("terms_blob", "terms_ptr", number)
+
+    def doc_id(self, number: int) -> str:
+        try:
+            return self._doc_ids[number]
+        except KeyError:
+            doc_id = self._doc_ids[number] = self._string("docs_blob", "docs_ptr", number)
+            return doc_id
+
+    def find_chunk(self, chunk_id: str) -> int:
+        return self._find("chunk_ids_blob", "chunk_ids_ptr", self.chunk_count or 0, chunk_id)
+
+    def chunk_id(self, number: int) -> str:
+        return self._string("chunk_ids_blob", "chunk_ids_ptr", number)
+
+    def chunk(self, number: int) -> Dict[str, Any]:
+        return json.loads(self._string("chunks_blob", "chunks_ptr", number))
+
+    def iter_chunks(self) -> Iterator[str]:
+        return (self.chunk_id(number) for number in range(self.chunk_count or 0))
+
+    def iter_terms(self) -> Iterator[str]:
+        return (self.term(number) for number in range(self.term_count))
+
+    def iter_docs(self) -> Iterator[str]:
+        return (self.doc_id(number) for number in range(self.doc_count))
+
+    def document_frequency(self, number: int) -> int:
+        ptr = self._sections["term_postings"]
+        return int(ptr[number + 1] - ptr[number])
+
+    def postings(self, number: int) -> Tuple[List[int], Dict[str, List[int]]]:
+        """(números dos documentos, {doc_id: posições}) de um termo"""
+        ptr = self._sections["term_postings"]
+        first, last = int(ptr[number]), int(ptr[number + 1])
+        numbers = self._sections["post_docs"][first:last].tolist()
+        bounds = self._sections["post_ptr"][first:last + 1].tolist()
+        positions = self._sections["positions"][bounds[0]:bounds[-1]].tolist() if bounds else []
+        base = bounds[0] if bounds else 0
+        postings = {self.doc_id(doc): positions[bounds[i] - base:bounds[i + 1] - base]
+                    for i, doc in enumerate(numbers)}
+        return numbers, postings
+
+    def doc_length(self, number: int) -> int:
+        return int(self._sections["doc_lengths"][number])
+
+    def doc_lengths(self, numbers: List[int]) -> List[int]:
+        return self._sections["doc_lengths"][numbers].tolist()
+
+    def doc_offsets(self, number: int) -> List[int]:
+        ptr = self._sections["offsets_ptr"]
+        return self._sections["offsets"][int(ptr[number]):int(ptr[number + 1])].tolist()
+
+    def offsets_count(self, number: int) -> int:
+        ptr = self._sections["offsets_ptr"]
+        return int(ptr[number + 1] - ptr[number])
+
+
+class SnapshotMapping(MutableMapping):
+    """Dicionário sobre uma tabela do snapshot: leitura sob demanda, alterações em memória"""
+
+    def __init__(self, find: Callable[[str], int], load: Callable[[int], Any],
+                 keys: Callable[[], Iterator[str]], size: int, value_size: Callable[[int], int]):
+        self._find = find
+        self._load = load
+        self._keys = keys
+        self._base_size = size
+        self._value_size = value_size
+        # Chaves já lidas ou alteradas; removidas do snapshot; novas (fora do snapshot)
+        self._values: Dict[str, Any] = {}
+        self._deleted: Set[str] = set()
+        self._new: Set[str] = set()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = self.peek(key)
+        self._values[key] = value
+        return value
+
+    def peek(self, key: str) -> Any:
+        """Valor sem guardá-lo em memória"""
+        if key in self._values:
+            return self._values[key]
+        number = self._find(key) if key not in self._deleted else -1
+        if number < 0:
+            raise KeyError(key)
+        return self._load(number)
+
+    def prime(self, items: Iterator[Tuple[str, Any]]):
+        """Guarda valores já conhecidos do snapshot (sem sobrescrever alterações)"""
+        for key, value in items:
+            if key not in self._values and key not in self._deleted:
+                self._values[key] = value
+
+    def value_size(self, key: str) -> int:
+        """len() do valor sem lê-lo do snapshot"""
+        if key in self._values:
+            return len(self._values[key])
+        number = self._find(key) if key not in self._deleted else -1
+        return self._value_size(number) if number >= 0 else 0
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._values:
+            if key in self._deleted:
+                self._deleted.discard(key)
+            elif self._find(key) < 0:
+                self._new.add(key)
+        self._values[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._new:
+            self._new.discard(key)
+            del self._values[key]
+        elif key not in self._deleted and (key in self._values or self._find(key) >= 0):
+            self._values.pop(key, None)
+            self._deleted.add(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._keys():
+            if key not in self._deleted:
+                yield key
+        yield from list(self._new)
+
+    def __len__(self) -> int:
+        return self._base_size - len(self._deleted) + len(self._new)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Cópia completa em dicionário comum (sem guardar os valores lidos)"""
+        return {key: self.peek(key) for key in self}
+
+
+class SnapshotPostings(SnapshotMapping):
+    """Postings do snapshot: documentos acrescentados a um termo ainda não lido ficam
+    pendentes e só são combinados com os do arquivo quando o termo for lido.
+
+    Assim reaplicar o journal ou indexar um documento novo não decodifica os
+    postings (possivelmente enormes) de cada termo que o documento contém.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending: Dict[str, Dict[str, List[int]]] = {}
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self._values:
+            return self._values[key]
+        if key in self._pending:
+            return self._pending[key]
+        if key not in self._deleted and self._find(key) >= 0:
+            pending = self._pending[key] = {}
+            return pending
+        self[key] = default
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = super().__getitem__(key)
+        self._pending.pop(key, None)
+        return value
+
+    def peek(self, key: str) -> Any:
+        value = super().peek(key)
+        pending = self._pending.get(key)
+        if pending and key not in self._values:
+            # Cada leitura do snapshot devolve listas novas: estender não altera o arquivo
+            for doc_id, positions in pending.items():
+                value.setdefault(doc_id, []).extend(positions)
+        return value
+
+    def value_size(self, key: str) -> int:
+        if key in self._pending:
+            return len(self[key])
+        return super().value_size(key)
+
+    def __setitem__(self, key: str, value: Any):
+        self._pending.pop(key, None)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str):
+        self._pending.pop(key, None)
+        super().__delitem__(key)
+
+
+class SnapshotIndex(InvertedIndex):
+    """InvertedIndex cujos postings, comprimentos e offsets vêm de um snapshot binário"""
+
+    def __init__(self, snapshot: IndexSnapshot):
+        super().__init__(k1=snapshot.k1, b=snapshot.b)
+        self.snapshot = snapshot
+        self.postings = SnapshotPostings(snapshot.find_term, self._load_postings, snapshot.iter_terms,
+                                         snapshot.term_count, snapshot.document_frequency)
+        self.doc_lengths = SnapshotMapping(snapshot.find_doc, snapshot.doc_length, snapshot.iter_docs,
+                                           snapshot.doc_count, lambda number: 1)
+        self.offsets = SnapshotMapping(snapshot.find_doc, snapshot.doc_offsets, snapshot.iter_docs,
+                                       snapshot.doc_count, snapshot.offsets_count)
+        self.total_length = snapshot.total_length
+
+    def _load_postings(self, number: int) -> Dict[str, List[int]]:
+        numbers, postings = self.snapshot.postings(number)
+        # Comprimentos dos documentos do posting, usados em seguida pelo BM25
+        self.doc_lengths.prime(zip(postings, self.snapshot.doc_lengths(numbers)))
+        return postings
+
+    def document_frequency(self, term: str) -> int:
+        return self.postings.value_size(term)
+
+    def document_frequencies(self) -> Iterator[Tuple[str, int]]:
+        return ((term, self.postings.value_size(term)) for term in self.postings)
+
+    def chunk_table(self) -> Optional[SnapshotMapping]:
+        """Tabela de chunks gravada junto com o índice (None se o snapshot não a tiver)"""
+        if self.snapshot.chunk_count is None:
+            return None
+        return SnapshotMapping(self.snapshot.find_chunk, self.snapshot.chunk, self.snapshot.iter_chunks,
+                               self.snapshot.chunk_count, lambda number: 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["postings"] = self.postings.to_dict()
+        data["doc_lengths"] = self.doc_lengths.to_dict()
+        data["offsets"] = self.offsets.to_dict()
+        return data
+
+
+def load_snapshot_index(path: Union[str, Path]) -> SnapshotIndex:
+    """Abre um snapshot binário como InvertedIndex (custo independente do tamanho do índice)"""
+    return SnapshotIndex(IndexSnapshot(path))
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Storage
+-----------
+Persistência incremental da base de conhecimento do AdvancedRAGSystem.
+
+Em vez de reescrever knowledge_base.json a cada documento, as alterações
+são acrescentadas a um journal (uma linha JSON por operação). O checkpoint
+completo só é regravado na compactação, que roda em segundo plano quando o
+journal cresce demais, sempre com escrita atômica (arquivo temporário +
+fsync + os.replace).
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Tuple, Union
+
+logger = logging.getLogger("RAG_STORAGE")
+
+
+def write_atomic(path: Path, payload: Union[str, bytes]):
+    """Grava o arquivo inteiro de forma atômica (temporário + fsync + os.replace)"""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    # Nome do temporário único por thread: escritas concorrentes no mesmo arquivo não colidem
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class KnowledgeBaseStore:
+    """Checkpoint atômico + journal append-only para a base de conhecimento"""
+
+    def __init__(self, data_dir: Path, checkpoint_name: str = "knowledge_base.json",
+                 journal_name: str = "knowledge_base.journal",
+                 compact_min_bytes: int = 4 * 1024 * 1024, compact_ratio: float = 1.0):
+        self.data_dir = Path(data_dir)
+        self.checkpoint_file = self.data_dir / checkpoint_name
+        self.journal_file = self.data_dir / journal_name
+        self.logger = logger
+
+        # Compactar quando o journal passar de max(compact_min_bytes, ratio * checkpoint)
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+
+        # Também usado pelo AdvancedRAGSystem para mutar a base sem corrida com a compactação
+        self.lock = threading.RLock()
+        # Um checkpoint inteiro por vez (serializar, gravar e truncar o journal):
+        # um checkpoint mais antigo não pode sobrescrever um mais novo
+        self._checkpoint_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Lê o checkpoint e as operações do journal que ainda não foram compactadas"""
+        checkpoint = None
+        if self.checkpoint_file.exists():
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+
+        records = []
+        if self.journal_file.exists():
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Última linha truncada por queda do processo: descartar o resto
+                        self.logger.warning(f"Journal truncado na linha {line_number}, ignorando o restante")
+                        break
+
+        return checkpoint, records
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Acrescenta operações ao journal com uma única escrita + fsync"""
+        if not records:
+            return
+
+        payload = "".join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+                          for record in records)
+
+        with self.lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def journal_size(self) -> int:
+        try:
+            return self.journal_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def checkpoint_size(self) -> int:
+        try:
+            return self.checkpoint_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def needs_compaction(self) -> bool:
+        threshold = max(self.compact_min_bytes, self.compact_ratio * self.checkpoint_size())
+        return self.journal_size() > threshold
+
+    def checkpoint(self, serialize: Callable[[], str]):
+        """Grava um checkpoint completo e descarta o journal já incorporado.
+
+        `serialize` é chamado com o lock do store adquirido e deve devolver o
+        JSON da base inteira; a gravação em disco acontece fora do lock.
+        Checkpoints simultâneos (ex.: gravação explícita e compactação em
+        segundo plano) são executados um após o outro; não chamar com o
+        lock do store adquirido.
+        """
+        with self._checkpoint_lock:
+            with self.lock:
+                payload = serialize()
+                journal_offset = self.journal_size()
+
+            self._write_atomic(self.checkpoint_file, payload)
+
+            # Manter apenas as operações gravadas depois do snapshot
+            with self.lock:
+                tail = b""
+                if self.journal_file.exists():
+                    with open(self.journal_file, 'rb') as f:
+                        f.seek(journal_offset)
+                        tail = f.read()
+                self._write_atomic(self.journal_file, tail)
+
+        self.logger.info("Checkpoint da base de conhecimento gravado")
+
+    def maybe_compact(self, serialize: Callable[[], str], background: bool = True) -> bool:
+        """Dispara a compactação se o journal passou do limite"""
+        if not self.needs_compaction():
+            return False
+
+        if not background:
+            self.checkpoint(serialize)
+            return True
+
+        with self.lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return False
+            self._compaction_thread = threading.Thread(
+                target=self._compact_safely, args=(serialize,), daemon=True
+            )
+            self._compaction_thread.start()
+        return True
+
+    def wait_for_compaction(self, timeout: Optional[float] = None):
+        thread = self._compaction_thread
+        if thread:
+            thread.join(timeout)
+
+    def _compact_safely(self, serialize: Callable[[], str]):
+        try:
+            self.checkpoint(serialize)
+        except Exception as e:
+            self.logger.error(f"Erro na compactação da base de conhecimento: {e}")
+
+    @staticmethod
+    def _write_atomic(path: Path, payload: Union[str, bytes]):
+        write_atomic(path, payload)
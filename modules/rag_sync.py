@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Directory Sync
+------------------
+Serviço em segundo plano que mantém o índice do AdvancedRAGSystem
+sincronizado com pastas de documentos (data/docs e as pastas configuradas
+em config/rag_sync_config.json).
+
+A cada ciclo cada pasta é varrida com os.scandir, gerando um snapshot
+{caminho: (mtime_ns, tamanho)}; a diferença para o snapshot anterior
+define os arquivos adicionados, alterados e removidos, e só esses são
+aplicados ao índice. Não depende de inotify nem de bibliotecas de
+monitoramento de arquivos.
+
+Lotes pequenos (o caso comum de um ciclo) são processados no próprio
+processo; o pool de add_documents só é usado em lotes grandes, como a
+primeira sincronização de uma pasta. Arquivos cuja ingestão falhou ficam
+fora do snapshot e são tentados de novo no ciclo seguinte.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+logger = logging.getLogger("RAG_SYNC")
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class DirectorySyncService:
+    """Sincroniza pastas de documentos com o AdvancedRAGSystem por polling"""
+
+    CONFIG_FILE = "rag_sync_config.json"
+
+    def __init__(self, rag_system, directories: Optional[List[Union[str, Path, Tuple[str, str]]]] = None,
+                 interval: Optional[float] = None, workers: Optional[int] = None,
+                 pool_threshold: int = 16):
+        """
+        Args:
+            rag_system: instância de AdvancedRAGSystem
+            directories: pastas (ou tuplas (pasta, categoria)); por padrão
+                data/docs mais as pastas do arquivo de configuração
+            interval: segundos entre ciclos do serviço em segundo plano
+            workers: processos usados por add_documents em lotes grandes
+            pool_threshold: lotes com até esse número de arquivos são
+                processados no próprio processo (sem criar pool)
+        """
+        self.rag_system = rag_system
+        self.logger = logger
+        self.workers = workers
+        self.pool_threshold = pool_threshold
+        self.extensions = set(rag_system.document_processor.supported_formats)
+
+        config = self._load_config()
+        self.interval = interval if interval is not None else float(config.get("interval", 30.0))
+
+        # pasta (resolvida) -> categoria
+        self.directories: Dict[str, str] = {}
+        if directories is None:
+            directories = [(str(rag_system.data_dir / "docs"), "general")]
+            directories += [(item["path"], item.get("category", "general"))
+                            for item in config.get("directories", [])]
+        for directory in directories:
+            if isinstance(directory, (tuple, list)):
+                self.add_directory(*directory)
+            else:
+                self.add_directory(directory)
+
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.cycles = 0
+        self.totals = {"added": 0, "changed": 0, "deleted": 0, "failed": 0}
+        self.last_cycle: Optional[Dict[str, Any]] = None
+
+    def _load_config(self) -> Dict[str, Any]:
+        """Carrega as pastas monitoradas do arquivo JSON (se existir)"""
+        config_file = Path(self.rag_system.config_dir) / self.CONFIG_FILE
+        if not config_file.exists():
+            return {}
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Erro ao carregar configurações de sincronização: {e}")
+            return {}
+
+    def add_directory(self, directory: Union[str, Path], category: str = "general"):
+        """Passa a monitorar uma pasta (os arquivos entram com `category`)"""
+        self.directories[str(Path(directory).resolve())] = category
+
+    def remove_directory(self, directory: Union[str, Path]):
+        """Deixa de monitorar uma pasta (os documentos já indexados permanecem)"""
+        key = str(Path(directory).resolve())
+        self.directories.pop(key, None)
+        self._snapshots.pop(key, None)
+
+    def _scan(self, directory: str) -> Snapshot:
+        """Snapshot recursivo {caminho: (mtime_ns, tamanho)} dos arquivos suportados"""
+        snapshot: Snapshot = {}
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                                stat = entry.stat()
+                                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                        except OSError:
+                            # Arquivo removido durante a varredura
+                            continue
+            except OSError as e:
+                self.logger.warning(f"Erro ao varrer {current}: {e}")
+        return snapshot
+
+    def _previous_snapshot(self, directory: str) -> Snapshot:
+        """Snapshot anterior; no primeiro ciclo vem do registro de arquivos da base"""
+        snapshot = self._snapshots.get(directory)
+        if snapshot is None:
+            snapshot = {key: (entry.get("mtime_ns"), entry.get("size"))
+                        for key, entry in self.rag_system.tracked_files(directory).items()}
+        return snapshot
+
+    def sync_once(self) -> Dict[str, Any]:
+        """Executa um ciclo de sincronização e devolve suas estatísticas.
+
+        `elapsed` é o custo do ciclo (varredura + indexação) e `lag` o maior
+        intervalo, em segundos, entre a modificação de um arquivo e sua
+        aplicação ao índice.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            cycle = {"scanned": 0, "added": 0, "changed": 0, "deleted": 0, "failed": 0, "lag": 0.0}
+            modified_at = []
+
+            for directory, category in list(self.directories.items()):
+                if not os.path.isdir(directory):
+                    # Pasta ausente (ex.: disco desmontado) não apaga os documentos
+                    self.logger.warning(f"Pasta de sincronização não encontrada: {directory}")
+                    continue
+
+                current = self._scan(directory)
+                previous = self._previous_snapshot(directory)
+                cycle["scanned"] += len(current)
+
+                added = [path for path in current if path not in previous]
+                changed = [path for path, state in current.items() if path in previous and previous[path] != state]
+                deleted = [path for path in previous if path not in current]
+
+                if added or changed:
+                    batch = added + changed
+                    # Sem pool para poucos arquivos: criar processos a cada ciclo (spawn no
+                    # Windows reimporta a GUI) custa mais que processar o lote aqui
+                    workers = 1 if len(batch) <= self.pool_threshold else self.workers
+                    result = self.rag_system.add_documents(batch, category=category, workers=workers)
+                    cycle["failed"] += len(result["failed"])
+                    modified_at.extend(current[path][0] / 1e9 for path in batch)
+                    for item in result["failed"]:
+                        self.logger.warning(f"Falha ao sincronizar {item['file']}: {item['error']}")
+                        # Fora do snapshot: tentado de novo no próximo ciclo
+                        current.pop(item["file"], None)
+
+                if deleted:
+                    self.rag_system.remove_files(deleted)
+
+                cycle["added"] += len(added)
+                cycle["changed"] += len(changed)
+                cycle["deleted"] += len(deleted)
+                self._snapshots[directory] = current
+
+            finished = time.time()
+            if modified_at:
+                cycle["lag"] = max(0.0, finished - min(modified_at))
+            cycle["elapsed"] = time.perf_counter() - started
+            cycle["finished_at"] = finished
+
+            self.cycles += 1
+            for name in self.totals:
+                self.totals[name] += cycle[name]
+            self.last_cycle = cycle
+
+            if cycle["added"] or cycle["changed"] or cycle["deleted"]:
+                self.logger.info(f"Sincronização: {cycle['added']} novos, {cycle['changed']} alterados, "
+                                 f"{cycle['deleted']} removidos em {cycle['elapsed']:.2f}s "
+                                 f"(atraso {cycle['lag']:.1f}s)")
+            return cycle
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                self.logger.error(f"Erro na sincronização de documentos: {e}")
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Inicia a sincronização periódica em uma thread daemon"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="rag-directory-sync", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Sincronização de {len(self.directories)} pastas a cada {self.interval:.0f}s")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Interrompe o serviço e aguarda o ciclo em andamento"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Estado do serviço e estatísticas do último ciclo"""
+        return {
+            "running": self.is_running(),
+            "interval": self.interval,
+            "directories": dict(self.directories),
+            "cycles": self.cycles,
+            "totals": dict(self.totals),
+            "last_cycle": dict(self.last_cycle) if self.last_cycle else None
+        }
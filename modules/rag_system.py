@@ -19,14 +19,34 @@ import requests
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from .blob_store import BlobStore
+
 logger = logging.getLogger("RAG_SYSTEM")
 
 class Document:
     """Classe para representar um documento no sistema RAG"""
     
-    def __init__(self, content: str, metadata: Dict[str, Any] = None):
-        self.content = content
+    def __init__(self, content: str, metadata: Dict[str, Any] = None, store: Optional[BlobStore] = None):
         self.metadata = metadata or {}
+        # Com um BlobStore o texto fica no arquivo de blocos e é lido sob demanda
+        self.store = store
+        self._content: Optional[str] = None
+        self.content_ref: Optional[Dict[str, Any]] = None
+        self.content = content
+    
+    @property
+    def content(self) -> str:
+        if self.content_ref is not None:
+            return self.store.read(self.content_ref)
+        return self._content
+    
+    @content.setter
+    def content(self, value: str):
+        if self.store is not None:
+            self.content_ref = self.store.put(value)
+            self._content = None
+        else:
+            self._content = value
         
     def __str__(self):
         return f"Document(metadata={self.metadata})"
@@ -49,6 +69,9 @@ class RAGSystem:
         
         # Criar diretÃ³rio de dados se nÃ£o existir
         os.makedirs(self.data_dir, exist_ok=True)
+        
+        # Conteúdo dos documentos fora da RAM (arquivo temporário descartado ao fechar)
+        self.content_store = BlobStore(temp_dir=self.data_dir)
     
     def load_document(self, file_path: str) -> Optional[Document]:
         """Carrega um documento a partir de um arquivo"""
@@ -65,7 +88,7 @@ class RAGSystem:
                 "modified_at": os.path.getmtime(file_path)
             }
             
-            doc = Document(content, metadata)
+            doc = Document(content, metadata, self.content_store)
             self.documents.append(doc)
             self.logger.info(f"Documento carregado: {file_path.name}")
             return doc
@@ -133,7 +156,7 @@ class RAGSystem:
                             "sha": file_info["sha"]
                         }
                         
-                        doc = Document(content, metadata)
+                        doc = Document(content, metadata, self.content_store)
                         self.documents.append(doc)
                         loaded_docs.append(doc)
                         self.logger.info(f"Documento carregado do GitHub: {file_path}")
@@ -171,7 +194,7 @@ class RAGSystem:
             with open(input_path, 'r', encoding='utf-8') as f:
                 docs_data = json.load(f)
             
-            self.documents = [Document(doc["content"], doc["metadata"]) for doc in docs_data]
+            self.documents = [Document(doc["content"], doc["metadata"], self.content_store) for doc in docs_data]
             self.logger.info(f"Documentos carregados de {input_path}: {len(self.documents)}")
             return True
         except Exception as e:
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Tokenizer
+-------------
+Tokenizador rápido (sem NLTK) usado na indexação e nas consultas do
+AdvancedRAGSystem:
+- regex pré-compilada sobre o texto em minúsculas
+- remoção de acentos por tabela de tradução (um único str.translate)
+- stopwords PT/EN em frozensets carregados uma única vez
+- stemming leve (plurais e sufixos comuns em português e inglês)
+- modo em lote que tokeniza vários textos com uma única passada da regex
+- análise posicional (posição e offset de cada token) para o índice
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Iterable, Optional, FrozenSet, Tuple
+
+# Muda sempre que a saída do tokenizador mudar (força reindexação)
+TOKENIZER_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\w+")
+BATCH_SEPARATOR = "\x00"
+BATCH_PATTERN = re.compile(r"\w+|\x00")
+
+# (termos, posições dos termos, offsets de caractere de todos os tokens)
+Analysis = Tuple[List[str], List[int], List[int]]
+
+
+def _build_fold_table() -> dict:
+    """Tabela de tradução que remove diacríticos dos caracteres latinos"""
+    table = {}
+    for codepoint in range(0xC0, 0x250):
+        char = chr(codepoint)
+        decomposed = unicodedata.normalize("NFKD", char)
+        base = "".join(c for c in decomposed if not unicodedata.combining(c))
+        if base and base != char:
+            table[codepoint] = base
+    return table
+
+
+FOLD_TABLE = _build_fold_table()
+
+
+def fold_accents(text: str) -> str:
+    """Remove acentos (ação -> acao)"""
+    return text.translate(FOLD_TABLE)
+
+
+STOPWORDS_EN = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves
+""".split())
+
+STOPWORDS_PT = frozenset(fold_accents("""
+a à ao aos aquela aquelas aquele aqueles aquilo as às até com como da das de dela delas dele deles
+depois do dos e é ela elas ele eles em entre era eram essa essas esse esses esta estas este estes
+eu foi foram há isso isto já lhe lhes mais mas me mesmo meu meus minha minhas muito na não nas nem
+no nos nós o os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu seus só sua
+suas também te tem têm teu tua um uma umas uns você vocês vos está estão foi ser são sobre
+""").split())
+
+DEFAULT_STOPWORDS = STOPWORDS_EN | STOPWORDS_PT
+
+# (sufixo, substituição, tamanho mínimo da palavra) na ordem de aplicação
+_SUFFIX_RULES = (
+    ("coes", "cao", 5),
+    ("oes", "ao", 5),
+    ("aes", "ao", 5),
+    ("mente", "", 8),
+    ("ies", "y", 5),
+    ("ing", "", 7),
+    ("is", "l", 5),
+    ("es", "", 6),
+    ("s", "", 4),
+)
+# "es" só é removido depois destas terminações (flores, boxes, branches)
+_ES_STEMS = ("r", "s", "z", "x", "ch", "sh")
+_KEEP_ENDINGS = ("ss", "us", "is")
+
+
+@lru_cache(maxsize=200_000)
+def light_stem(token: str) -> str:
+    """Stemming leve: plurais e sufixos comuns (PT/EN)"""
+    for suffix, replacement, min_length in _SUFFIX_RULES:
+        if len(token) < min_length or not token.endswith(suffix):
+            continue
+        if suffix == "is" and not token.endswith(("ais", "eis", "ois", "uis")):
+            continue
+        if suffix == "es" and not token[:-2].endswith(_ES_STEMS):
+            continue
+        if suffix == "s" and token.endswith(_KEEP_ENDINGS):
+            return token
+        return token[:-len(suffix)] + replacement
+    return token
+
+
+class Tokenizer:
+    """Tokenizador regex com stopwords em cache, remoção de acentos e stemming leve"""
+
+    def __init__(self, stopwords: Optional[Iterable[str]] = None, stem: bool = True):
+        self.stopwords: FrozenSet[str] = frozenset(stopwords) if stopwords is not None else DEFAULT_STOPWORDS
+        self.stem = stem
+
+    def normalize(self, text: str) -> str:
+        """Minúsculas sem acentos (sem stemming), a forma usada antes da regex"""
+        return fold_accents(text.lower())
+
+    def _filter(self, words: List[str]) -> List[str]:
+        stopwords = self.stopwords
+        if self.stem:
+            return [light_stem(word) for word in words if word not in stopwords]
+        return [word for word in words if word not in stopwords]
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lista de termos (com repetições) de um texto"""
+        return self._filter(TOKEN_PATTERN.findall(self.normalize(text)))
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        """Tokeniza vários textos com uma única normalização e passada da regex"""
+        if not texts:
+            return []
+
+        joined = self.normalize(BATCH_SEPARATOR.join(text.replace(BATCH_SEPARATOR, " ") for text in texts))
+        results: List[List[str]] = []
+        current: List[str] = []
+        for word in BATCH_PATTERN.findall(joined):
+            if word == BATCH_SEPARATOR:
+                results.append(self._filter(current))
+                current = []
+            else:
+                current.append(word)
+        results.append(self._filter(current))
+        return results
+
+    def analyze(self, text: str) -> Analysis:
+        """Termos com suas posições (ordinal entre todos os tokens, inclusive
+        stopwords) e o offset de caractere de cada token no texto original"""
+        normalized = self.normalize(text)
+        if len(normalized) == len(text):
+            matches = [(match.start(), match.group()) for match in TOKEN_PATTERN.finditer(normalized)]
+        else:
+            # Algum caractere mudou de tamanho ao normalizar: offsets vêm do texto original
+            matches = [(match.start(), self.normalize(match.group())) for match in TOKEN_PATTERN.finditer(text)]
+        return self._analyze_matches(matches)
+
+    def analyze_batch(self, texts: List[str]) -> List[Analysis]:
+        """analyze() de vários textos com uma única normalização e passada da regex"""
+        if not texts:
+            return []
+
+        joined = BATCH_SEPARATOR.join(text.replace(BATCH_SEPARATOR, " ") for text in texts)
+        normalized = self.normalize(joined)
+        if len(normalized) != len(joined):
+            return [self.analyze(text.replace(BATCH_SEPARATOR, " ")) for text in texts]
+
+        results: List[Analysis] = []
+        current = []
+        base = 0
+        for match in BATCH_PATTERN.finditer(normalized):
+            word = match.group()
+            if word == BATCH_SEPARATOR:
+                results.append(self._analyze_matches(current))
+                current = []
+                base = match.end()
+            else:
+                current.append((match.start() - base, word))
+        results.append(self._analyze_matches(current))
+        return results
+
+    def _analyze_matches(self, matches: List[Tuple[int, str]]) -> Analysis:
+        stopwords = self.stopwords
+        stem = light_stem if self.stem else None
+        terms: List[str] = []
+        positions: List[int] = []
+        offsets = [offset for offset, _ in matches]
+        for position, (_, word) in enumerate(matches):
+            if word in stopwords:
+                continue
+            terms.append(stem(word) if stem else word)
+            positions.append(position)
+        return terms, positions, offsets
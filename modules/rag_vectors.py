@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RAG Vectors
+-----------
+Busca semântica local (sem rede) para o AdvancedRAGSystem.
+
+- HashingEncoder: embeddings por hashing de termos (TF sublinear nos chunks,
+  IDF na consulta), determinístico e sem modelo externo. Qualquer objeto com
+  `dim` e `encode(terms_list)` pode substituí-lo.
+- DenseVectorIndex: matriz float32 ou int8 memory-mapped em disco, busca
+  top-k por produto matricial em blocos e modo IVF (clusters) opcional para
+  bases grandes.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import json
+import math
+import zlib
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+from .rag_storage import write_atomic
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger("RAG_VECTORS")
+
+
+class HashingEncoder:
+    """Embeddings por feature hashing assinado dos termos"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _bucket(self, term: str) -> Tuple[int, float]:
+        h = zlib.crc32(term.encode('utf-8'))
+        return h % self.dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+    def encode(self, terms_list: List[List[str]],
+               weight: Optional[Callable[[str], float]] = None) -> "np.ndarray":
+        """Codifica listas de termos em vetores normalizados (float32).
+
+        Sem `weight` usa TF sublinear (chunks); com `weight` (ex.: IDF) cada
+        termo distinto recebe esse peso (consultas).
+        """
+        vectors = np.zeros((len(terms_list), self.dim), dtype=np.float32)
+
+        for row, terms in enumerate(terms_list):
+            for term, tf in Counter(terms).items():
+                bucket, sign = self._bucket(term)
+                value = weight(term) if weight else 1.0 + math.log(tf)
+                vectors[row, bucket] += sign * value
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class DenseVectorIndex:
+    """Matriz de vetores memory-mapped com busca top-k e IVF opcional.
+
+    Arquivos em `directory`:
+    - vectors.f32 / vectors.i8: matriz (capacidade x dim)
+    - scales.f32: escala por linha (apenas int8)
+    - vectors.log: journal "linha<TAB>id" (linha "-" marca remoção)
+    - vectors.json: dim, dtype, contagem de linhas e geração dos arquivos
+    - ivf.npz: centróides e atribuições do modo IVF (se construído)
+
+    Linhas liberadas por remoções são reaproveitadas pelas próximas
+    inclusões. Quando as linhas vagas ou o journal passam do limite, `save`
+    compacta: matriz e journal são regravados em arquivos de uma nova
+    geração (vectors.<g>.f32, vectors.<g>.log, ...) e a troca é confirmada
+    pela gravação atômica de vectors.json.
+    """
+
+    BLOCK_ROWS = 65536
+
+    def __init__(self, directory: Path, dim: int = 256, dtype: str = "float32",
+                 compact_min_rows: int = 1024):
+        """
+        Args:
+            compact_min_rows: linhas vagas (ou entradas obsoletas no journal)
+                toleradas antes de compactar, além da metade das linhas em uso
+        """
+        if dtype not in ("float32", "int8"):
+            raise ValueError("dtype deve ser 'float32' ou 'int8'")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+        self.compact_min_rows = compact_min_rows
+
+        self.meta_file = self.directory / "vectors.json"
+        self.ivf_file = self.directory / "ivf.npz"
+
+        meta = {}
+        if self.meta_file.exists():
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+        self.dim = meta.get("dim", dim)
+        self.dtype = meta.get("dtype", dtype)
+        self.generation = meta.get("generation", 0)
+        self._set_files(self.generation)
+
+        self.count = meta.get("count", 0)
+        self.capacity = 0
+        self.matrix = None
+        self.scales = None
+        self.valid = np.zeros(0, dtype=bool)
+
+        self.row_ids: List[Optional[str]] = [None] * self.count
+        self.id_rows: Dict[str, int] = {}
+        self._log_lines = 0
+        self._load_log()
+        self._free_rows = [row for row in range(self.count - 1, -1, -1) if self.row_ids[row] is None]
+
+        self._open(max(self.count, 1024))
+
+        self.centroids = None
+        self.assignments = None
+        self._load_ivf()
+
+    def __len__(self) -> int:
+        return len(self.id_rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.id_rows
+
+    # ------------------------------------------------------------------
+    # Armazenamento
+    # ------------------------------------------------------------------
+
+    def _generation_files(self, generation: int) -> Tuple[Path, Path, Path]:
+        """(matriz, escalas, journal) de uma geração (0 = nomes originais)"""
+        suffix = f".{generation}" if generation else ""
+        matrix_ext = "i8" if self.dtype == "int8" else "f32"
+        return (self.directory / f"vectors{suffix}.{matrix_ext}",
+                self.directory / f"scales{suffix}.f32",
+                self.directory / f"vectors{suffix}.log")
+
+    def _set_files(self, generation: int):
+        self.matrix_file, self.scales_file, self.log_file = self._generation_files(generation)
+
+    def _load_log(self):
+        if not self.log_file.exists():
+            return
+
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._log_lines += 1
+                row, _, item_id = line.rstrip("\n").partition("\t")
+                if not item_id:
+                    continue
+                if row == "-":
+                    old_row = self.id_rows.pop(item_id, None)
+                    if old_row is not None:
+                        self.row_ids[old_row] = None
+                    continue
+
+                row = int(row)
+                if row >= len(self.row_ids):
+                    self.row_ids.extend([None] * (row + 1 - len(self.row_ids)))
+                old_row = self.id_rows.get(item_id)
+                if old_row is not None and old_row != row:
+                    self.row_ids[old_row] = None
+                self.row_ids[row] = item_id
+                self.id_rows[item_id] = row
+
+        self.count = max(self.count, len(self.row_ids))
+
+    def _open(self, capacity: int):
+        """(Re)abre os memmaps garantindo pelo menos `capacity` linhas"""
+        np_dtype = np.int8 if self.dtype == "int8" else np.float32
+        row_bytes = self.dim * np.dtype(np_dtype).itemsize
+
+        if self.matrix is not None:
+            self.matrix.flush()
+            if self.scales is not None:
+                self.scales.flush()
+            self.matrix = self.scales = None
+
+        for path, size in [(self.matrix_file, capacity * row_bytes),
+                           (self.scales_file, capacity * 4) if self.dtype == "int8" else (None, 0)]:
+            if path is None:
+                continue
+            with open(path, 'ab') as f:
+                if f.tell() < size:
+                    f.truncate(size)
+
+        self.capacity = self.matrix_file.stat().st_size // row_bytes
+        self.matrix = np.memmap(self.matrix_file, dtype=np_dtype, mode='r+', shape=(self.capacity, self.dim))
+        if self.dtype == "int8":
+            self.scales = np.memmap(self.scales_file, dtype=np.float32, mode='r+', shape=(self.capacity,))
+
+        # Máscara de linhas ocupadas (mantida só em memória)
+        valid = np.zeros(self.capacity, dtype=bool)
+        valid[list(self.id_rows.values())] = True
+        self.valid = valid
+
+    def add(self, item_ids: List[str], vectors: "np.ndarray"):
+        """Adiciona (ou substitui) vetores; cada id ocupa uma linha"""
+        if not item_ids:
+            return
+
+        rows = []
+        new_rows = 0
+        for item_id in item_ids:
+            row = self.id_rows.get(item_id)
+            if row is None:
+                # Linha vaga de uma remoção; senão uma nova no fim da matriz
+                if self._free_rows:
+                    row = self._free_rows.pop()
+                else:
+                    row = self.count + new_rows
+                    new_rows += 1
+            rows.append(row)
+
+        if self.count + new_rows > self.capacity:
+            self._open(max(self.capacity * 2, self.count + new_rows))
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.matrix[rows] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self.scales[rows] = scales
+        else:
+            self.matrix[rows] = vectors
+
+        self.count += new_rows
+        self.row_ids.extend([None] * new_rows)
+        for item_id, row in zip(item_ids, rows):
+            self.row_ids[row] = item_id
+            self.id_rows[item_id] = row
+        self.valid[rows] = True
+
+        if self.assignments is not None:
+            self._assign_rows(rows, vectors)
+
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write("".join(f"{row}\t{item_id}\n" for item_id, row in zip(item_ids, rows)))
+        self._log_lines += len(item_ids)
+
+    def remove(self, item_ids: Iterable[str]):
+        """Remove vetores (a linha fica vaga, é ignorada nas buscas e reaproveitada)"""
+        removed = []
+        for item_id in item_ids:
+            row = self.id_rows.pop(item_id, None)
+            if row is not None:
+                self.row_ids[row] = None
+                self.valid[row] = False
+                self._free_rows.append(row)
+                removed.append(item_id)
+
+        if removed:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write("".join(f"-\t{item_id}\n" for item_id in removed))
+            self._log_lines += len(removed)
+
+    def needs_compaction(self) -> bool:
+        """Linhas vagas ou journal obsoleto além do limite"""
+        slack = max(self.compact_min_rows, len(self.id_rows) // 2)
+        return len(self._free_rows) > slack or self._log_lines - len(self.id_rows) > 2 * slack
+
+    def save(self):
+        """Grava os memmaps e os metadados, compactando se necessário"""
+        if self.needs_compaction():
+            self.compact()
+            return
+
+        if self.matrix is not None:
+            self.matrix.flush()
+        if self.scales is not None:
+            self.scales.flush()
+
+        self._write_meta()
+
+    def _write_meta(self):
+        write_atomic(self.meta_file, json.dumps({"dim": self.dim, "dtype": self.dtype, "count": self.count,
+                                                 "items": len(self.id_rows), "generation": self.generation}))
+
+    @staticmethod
+    def stored_size(directory: Path) -> Optional[int]:
+        """Vetores em uso no último save, lidos de vectors.json sem abrir o índice (None se desconhecido)"""
+        try:
+            with open(Path(directory) / "vectors.json", 'r', encoding='utf-8') as f:
+                return json.load(f).get("items")
+        except (OSError, ValueError):
+            return None
+
+    def compact(self):
+        """Regrava matriz e journal só com as linhas em uso, numa nova geração de arquivos"""
+        live = sorted(self.id_rows.items(), key=lambda item: item[1])
+        old_rows = np.array([row for _, row in live], dtype=np.int64)
+        count = len(live)
+        capacity = max(count, 1024)
+
+        generation = self.generation + 1
+        matrix_file, scales_file, log_file = self._generation_files(generation)
+        matrix = np.memmap(matrix_file, dtype=self.matrix.dtype, mode='w+', shape=(capacity, self.dim))
+        scales = (np.memmap(scales_file, dtype=np.float32, mode='w+', shape=(capacity,))
+                  if self.dtype == "int8" else None)
+        for offset in range(0, count, self.BLOCK_ROWS):
+            block_rows = old_rows[offset:offset + self.BLOCK_ROWS]
+            matrix[offset:offset + len(block_rows)] = self.matrix[block_rows]
+            if scales is not None:
+                scales[offset:offset + len(block_rows)] = self.scales[block_rows]
+        matrix.flush()
+        if scales is not None:
+            scales.flush()
+        del matrix, scales
+        write_atomic(log_file, "".join(f"{row}\t{item_id}\n" for row, (item_id, _) in enumerate(live)))
+
+        if self.assignments is not None:
+            assignments = np.full(capacity, -1, dtype=np.int32)
+            assignments[:count] = self.assignments[old_rows]
+            self.assignments = assignments
+
+        # Ponto de confirmação: vectors.json passa a apontar para a nova geração
+        previous = self._generation_files(self.generation)
+        self.matrix = self.scales = None
+        self.generation = generation
+        self._set_files(generation)
+        self.count = count
+        self.row_ids = [item_id for item_id, _ in live]
+        self.id_rows = {item_id: row for row, item_id in enumerate(self.row_ids)}
+        self._free_rows = []
+        self._log_lines = count
+        self._write_meta()
+        self._open(capacity)
+        if self.assignments is not None:
+            np.savez(self.ivf_file, centroids=self.centroids, assignments=self.assignments[:count])
+
+        for path in previous:
+            try:
+                path.unlink()
+            except OSError:
+                # Ainda mapeado (Windows) ou inexistente
+                pass
+        self.logger.info(f"Índice vetorial compactado: {count} vetores (geração {generation})")
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    def _score_rows(self, start: int, end: int, query: "np.ndarray") -> "np.ndarray":
+        block = self.matrix[start:end]
+        if self.dtype == "int8":
+            return (block.astype(np.float32) @ query) * self.scales[start:end]
+        return block @ query
+
+    def _score_row_list(self, rows: "np.ndarray", query: "np.ndarray") -> "np.ndarray":
+        block = self.matrix[rows]
+        if self.dtype == "int8":
+            return (block.astype(np.float32) @ query) * self.scales[rows]
+        return block @ query
+
+    def search(self, query: "np.ndarray", limit: int = 5, nprobe: Optional[int] = None,
+               allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Top-k por similaridade (produto interno de vetores normalizados).
+
+        Com o IVF construído e `nprobe` informado, só os `nprobe` clusters
+        mais próximos da consulta são pontuados. Com `allowed` (filtros de
+        metadados), só as linhas desses ids são pontuadas.
+        """
+        if not self.id_rows or limit <= 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        candidates: List[Tuple[float, int]] = []
+
+        if allowed is not None:
+            rows = np.array(sorted(self.id_rows[item_id] for item_id in allowed if item_id in self.id_rows),
+                            dtype=np.int64)
+            for offset in range(0, len(rows), self.BLOCK_ROWS):
+                block_rows = rows[offset:offset + self.BLOCK_ROWS]
+                candidates.extend(self._top_candidates(self._score_row_list(block_rows, query),
+                                                       block_rows, self.valid[block_rows], limit))
+        elif nprobe and self.centroids is not None:
+            lists = np.argsort(self.centroids @ query)[::-1][:nprobe]
+            rows = np.flatnonzero(np.isin(self.assignments[:self.count], lists))
+            for offset in range(0, len(rows), self.BLOCK_ROWS):
+                block_rows = rows[offset:offset + self.BLOCK_ROWS]
+                candidates.extend(self._top_candidates(self._score_row_list(block_rows, query),
+                                                       block_rows, self.valid[block_rows], limit))
+        else:
+            for start in range(0, self.count, self.BLOCK_ROWS):
+                end = min(start + self.BLOCK_ROWS, self.count)
+                candidates.extend(self._top_candidates(self._score_rows(start, end, query),
+                                                       np.arange(start, end), self.valid[start:end], limit))
+
+        candidates.sort(reverse=True)
+        return [(self.row_ids[row], score) for score, row in candidates[:limit]]
+
+    @staticmethod
+    def _top_candidates(scores: "np.ndarray", rows: "np.ndarray", valid: "np.ndarray",
+                        limit: int) -> List[Tuple[float, int]]:
+        """Melhores linhas válidas de um bloco"""
+        scores = np.where(valid, scores, -np.inf)
+
+        keep = min(limit, len(scores))
+        if keep < len(scores):
+            top = np.argpartition(scores, -keep)[-keep:]
+        else:
+            top = np.arange(len(scores))
+        return [(float(scores[i]), int(rows[i])) for i in top if np.isfinite(scores[i])]
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, sample_size: int = 50000):
+        """Agrupa os vetores em clusters (k-means esférico) para busca com nprobe"""
+        valid_rows = np.flatnonzero(self.valid[:self.count])
+        if len(valid_rows) == 0:
+            return
+
+        n_lists = n_lists or max(1, int(math.sqrt(len(valid_rows))))
+        rng = np.random.default_rng(0)
+
+        sample_rows = valid_rows if len(valid_rows) <= sample_size else np.sort(
+            rng.choice(valid_rows, sample_size, replace=False))
+        sample = self._dense_rows(sample_rows)
+
+        n_lists = min(n_lists, len(sample))
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = sample[labels == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[cluster] = centroid / norm if norm else centroid
+
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = np.full(self.capacity, -1, dtype=np.int32)
+        for offset in range(0, len(valid_rows), self.BLOCK_ROWS):
+            block_rows = valid_rows[offset:offset + self.BLOCK_ROWS]
+            self._assign_rows(block_rows, self._dense_rows(block_rows))
+
+        np.savez(self.ivf_file, centroids=self.centroids, assignments=self.assignments[:self.count])
+        self.logger.info(f"IVF construído com {n_lists} clusters para {len(valid_rows)} vetores")
+
+    def _dense_rows(self, rows: "np.ndarray") -> "np.ndarray":
+        block = np.asarray(self.matrix[rows], dtype=np.float32)
+        if self.dtype == "int8":
+            block = block * self.scales[rows][:, None]
+        return block
+
+    def _assign_rows(self, rows: List[int], vectors: "np.ndarray"):
+        if len(self.assignments) < self.capacity:
+            self.assignments = np.concatenate([
+                self.assignments, np.full(self.capacity - len(self.assignments), -1, dtype=np.int32)])
+        self.assignments[rows] = np.argmax(np.asarray(vectors, dtype=np.float32) @ self.centroids.T, axis=1)
+
+    def _load_ivf(self):
+        if not self.ivf_file.exists():
+            return
+        try:
+            data = np.load(self.ivf_file)
+            self.centroids = data["centroids"]
+            assignments = np.full(self.capacity, -1, dtype=np.int32)
+            saved = data["assignments"][:self.capacity]
+            assignments[:len(saved)] = saved
+            self.assignments = assignments
+
+            # Linhas acrescentadas depois da última gravação do IVF
+            missing = np.flatnonzero(self.valid[:self.count] & (assignments[:self.count] < 0))
+            if len(missing):
+                self._assign_rows(missing, self._dense_rows(missing))
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar IVF: {e}")
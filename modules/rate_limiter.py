@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rate Limiter
+------------
+Controle de vazão do lado do cliente para as requisições ao OpenRouter.
+
+- Token bucket por API key e por modelo: cada requisição consome uma
+  ficha de cada balde; sem fichas o chamador espera a reposição em vez
+  de estourar o limite do servidor.
+- Fila de requisições em andamento limitada: no máximo `max_in_flight`
+  simultâneas e `max_queue` aguardando; além disso a chamada falha na hora
+  com QueueFullError (backpressure para quem está produzindo requisições).
+- Retentativas de 429 e 5xx com backoff exponencial com jitter completo;
+  um cabeçalho Retry-After é respeitado e pausa o balde do modelo para
+  todos os chamadores.
+
+O estado fica protegido por threading.Lock e as esperas são calculadas
+(reserva antecipada de fichas), de modo que o mesmo limitador serve o
+event loop persistente, chamadas com asyncio.run em outros loops e o
+cliente síncrono (requests) do AdvancedRAGSystem. Quem espera vaga na
+fila não faz polling: ao liberar uma vaga, `_finish` acorda um chamador
+síncrono (threading.Condition) e os assíncronos, cada um no seu loop.
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger("RATE_LIMITER")
+
+# Status HTTP que valem nova tentativa
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class QueueFullError(Exception):
+    """Fila de requisições cheia: o chamador deve desistir ou tentar mais tarde"""
+
+
+def _wake(future: asyncio.Future):
+    """Acorda um chamador assíncrono à espera de vaga (no loop dele)"""
+    if not future.done():
+        future.set_result(None)
+
+
+class TokenBucket:
+    """Balde de fichas com reserva antecipada (o saldo pode ficar negativo)"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: fichas repostas por segundo
+            capacity: rajada máxima
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """Consome uma ficha e devolve quantos segundos esperar antes de usá-la"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def pause(self, seconds: float):
+        """Suspende o balde (Retry-After do servidor)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Token buckets por API key e por modelo, fila limitada e política de retentativas"""
+
+    _registry: Dict[str, "RateLimiter"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float = 120, burst: int = 20,
+                 model_requests_per_minute: float = 60, model_burst: int = 10,
+                 free_model_requests_per_minute: float = 20,
+                 max_in_flight: int = 8, max_queue: int = 64, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Args:
+            requests_per_minute / burst: balde da API key
+            model_requests_per_minute / model_burst: balde de cada modelo
+            free_model_requests_per_minute: balde das variantes ":free"
+                (limite documentado do OpenRouter para modelos gratuitos)
+            max_in_flight: requisições simultâneas
+            max_queue: requisições aguardando vaga antes de QueueFullError
+            max_retries: retentativas de 429/5xx
+            base_delay / max_delay: limites do backoff exponencial (s)
+        """
+        self.key_bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.model_rate = model_requests_per_minute / 60.0
+        self.free_model_rate = free_model_requests_per_minute / 60.0
+        self.model_burst = model_burst
+        self.model_buckets: Dict[str, TokenBucket] = {}
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        # Esperas por vaga: chamadores síncronos na condição, assíncronos
+        # como (loop, future) acordados por call_soon_threadsafe
+        self._slot_freed = threading.Condition(self._lock)
+        self._async_waiters = []
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {"requests": 0, "throttled": 0, "throttle_seconds": 0.0,
+                      "retries": 0, "rejected": 0}
+
+    @classmethod
+    def for_key(cls, api_key: Optional[str], **kwargs) -> "RateLimiter":
+        """Limitador compartilhado por todos os clientes que usam a mesma API key"""
+        key = hashlib.sha256((api_key or "").encode('utf-8')).hexdigest()
+        with cls._registry_lock:
+            if key not in cls._registry:
+                cls._registry[key] = cls(**kwargs)
+            return cls._registry[key]
+
+    def _model_bucket(self, model_id: str) -> TokenBucket:
+        bucket = self.model_buckets.get(model_id)
+        if bucket is None:
+            rate = self.free_model_rate if model_id.endswith(":free") else self.model_rate
+            bucket = self.model_buckets[model_id] = TokenBucket(rate, self.model_burst)
+        return bucket
+
+    # ------------------------------------------------------------------
+    # Fila de requisições em andamento
+    # ------------------------------------------------------------------
+
+    def _enqueue(self):
+        with self._lock:
+            if self.in_flight >= self.max_in_flight and self.waiting >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise QueueFullError(f"Fila cheia: {self.in_flight} em andamento, {self.waiting} aguardando")
+            self.waiting += 1
+
+    def _try_start(self, waiter=None) -> bool:
+        """Ocupa uma vaga; sem vaga, registra `waiter` (loop, future) para ser acordado"""
+        with self._lock:
+            if self.in_flight < self.max_in_flight:
+                self.waiting -= 1
+                self.in_flight += 1
+                return True
+            if waiter is not None:
+                self._async_waiters.append(waiter)
+            return False
+
+    def _cancel_wait(self):
+        with self._lock:
+            self.waiting -= 1
+            # Uma notificação recebida por quem desistiu passa para o próximo
+            self._slot_freed.notify()
+
+    def _finish(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._slot_freed.notify()
+            waiters, self._async_waiters = self._async_waiters, []
+        # Os assíncronos disputam a vaga de novo; quem perder volta a se registrar
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # Loop já fechado: ninguém mais espera nesse future
+                pass
+
+    def _reserve(self, model_id: str) -> float:
+        """Fichas da key e do modelo; devolve a espera necessária"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.key_bucket.reserve(now), self._model_bucket(model_id).reserve(now))
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self.stats["throttle_seconds"] += wait
+            return wait
+
+    @asynccontextmanager
+    async def slot(self, model_id: str):
+        """Vaga na fila + fichas para uma requisição (uso em código assíncrono)"""
+        self._enqueue()
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                future = loop.create_future()
+                if self._try_start((loop, future)):
+                    break
+                await future
+        except BaseException:
+            self._cancel_wait()
+            raise
+        try:
+            wait = self._reserve(model_id)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            self._finish()
+
+    @contextmanager
+    def slot_sync(self, model_id: str):
+        """Versão bloqueante de `slot` para clientes síncronos"""
+        self._enqueue()
+        try:
+            with self._slot_freed:
+                while self.in_flight >= self.max_in_flight:
+                    self._slot_freed.wait()
+                self.waiting -= 1
+                self.in_flight += 1
+        except BaseException:
+            self._cancel_wait()
+            raise
+        try:
+            wait = self._reserve(model_id)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+        finally:
+            self._finish()
+
+    # ------------------------------------------------------------------
+    # Retentativas
+    # ------------------------------------------------------------------
+
+    def should_retry(self, status: int, attempt: int) -> bool:
+        """True se o status permite nova tentativa e ainda há tentativas"""
+        return status in RETRY_STATUSES and attempt < self.max_retries
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After em segundos (aceita segundos ou data HTTP)"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, model_id: str, attempt: int, status: int, retry_after: Optional[str] = None) -> float:
+        """Espera antes da próxima tentativa; Retry-After também pausa o modelo para os demais"""
+        with self._lock:
+            self.stats["retries"] += 1
+        server_delay = self.parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = min(server_delay, self.max_delay)
+            with self._lock:
+                self._model_bucket(model_id).pause(delay)
+        else:
+            # Jitter completo: espalha as retentativas de chamadores concorrentes
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        logger.info(f"Status {status} de {model_id}: nova tentativa {attempt + 1}/{self.max_retries} "
+                    f"em {delay:.2f}s")
+        return delay
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores e ocupação da fila"""
+        with self._lock:
+            return dict(self.stats, in_flight=self.in_flight, waiting=self.waiting,
+                        max_in_flight=self.max_in_flight, max_queue=self.max_queue)
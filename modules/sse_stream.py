@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SSE Stream
+----------
+Decodificação das respostas em streaming (Server-Sent Events) da API de
+chat completions do OpenRouter.
+
+Com `"stream": true` a API devolve linhas `data: {json}` separadas por
+linhas em branco; cada JSON traz um pedaço da resposta em
+`choices[0].delta.content`, o último traz `usage` e o fim é marcado por
+`data: [DONE]`. Linhas iniciadas por `:` são comentários de keep-alive
+(": OPENROUTER PROCESSING") e são ignoradas.
+
+O decodificador recebe bytes em pedaços arbitrários (um evento pode
+chegar partido entre dois pacotes TCP) e é usado tanto pelo cliente
+aiohttp (OpenRouterManager) quanto pelo cliente requests
+(OpenRouterClient).
+
+Autor: [Seu Nome]
+Data: 01/07/2025
+Versão: 0.1.0
+"""
+
+import json
+import time
+import logging
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger("SSE_STREAM")
+
+DONE_MARKER = "[DONE]"
+
+
+class SSEDecoder:
+    """Junta pedaços de bytes e devolve os campos `data` de cada evento completo"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._data: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Processa um pedaço recebido e devolve os eventos que ficaram completos"""
+        self._buffer += chunk
+        events = []
+        while b"\n" in self._buffer:
+            raw, self._buffer = self._buffer.split(b"\n", 1)
+            line = raw.rstrip(b"\r").decode('utf-8', errors='replace')
+            if not line:
+                # Linha em branco encerra o evento
+                if self._data:
+                    events.append("\n".join(self._data))
+                    self._data = []
+            elif line.startswith(":"):
+                continue
+            elif line.startswith("data:"):
+                value = line[5:]
+                self._data.append(value[1:] if value.startswith(" ") else value)
+        return events
+
+    def close(self) -> List[str]:
+        """Eventos pendentes quando a conexão termina sem a linha em branco final"""
+        events = self.feed(b"\n\n") if self._buffer else []
+        if self._data:
+            events.append("\n".join(self._data))
+            self._data = []
+        return events
+
+
+class StreamState:
+    """Acumula a resposta de um stream e mede o tempo até o primeiro token"""
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.parts: List[str] = []
+        self.usage: Dict[str, Any] = {}
+        self.finish_reason: Optional[str] = None
+        self.finished = False
+
+    def parse(self, data: str) -> Dict[str, Any]:
+        """Converte o campo `data` de um evento num evento de stream.
+
+        Devolve {"type": "delta", "content"}, {"type": "error", "error"} ou
+        {"type": "skip"} (eventos só com metadados, usage ou [DONE]).
+        """
+        if data.strip() == DONE_MARKER:
+            self.finished = True
+            return {"type": "skip"}
+        try:
+            payload = json.loads(data)
+        except json.JSONDecodeError:
+            logger.debug(f"Evento SSE ignorado (JSON inválido): {data[:80]}")
+            return {"type": "skip"}
+
+        if payload.get("error"):
+            error = payload["error"]
+            return {"type": "error", "error": error.get("message", str(error)) if isinstance(error, dict) else str(error)}
+        if payload.get("usage"):
+            self.usage = payload["usage"]
+
+        choices = payload.get("choices") or [{}]
+        choice = choices[0]
+        if choice.get("finish_reason"):
+            self.finish_reason = choice["finish_reason"]
+        content = (choice.get("delta") or {}).get("content") or ""
+        if not content:
+            return {"type": "skip"}
+
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.parts.append(content)
+        return {"type": "delta", "content": content}
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Segundos entre o envio da requisição e o primeiro token"""
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    def result(self, cancelled: bool = False, **extra) -> Dict[str, Any]:
+        """Evento final com a resposta completa, no formato de chat_with_model"""
+        elapsed = time.perf_counter() - self.started
+        if self.ttft is not None:
+            logger.info(f"Stream {self.model_id}: primeiro token em {self.ttft:.2f}s, total {elapsed:.2f}s"
+                        f"{' (cancelado)' if cancelled else ''}")
+        result = {
+            "type": "done",
+            "success": True,
+            "response": "".join(self.parts),
+            "usage": self.usage,
+            "model": self.model_id,
+            "finish_reason": self.finish_reason,
+            "ttft": self.ttft,
+            "elapsed": elapsed,
+            "cancelled": cancelled
+        }
+        result.update(extra)
+        return result
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Fake OpenRouter
+---------------
+Servidor HTTP local que imita a API do OpenRouter (/chat/completions,
+com e sem streaming SSE, e /models com ETag) para testes e benchmarks sem rede.
+
+Roda numa thread própria com seu event loop, de modo que tanto clientes
+aiohttp quanto requests possam usá-lo:
+
+    with FakeOpenRouter(reply="olá mundo") as server:
+        manager.base_url = server.url
+
+Uso: importado pelos testes em tests/
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional
+
+from aiohttp import web
+
+
+class FakeOpenRouter:
+    """API OpenRouter falsa em http://127.0.0.1:<porta>/api/v1"""
+
+    def __init__(self, reply: str = "resposta do modelo", chunk_words: int = 1,
+                 delay: float = 0.0, models: Optional[List[Dict[str, Any]]] = None,
+                 handshake_delay: float = 0.0, model_latency: Optional[Dict[str, float]] = None,
+                 model_status: Optional[Dict[str, int]] = None, rate_limit_first: int = 0,
+                 retry_after: Optional[str] = None):
+        """
+        Args:
+            reply: texto devolvido pelo modelo
+            chunk_words: palavras por evento SSE
+            delay: pausa (s) antes de cada evento SSE
+            models: catálogo devolvido em /models
+            handshake_delay: pausa (s) na primeira requisição de cada conexão,
+                simulando o custo de TCP + TLS de um servidor remoto
+            model_latency: pausa (s) antes de responder, por model_id
+            model_status: status HTTP de erro devolvido, por model_id
+            rate_limit_first: quantas requisições de chat iniciais recebem 429
+            retry_after: valor do cabeçalho Retry-After nesses 429
+        """
+        self.reply = reply
+        self.chunk_words = chunk_words
+        self.delay = delay
+        self.handshake_delay = handshake_delay
+        self.model_latency = model_latency or {}
+        self.model_status = model_status or {}
+        self.rate_limit_first = rate_limit_first
+        self.retry_after = retry_after
+        self.rate_limited = 0
+        # Horário (time.monotonic) de chegada de cada requisição de chat
+        self.request_times: List[float] = []
+        self.models = models if models is not None else [
+            {"id": "fake/modelo", "name": "Modelo Falso", "context_length": 8192,
+             "pricing": {"prompt": "0", "completion": "0"}}
+        ]
+        self.requests: List[Dict[str, Any]] = []
+        self.models_requests = 0
+        # (host, porta) do cliente: uma entrada por conexão TCP aberta
+        self.connections = set()
+        self.url = ""
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Handlers
+    # ------------------------------------------------------------------
+
+    def _usage(self, payload: Dict[str, Any]) -> Dict[str, int]:
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in payload.get("messages", []))
+        completion_tokens = len(self.reply.split())
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    async def _track(self, request: web.Request):
+        peer = request.transport.get_extra_info("peername")
+        if peer not in self.connections:
+            self.connections.add(peer)
+            if self.handshake_delay:
+                await asyncio.sleep(self.handshake_delay)
+
+    async def _chat(self, request: web.Request) -> web.StreamResponse:
+        await self._track(request)
+        payload = await request.json()
+        self.requests.append(payload)
+        self.request_times.append(time.monotonic())
+
+        if self.rate_limited < self.rate_limit_first:
+            self.rate_limited += 1
+            headers = {"Retry-After": self.retry_after} if self.retry_after is not None else {}
+            return web.json_response({"error": {"message": "Rate limit exceeded", "code": 429}},
+                                     status=429, headers=headers)
+
+        model_id = payload.get("model")
+        if self.model_latency.get(model_id):
+            await asyncio.sleep(self.model_latency[model_id])
+        if self.model_status.get(model_id):
+            return web.json_response({"error": {"message": "erro simulado", "code": self.model_status[model_id]}},
+                                     status=self.model_status[model_id])
+
+        if not payload.get("stream"):
+            return web.json_response({
+                "id": "fake", "model": payload.get("model"),
+                "choices": [{"message": {"role": "assistant", "content": self.reply}, "finish_reason": "stop"}],
+                "usage": self._usage(payload)
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+
+        words = self.reply.split(" ")
+        for i in range(0, len(words), self.chunk_words):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            piece = " ".join(words[i:i + self.chunk_words]) + (" " if i + self.chunk_words < len(words) else "")
+            event = {"choices": [{"delta": {"content": piece}, "finish_reason": None}]}
+            try:
+                await response.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            except (ConnectionResetError, RuntimeError):
+                # Cliente fechou a conexão (cancelamento)
+                return response
+
+        final = {"choices": [{"delta": {}, "finish_reason": "stop"}], "usage": self._usage(payload)}
+        await response.write(f"data: {json.dumps(final)}\n\n".encode('utf-8'))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def _models(self, request: web.Request) -> web.Response:
+        await self._track(request)
+        body = json.dumps({"data": self.models})
+        etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+        self.models_requests += 1
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        app = web.Application()
+        app.router.add_post("/api/v1/chat/completions", self._chat)
+        app.router.add_get("/api/v1/models", self._models)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/api/v1"
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> "FakeOpenRouter":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+
+    def __enter__(self) -> "FakeOpenRouter":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Async Runtime
+----------------------
+Testes do event loop persistente e da sessão HTTP compartilhada do
+OpenRouterManager.
+
+Uso: python -m pytest tests/test_async_runtime.py
+"""
+
+import sys
+import asyncio
+import concurrent.futures
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rate_limiter import RateLimiter
+from modules.openrouter_manager import OpenRouterManager
+from tests.fake_openrouter import FakeOpenRouter
+
+MESSAGES = [{"role": "user", "content": "olá"}]
+
+
+def _manager(server, tmp_path):
+    manager = OpenRouterManager(catalog_path=tmp_path / "models.json.gz")
+    manager.api_key = "teste"
+    # Limitador próprio: o compartilhado por API key acumularia fichas entre os testes
+    manager.rate_limiter = RateLimiter()
+    manager.base_url = server.url
+    return manager
+
+
+def test_submit_reuses_one_connection(tmp_path):
+    """Várias mensagens pelo loop persistente usam uma única conexão keep-alive"""
+    with FakeOpenRouter(reply="ok") as server:
+        manager = _manager(server, tmp_path)
+        try:
+            future = manager.submit(manager.chat_with_model("fake/modelo", MESSAGES))
+            assert isinstance(future, concurrent.futures.Future)
+            assert future.result(5)["response"] == "ok"
+            for _ in range(4):
+                assert manager.submit(manager.chat_with_model("fake/modelo", MESSAGES)).result(5)["success"]
+            assert manager.submit(manager.get_models()).result(5)[0].id == "fake/modelo"
+
+            assert len(server.requests) == 5
+            assert len(server.connections) == 1
+            assert manager.get_status()["runtime"]["session_open"]
+        finally:
+            manager.close()
+    assert not manager.runtime.is_running()
+
+
+def test_concurrent_submits_and_foreign_loop(tmp_path):
+    """Futures concorrentes; chamadas com asyncio.run continuam funcionando"""
+    with FakeOpenRouter(reply="resposta", delay=0.01) as server:
+        manager = _manager(server, tmp_path)
+        try:
+            futures = [manager.submit(manager.chat_with_model("fake/modelo", MESSAGES)) for _ in range(6)]
+            assert all(f.result(5)["response"] == "resposta" for f in futures)
+
+            # Fora do loop persistente uma sessão temporária é usada
+            assert asyncio.run(manager.chat_with_model("fake/modelo", MESSAGES))["success"]
+        finally:
+            manager.close()
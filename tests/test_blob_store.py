@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Blob Store
+-------------------
+Testes do armazenamento de conteúdo em blocos comprimidos e da sua
+integração com o AdvancedRAGSystem.
+
+Uso: python -m pytest tests/test_blob_store.py
+"""
+
+import sys
+import json
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.blob_store import BlobStore
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def test_roundtrip_and_partial_read(tmp_path):
+    """Leitura parcial devolve o mesmo trecho do texto original, atravessando blocos"""
+    store = BlobStore(tmp_path / "content.blob", block_chars=16)
+    text = "".join(f"linha {i} ção\n" for i in range(50))
+    ref = store.put(text)
+
+    assert store.read(ref) == text
+    assert store.read(ref, 10, 70) == text[10:70]
+    assert store.read(ref, len(text) - 5) == text[-5:]
+    assert store.read(ref, 30, 30) == ""
+    assert BlobStore.stored_size(ref) == store.size
+
+
+def test_writer_streaming_and_reopen(tmp_path):
+    """Texto escrito em partes é lido de volta após reabrir o arquivo"""
+    path = tmp_path / "content.blob"
+    store = BlobStore(path, block_chars=32)
+    first = store.put("documento anterior")
+    writer = store.writer()
+    pages = [f"página {i} " * 5 for i in range(10)]
+    for page in pages:
+        writer.write(page)
+    ref = writer.close()
+    store.flush()
+    store.close()
+
+    reopened = BlobStore(path, block_chars=32)
+    assert reopened.read(first) == "documento anterior"
+    assert reopened.read(ref) == "".join(pages)
+    assert reopened.read(ref, 100, 150) == "".join(pages)[100:150]
+
+
+def test_rag_keeps_content_out_of_knowledge_base(tmp_path):
+    """O texto fica no blob store; checkpoint e journal guardam só a referência"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    marker = "kubernetesdeploymentrollout"
+    text = f"guia de {marker} com docker compose"
+    (docs / "a.txt").write_text(text, encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "a.txt")
+    # O vocabulário vai para o índice, o texto não
+    assert text not in rag.store.journal_file.read_text(encoding='utf-8')
+
+    rag._save_knowledge_base()
+    assert text not in rag.store.checkpoint_file.read_text(encoding='utf-8')
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    results = reloaded.search_knowledge(marker)["results"]
+    assert results and marker in results[0]["snippet"]
+    assert reloaded.get_stats()["total_content_size"] == len(text)
+
+
+def test_rag_migrates_inline_content(tmp_path):
+    """Documentos de versões anteriores (com content embutido) vão para o blob store"""
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.knowledge_base["documents"]["general_legacy"] = {
+        "id": "general_legacy", "category": "general", "content": "conteúdo legado do terraform"
+    }
+    rag.store.checkpoint(lambda: json.dumps(rag.knowledge_base))
+    rag.blob_store.close()
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    doc = reloaded.knowledge_base["documents"]["general_legacy"]
+    assert "content" not in doc
+    assert reloaded._document_text(doc) == "conteúdo legado do terraform"
+    assert "conteúdo legado" not in reloaded.store.checkpoint_file.read_text(encoding='utf-8')
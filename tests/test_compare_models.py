@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste da Comparação de Modelos
+------------------------------
+Testes do envio paralelo da mesma mensagem a vários modelos
+(OpenRouterManager.compare_models) e do cálculo de custo.
+
+Uso: python -m pytest tests/test_compare_models.py
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import aiohttp
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.llm_cache import LLMCache
+from modules.rate_limiter import RateLimiter
+from modules.openrouter_manager import OpenRouterManager, OpenRouterModel
+from tests.fake_openrouter import FakeOpenRouter
+
+MESSAGES = [{"role": "user", "content": "crie um workflow n8n de exemplo"}]
+
+
+def _manager(server, tmp_path):
+    manager = OpenRouterManager(catalog_path=tmp_path / "models.json.gz")
+    manager.api_key = "teste"
+    # Limitador próprio: o compartilhado por API key acumularia fichas entre os testes
+    manager.rate_limiter = RateLimiter()
+    manager.base_url = server.url
+    manager.models_cache = {
+        "pago/grande": OpenRouterModel(id="pago/grande", name="Grande", description="", context_length=128000,
+                                       pricing={"prompt": "0.000002", "completion": "0.00001"},
+                                       company="Pago", is_free=False, tags=[]),
+        "livre/pequeno": OpenRouterModel(id="livre/pequeno", name="Pequeno", description="", context_length=8192,
+                                         pricing={"prompt": "0", "completion": "0"},
+                                         company="Livre", is_free=True, tags=[]),
+    }
+    return manager
+
+
+async def _collect(stream):
+    return [result async for result in stream]
+
+
+def test_compare_models_concurrent_arrival_order(tmp_path, monkeypatch):
+    """Respostas em paralelo, na ordem de chegada, com latência e custo"""
+    sessions = []
+    client_session = aiohttp.ClientSession
+
+    def counting_session(*args, **kwargs):
+        sessions.append(client_session(*args, **kwargs))
+        return sessions[-1]
+
+    monkeypatch.setattr(aiohttp, "ClientSession", counting_session)
+    latency = {"pago/grande": 0.3, "livre/pequeno": 0.1, "quebrado": 0.2}
+    with FakeOpenRouter(reply="resposta do modelo", model_latency=latency,
+                        model_status={"quebrado": 400}) as server:
+        manager = _manager(server, tmp_path)
+        started = time.perf_counter()
+        results = asyncio.run(_collect(manager.compare_models(["pago/grande", "livre/pequeno", "quebrado"],
+                                                              MESSAGES, "n8n")))
+        elapsed = time.perf_counter() - started
+
+    # Uma única sessão HTTP para as três requisições
+    assert len(sessions) == 1
+
+    # Em paralelo: o total fica perto do mais lento, não da soma
+    assert elapsed < sum(latency.values())
+    assert [r["model"] for r in results] == ["livre/pequeno", "quebrado", "pago/grande"]
+    assert [r["arrival"] for r in results] == [1, 2, 3]
+    assert len(server.requests) == 3
+
+    free, broken, paid = results
+    assert free["cost"] == 0 and free["latency"] >= 0.1
+    assert "error" in broken and broken["cost"] is None
+    usage = paid["usage"]
+    assert paid["cost"] == usage["prompt_tokens"] * 0.000002 + usage["completion_tokens"] * 0.00001
+    assert "pago/grande" in manager.router.stats()
+
+
+def test_compare_models_bypasses_response_cache(tmp_path):
+    """Com o cache ligado, a comparação ainda mede requisições reais"""
+    with FakeOpenRouter(reply="resposta do modelo") as server:
+        manager = _manager(server, tmp_path)
+        manager.response_cache = LLMCache(tmp_path / "llm")
+        asyncio.run(manager.chat_with_model("pago/grande", MESSAGES, "n8n"))
+        results = asyncio.run(_collect(manager.compare_models(["pago/grande", "livre/pequeno"], MESSAGES, "n8n")))
+        assert len(server.requests) == 3
+
+    assert not any(result["cached"] for result in results)
+    assert all(result["usage"] for result in results)
+
+
+def test_estimate_cost_unknown_model(tmp_path):
+    """Sem pricing no catálogo o custo é desconhecido"""
+    with FakeOpenRouter() as server:
+        manager = _manager(server, tmp_path)
+    assert manager.estimate_cost("desconhecido", {"prompt_tokens": 10}) is None
+    assert manager.estimate_cost("pago/grande", {"prompt_tokens": 1000, "completion_tokens": 100}) == \
+        1000 * 0.000002 + 100 * 0.00001
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Context Packer
+-----------------------
+Testes do empacotamento de contexto por orçamento de tokens e da sua
+integração com AdvancedRAGSystem.query_with_context.
+
+Uso: python -m pytest tests/test_context_packer.py
+"""
+
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.context_packer import ContextPacker, estimate_tokens
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def test_budget_follows_context_length():
+    """Janelas maiores recebem mais contexto; a pergunta consome o orçamento"""
+    packer = ContextPacker()
+    small = packer.budget_for(4096, "pergunta curta")
+    large = packer.budget_for(128000, "pergunta curta")
+
+    assert 0 < small < large
+    assert packer.budget_for(4096, "palavra " * 500) < small
+    assert packer.budget_for(None) == packer.budget_for(4096)
+
+
+def test_pack_dedup_truncate_and_order():
+    """Duplicatas descartadas, último trecho cortado e ordem por documento/posição"""
+    packer = ContextPacker(min_fragment_tokens=5)
+    candidates = [
+        {"id": "a#1", "document_id": "a", "text": "segundo trecho de a " * 5, "score": 3.0, "start": 100},
+        {"id": "b#0", "document_id": "b", "text": "trecho de b " * 5, "score": 2.5, "start": 0},
+        {"id": "a#0", "document_id": "a", "text": "primeiro trecho de a " * 5, "score": 2.0, "start": 0},
+        {"id": "c#0", "document_id": "c", "text": "Trecho  de B " * 5, "score": 1.0, "start": 0},
+        {"id": "d#0", "document_id": "d", "text": "documento longo " * 200, "score": 0.5, "start": 0},
+    ]
+    full = sum(estimate_tokens(f"--- {c['document_id']} ---") + estimate_tokens(c["text"]) for c in candidates[:3])
+    packing = packer.pack(candidates, full + 20)
+
+    assert packing["included"] == ["a#0", "a#1", "b#0", "d#0"]
+    assert packing["truncated"] == ["d#0"]
+    assert {"id": "c#0", "reason": "duplicate"} in packing["skipped"]
+    assert packing["used_tokens"] <= packing["budget"]
+    assert packing["context"].index("primeiro trecho") < packing["context"].index("segundo trecho")
+    assert packing["context"].endswith("[...]")
+
+
+def test_query_with_context_respects_model_window(tmp_path, monkeypatch):
+    """Modelos com janela pequena recebem menos chunks, e o relatório volta ao chamador"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(6):
+        (docs / f"doc{i}.txt").write_text(f"docker compose serviço {i} " + "configuração detalhada " * 300,
+                                          encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    for i in range(6):
+        rag.add_document(docs / f"doc{i}.txt")
+
+    sent = []
+    monkeypatch.setattr(rag.openrouter_client, "query_model",
+                        lambda model_id, prompt, context="": sent.append(context) or {"success": True, "response": "ok"})
+
+    small = rag.query_with_context("docker compose", "modelo/pequeno", context_length=2048)
+    large = rag.query_with_context("docker compose", "modelo/grande", context_length=128000)
+
+    assert small["success"] and large["success"]
+    assert small["packing"]["used_tokens"] <= small["packing"]["budget"]
+    assert len(small["context_chunks"]) < len(large["context_chunks"])
+    assert estimate_tokens(sent[0]) < estimate_tokens(sent[1])
+    assert large["packing"]["context_length"] == 128000
+
+
+def test_context_docs_rank_phrase_matches_first(tmp_path):
+    """Com context_docs, frases entre aspas também ordenam os chunks candidatos"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "solto.txt").write_text("compose aparece aqui e docker aparece depois", encoding='utf-8')
+    (docs / "frase.txt").write_text("para subir rode docker compose no servidor", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    loose = rag.add_document(docs / "solto.txt")["document_id"]
+    phrase = rag.add_document(docs / "frase.txt")["document_id"]
+
+    candidates = rag._context_candidates('"docker compose"', [loose, phrase])
+    scores = {candidate["document_id"]: candidate["score"] for candidate in candidates}
+    assert scores[phrase] > 0 and scores[loose] == 0
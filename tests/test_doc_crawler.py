@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Crawler de Documentação
+--------------------------------
+Testes do DocumentationCrawler contra um servidor HTTP local que simula
+um site de documentação.
+
+Uso: python -m pytest tests/test_doc_crawler.py
+"""
+
+import sys
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+pytest.importorskip("aiohttp")
+
+from modules.advanced_rag_system import AdvancedRAGSystem
+from modules.doc_crawler import DocumentationCrawler, normalize_url
+
+
+def _page(title, links):
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return f"<html><title>{title}</title><body>{title} {anchors}</body></html>"
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    pages = {
+        "/docs/": _page("inicio", ["guide", "api#topo", "/docs/api", "/outside", "logo.png",
+                                   "http://example.invalid/docs/x"]),
+        "/docs/guide": _page("guia", ["/docs/", "deep/one"]),
+        "/docs/api": _page("referencia", ["guide"]),
+        "/docs/deep/one": _page("profundo", ["two"]),
+        "/docs/deep/two": _page("escondido", []),
+        "/outside": _page("fora", []),
+    }
+    requests = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(0.05)
+            body = self.pages.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = body.encode('utf-8')
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    _SiteHandler.requests = []
+    _SiteHandler.max_active = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_normalize_url():
+    """Fragmento removido e host em minúsculas"""
+    assert normalize_url("HTTP://Docs.Example.com/a#b") == "http://docs.example.com/a"
+
+
+def test_crawl_limits_and_dedup(tmp_path, site):
+    """Cada página uma vez, dentro do escopo, da profundidade e do limite por host"""
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    crawler = DocumentationCrawler(rag, max_depth=2, concurrency=8, per_host=2)
+    result = crawler.crawl([(f"{site}/docs/", "docs")])
+
+    assert sorted(_SiteHandler.requests) == ["/docs/", "/docs/api", "/docs/deep/one", "/docs/guide"]
+    assert result["indexed"] == 4 and result["failed"] == 0
+    assert _SiteHandler.max_active <= 2
+    assert rag.search_knowledge("referencia", category="docs")["total_found"] == 1
+    assert rag.search_knowledge("escondido")["total_found"] == 0
+
+    # Recrawl: só 304s, nada é reindexado e os links continuam sendo seguidos
+    journal_size = rag.store.journal_size()
+    again = DocumentationCrawler(rag, max_depth=2).crawl([(f"{site}/docs/", "docs")])
+    assert again["not_modified"] == 4 and again["indexed"] == 0
+    assert rag.store.journal_size() == journal_size
+
+
+def test_page_limit(tmp_path, site):
+    """max_pages limita a fronteira de cada documentação"""
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    result = DocumentationCrawler(rag, max_pages=2).crawl([(f"{site}/docs/", "docs")])
+    assert result["fetched"] == 2
+
+
+def test_single_parse_off_loop_and_concurrent_search(tmp_path, site, monkeypatch, caplog):
+    """Um parse por página fora do loop; links seguidos sem esperar a ingestão; buscas concorrentes íntegras"""
+    caplog.set_level(logging.ERROR)
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    parses = []
+    parse_page = rag.parse_fetched_page
+    add_content = rag.add_fetched_content
+    fetched_during_root_ingestion = []
+
+    def recording_parse(url, fetched):
+        parses.append((url, threading.get_ident()))
+        return parse_page(url, fetched)
+
+    def slow_add(url, fetched, category="web", page=None):
+        assert page is not None
+        if url.endswith("/docs/"):
+            time.sleep(0.3)
+            fetched_during_root_ingestion.append(len(_SiteHandler.requests))
+        return add_content(url, fetched, category, page)
+
+    monkeypatch.setattr(rag, "parse_fetched_page", recording_parse)
+    monkeypatch.setattr(rag, "add_fetched_content", slow_add)
+    done = threading.Event()
+    searches = []
+
+    def search_loop():
+        while not done.is_set():
+            searches.append(rag.search_knowledge("guia", use_cache=False)["success"])
+            searches.append(rag.search_semantic("referencia").get("success", True))
+
+    searcher = threading.Thread(target=search_loop)
+    searcher.start()
+    try:
+        result = DocumentationCrawler(rag, max_depth=2, concurrency=8).crawl([(f"{site}/docs/", "docs")])
+    finally:
+        done.set()
+        searcher.join()
+
+    assert result["indexed"] == 4 and result["failed"] == 0
+    assert sorted(url for url, _ in parses) == sorted(set(url for url, _ in parses)) and len(parses) == 4
+    assert threading.get_ident() not in {thread for _, thread in parses}
+    # Os filhos da raiz foram baixados enquanto ela ainda era indexada
+    assert fetched_during_root_ingestion[0] > 1
+    assert searches and all(searches)
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Cache HTTP
+-------------------
+Testes da revalidação condicional (ETag / Last-Modified) usada por
+add_url_content, contra um servidor HTTP local.
+
+Uso: python -m pytest tests/test_http_cache.py
+"""
+
+import sys
+import hashlib
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.http_cache import HTTPCache
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+class _DocsHandler(BaseHTTPRequestHandler):
+    pages = {}
+    full_responses = 0
+    use_validators = True
+
+    def do_GET(self):
+        body = self.pages[self.path].encode('utf-8')
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.use_validators and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        type(self).full_responses += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.use_validators:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _DocsHandler.pages = {"/docker": "<html><title>Docker</title><body>docker compose</body></html>"}
+    _DocsHandler.full_responses = 0
+    _DocsHandler.use_validators = True
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _DocsHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_not_modified_skips_reindex(tmp_path, server):
+    """304 não baixa o corpo nem grava no journal; conteúdo novo é reindexado"""
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    url = f"{server}/docker"
+
+    first = rag.add_url_content(url, "docker")
+    assert first["success"] and first["status"] == "new"
+    journal_size = rag.store.journal_size()
+
+    assert rag.add_url_content(url, "docker")["status"] == "fresh"
+    second = rag.add_url_content(url, "docker", max_age=None)
+    assert second["status"] == "not_modified" and second["cached"] is True
+    assert rag.store.journal_size() == journal_size
+    assert _DocsHandler.full_responses == 1
+
+    _DocsHandler.pages["/docker"] = "<html><title>Docker</title><body>docker swarm</body></html>"
+    refreshed = rag.refresh_urls()
+    assert refreshed["updated"] == 1
+    assert rag.search_knowledge("swarm", category="docker")["total_found"] == 1
+    assert rag.search_knowledge("compose", category="docker")["total_found"] == 0
+
+
+def test_identical_body_without_validators(tmp_path, server):
+    """Sem ETag o corpo volta inteiro, mas o hash detecta que nada mudou"""
+    _DocsHandler.use_validators = False
+    cache = HTTPCache(tmp_path / "cache")
+    url = f"{server}/docker"
+
+    assert cache.fetch(url)["changed"] is True
+    result = cache.fetch(url)
+    assert result["status"] == "modified" and result["changed"] is False
+    assert b"docker compose" in result["body"]
+
+
+def test_refetched_shorter_page_drops_old_chunks(tmp_path, server):
+    """Página que encolheu não deixa chunks da versão anterior no índice"""
+    long_body = " ".join(f"antigo{i}" for i in range(2000))
+    _DocsHandler.pages["/docker"] = f"<html><title>Docker</title><body>{long_body}</body></html>"
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    url = f"{server}/docker"
+
+    doc_id = rag.add_url_content(url, "docker")["document_id"]
+    assert rag.knowledge_base["documents"][doc_id]["chunk_count"] > 1
+
+    _DocsHandler.pages["/docker"] = "<html><title>Docker</title><body>docker swarm</body></html>"
+    assert rag.refresh_urls()["updated"] == 1
+
+    chunks = [chunk_id for chunk_id in rag.knowledge_base["chunks"] if chunk_id.startswith(f"{doc_id}#")]
+    assert chunks == [f"{doc_id}#0"]
+    assert rag.search_knowledge("antigo1500")["total_found"] == 0
+    assert rag.search_knowledge("swarm")["total_found"] == 1
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Cache de Respostas
+---------------------------
+Testes do cache de respostas de LLM em disco (chave por conteúdo, TTL,
+remoção LRU por tamanho) e do seu uso pelo OpenRouterManager.
+
+Uso: python -m pytest tests/test_llm_cache.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.llm_cache import LLMCache
+from modules.rate_limiter import RateLimiter
+from modules.openrouter_manager import OpenRouterManager
+from tests.fake_openrouter import FakeOpenRouter
+
+MESSAGES = [{"role": "user", "content": "olá"}]
+
+
+def _manager(server, tmp_path, cache):
+    manager = OpenRouterManager(catalog_path=tmp_path / "models.json.gz", response_cache=cache)
+    manager.api_key = "teste"
+    manager.base_url = server.url
+    manager.rate_limiter = RateLimiter()
+    return manager
+
+
+def test_key_covers_model_messages_and_parameters():
+    """Qualquer diferença no que seria enviado muda a chave"""
+    key = LLMCache.make_key("m", MESSAGES, 0.7, 2000)
+    assert key == LLMCache.make_key("m", [{"content": "olá", "role": "user"}], 0.7, 2000)
+    assert len({key,
+                LLMCache.make_key("outro", MESSAGES, 0.7, 2000),
+                LLMCache.make_key("m", MESSAGES + [{"role": "user", "content": "?"}], 0.7, 2000),
+                LLMCache.make_key("m", MESSAGES, 0.2, 2000),
+                LLMCache.make_key("m", MESSAGES, 0.7, 100)}) == 5
+
+
+def _put_at(cache, key, entry, stored_at, monkeypatch):
+    """Grava a entrada como se fosse no instante stored_at"""
+    with monkeypatch.context() as patch:
+        patch.setattr(time, "time", lambda: stored_at)
+        cache.put(key, entry)
+
+
+def test_ttl_and_lru_eviction(tmp_path, monkeypatch):
+    """Entradas expiram pelo TTL e as menos acessadas saem quando passa do limite"""
+    cache = LLMCache(tmp_path / "llm", ttl=60, max_bytes=600)
+    _put_at(cache, "velha", {"response": "x" * 100}, time.time() - 120, monkeypatch)
+    assert cache.get("velha") is None
+    assert cache.get_stats()["expired"] == 1 and not cache._path("velha").exists()
+
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"response": "x" * 100})
+        stamp = time.time() - 30 + index
+        os.utime(cache._path(key), (stamp, stamp))
+    # Acessar "a" o torna o mais recente: "b" é o próximo a sair
+    assert cache.get("a")["response"] == "x" * 100
+    cache.put("d", {"response": "x" * 200})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    stats = cache.get_stats()
+    assert stats["evicted"] >= 1 and stats["total_bytes"] <= 600
+    assert stats["total_bytes"] == sum(p.stat().st_size for p in (tmp_path / "llm").glob("*.json"))
+
+
+def test_ttl_counts_from_store_not_last_access(tmp_path, monkeypatch):
+    """Uma entrada lida o tempo todo ainda expira ttl segundos depois de gravada"""
+    cache = LLMCache(tmp_path / "llm", ttl=60)
+    for key, age in (("recente", 50), ("popular", 61)):
+        _put_at(cache, key, {"response": "ok"}, time.time() - age, monkeypatch)
+        # Acabou de ser lida: mtime (ordem do LRU) é de agora
+        os.utime(cache._path(key), None)
+
+    assert cache.get("recente")["response"] == "ok"
+    assert cache.get("popular") is None
+    assert cache.get_stats()["expired"] == 1
+
+
+def test_manager_serves_repeated_requests_from_cache(tmp_path):
+    """Requisição idêntica não chega ao servidor; use_cache=False força uma nova"""
+    cache = LLMCache(tmp_path / "llm")
+    with FakeOpenRouter(reply="PRD gerado") as server:
+        manager = _manager(server, tmp_path, cache)
+        first = asyncio.run(manager.generate_prd("fake/modelo", "loja online"))
+        started = time.perf_counter()
+        second = asyncio.run(manager.generate_prd("fake/modelo", "loja online"))
+        elapsed = time.perf_counter() - started
+        assert len(server.requests) == 1
+
+        other = asyncio.run(manager.generate_prd("fake/modelo", "blog"))
+        bypass = asyncio.run(manager.generate_prd("fake/modelo", "loja online", use_cache=False))
+        assert len(server.requests) == 3
+
+        # Uma nova instância reaproveita o que está em disco
+        reloaded = _manager(server, tmp_path, LLMCache(tmp_path / "llm"))
+        again = asyncio.run(reloaded.generate_prd("fake/modelo", "loja online"))
+        assert len(server.requests) == 3
+
+    assert first["success"] and not first["cached"]
+    assert second["cached"] and second["response"] == first["response"] == "PRD gerado"
+    assert second["usage"] == first["usage"] and second["attempts"] == 0
+    assert elapsed < 0.05
+    assert not other["cached"] and not bypass["cached"] and again["cached"]
+    stats = manager.get_status()["response_cache"]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 2, 3)
+
+
+def test_errors_are_not_cached(tmp_path):
+    """Só respostas de sucesso são gravadas"""
+    cache = LLMCache(tmp_path / "llm")
+    with FakeOpenRouter(model_status={"quebrado": 400}) as server:
+        manager = _manager(server, tmp_path, cache)
+        asyncio.run(manager.chat_with_model("quebrado", MESSAGES))
+        result = asyncio.run(manager.chat_with_model("quebrado", MESSAGES))
+        assert len(server.requests) == 2
+
+    assert "error" in result
+    assert cache.get_stats()["entries"] == 0
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Catálogo de Modelos
+----------------------------
+Testes do catálogo de modelos OpenRouter persistido em disco, da
+revalidação condicional e da detecção de mudanças.
+
+Uso: python -m pytest tests/test_model_catalog.py
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.openrouter_manager import OpenRouterManager
+from tests.fake_openrouter import FakeOpenRouter
+
+MODELS = [
+    {"id": "meta/llama", "name": "Meta: Llama", "context_length": 8192, "pricing": {"prompt": "0", "completion": "0"}},
+    {"id": "openai/gpt", "name": "OpenAI: GPT", "context_length": 128000,
+     "pricing": {"prompt": "0.000001", "completion": "0.000002"}},
+    {"id": "google/gemini", "name": "Google: Gemini", "context_length": 32000,
+     "pricing": {"prompt": "0", "completion": "0"}},
+]
+
+
+def _manager(url, catalog_path):
+    manager = OpenRouterManager(catalog_path=catalog_path)
+    manager.api_key = "teste"
+    manager.base_url = url
+    return manager
+
+
+def test_catalog_loads_from_disk_without_network(tmp_path):
+    """Depois da primeira busca, uma nova instância começa com o catálogo salvo"""
+    catalog_path = tmp_path / "cache" / "models.json.gz"
+    with FakeOpenRouter(models=[dict(m) for m in MODELS]) as server:
+        first = _manager(server.url, catalog_path)
+        result = asyncio.run(first.refresh_models())
+        assert result["status"] == "modified" and len(result["added"]) == 3
+
+    # Servidor fora do ar: o catálogo vem do disco
+    second = _manager("http://127.0.0.1:9/api/v1", catalog_path)
+    assert set(second.models_cache) == {"meta/llama", "openai/gpt", "google/gemini"}
+    assert second.models_cache["meta/llama"] == first.models_cache["meta/llama"]
+    assert second.search_models("gem")[0].id == "google/gemini"
+    assert len(asyncio.run(second.get_models())) == 3
+
+    # Mesmo forçando a atualização, um erro de rede mantém o catálogo salvo
+    assert len(asyncio.run(second.get_models(force_refresh=True))) == 3
+
+
+def test_refresh_revalidates_and_reports_changes(tmp_path):
+    """304 quando nada mudou; senão só os ids adicionados, removidos e alterados"""
+    catalog_path = tmp_path / "models.json.gz"
+    with FakeOpenRouter(models=[dict(m) for m in MODELS]) as server:
+        manager = _manager(server.url, catalog_path)
+        asyncio.run(manager.refresh_models())
+
+        assert asyncio.run(manager.refresh_models())["status"] == "fresh"
+        assert server.models_requests == 1
+
+        reloaded = _manager(server.url, catalog_path)
+        assert asyncio.run(reloaded.refresh_models(force=True))["status"] == "not_modified"
+
+        server.models = [dict(MODELS[0], context_length=16384), MODELS[1],
+                         {"id": "mistral/small", "name": "Mistral: Small", "context_length": 32000,
+                          "pricing": {"prompt": "0", "completion": "0"}}]
+        changes = asyncio.run(reloaded.refresh_models(force=True))
+
+    assert changes["status"] == "modified"
+    assert (changes["added"], changes["removed"], changes["changed"]) == \
+        (["mistral/small"], ["google/gemini"], ["meta/llama"])
+    assert reloaded.models_cache["meta/llama"].context_length == 16384
+    assert "google/gemini" not in _manager("http://127.0.0.1:9/api/v1", catalog_path).models_cache
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Model Router
+---------------------
+Testes das estatísticas por modelo, da escolha pelo p95 recente e das
+requisições de reserva (hedging) do OpenRouterManager.
+
+Uso: python -m pytest tests/test_model_router.py
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.model_router import ModelRouter, percentile
+from modules.rate_limiter import RateLimiter
+from modules.openrouter_manager import OpenRouterManager, OpenRouterModel
+from tests.fake_openrouter import FakeOpenRouter
+
+MESSAGES = [{"role": "user", "content": "gere um PRD"}]
+
+
+def _model(model_id, is_free=True, context_length=8192, company="Meta"):
+    return OpenRouterModel(id=model_id, name=model_id, description="", context_length=context_length,
+                           pricing={}, company=company, is_free=is_free, tags=[])
+
+
+def _manager(server, tmp_path, models):
+    manager = OpenRouterManager(catalog_path=tmp_path / "models.json.gz")
+    manager.api_key = "teste"
+    # Limitador próprio: o compartilhado por API key acumularia fichas entre os testes
+    manager.rate_limiter = RateLimiter()
+    manager.base_url = server.url
+    manager.models_cache = {model.id: model for model in models}
+    return manager
+
+
+def test_stats_and_ranking():
+    """p95, taxas de erro/429 e ordenação com restrições"""
+    router = ModelRouter(min_samples=2)
+    for latency in (1.0, 1.2, 1.1, 5.0):
+        router.record("rapido", 0.2, latency, tokens=100)
+    for latency in (2.0, 2.1):
+        router.record("estavel", 0.3, latency, tokens=100)
+    router.record("instavel", 0.1, 0.5, tokens=10)
+    router.record("instavel", None, 0.1, status=429)
+    router.record("instavel", 0.1, 0.5, tokens=10)
+
+    stats = router.stats("rapido")
+    assert stats["latency_p95"] == 5.0 and stats["latency_p50"] == 1.1
+    assert stats["tokens_per_second"] > 0
+    assert router.stats("instavel")["rate_limit_rate"] == 1 / 3
+    assert percentile([3, 1, 2, 4], 0.5) == 2
+
+    models = [_model("rapido"), _model("estavel"), _model("instavel"),
+              _model("pago", is_free=False), _model("novo", context_length=200000)]
+    # instavel: p95 0.5 penalizado pela taxa de erro (0.5 * (1 + 4/3)) ainda ganha de estavel (2.1)
+    assert [m.id for m in router.rank(models)][:3] == ["instavel", "estavel", "rapido"]
+    assert [m.id for m in router.rank(models, min_context_length=100000)] == ["novo"]
+    assert "pago" not in [m.id for m in router.rank(models, free_only=True)]
+
+
+def test_chat_routed_prefers_fast_model_and_fails_over(tmp_path):
+    """Escolhe o menor p95 e passa para o próximo quando o principal falha"""
+    models = [_model("lento"), _model("rapido"), _model("quebrado")]
+    with FakeOpenRouter(model_latency={"lento": 0.2}, model_status={"quebrado": 400}) as server:
+        manager = _manager(server, tmp_path, models)
+        manager.router.min_samples = 1
+        for model_id in ("lento", "rapido"):
+            assert asyncio.run(manager.chat_with_model(model_id, MESSAGES))["success"]
+        assert manager.select_model() == "rapido"
+
+        # Com latência padrão 0, "quebrado" (sem histórico) é tentado primeiro e falha
+        manager.router.default_latency = 0.0
+        result = asyncio.run(manager.chat_routed(MESSAGES, hedge=False))
+        assert result["success"]
+        assert result["routing"]["attempted"][0] == "quebrado"
+        assert manager.router.stats("quebrado")["error_rate"] == 1.0
+        manager.router.default_latency = 15.0
+        assert manager.select_model() == "rapido"
+
+
+def test_chat_routed_hedges_slow_primary(tmp_path):
+    """Principal acima do p95 esperado dispara a reserva, que responde primeiro"""
+    models = [_model("travado"), _model("reserva")]
+    with FakeOpenRouter(model_latency={"travado": 2.0, "reserva": 0.05}) as server:
+        manager = _manager(server, tmp_path, models)
+        manager.router = ModelRouter(min_samples=1, min_hedge_delay=0.1)
+        manager.router.record("travado", 0.05, 0.1)
+        manager.router.record("reserva", 0.05, 0.5)
+
+        result = asyncio.run(manager.chat_routed(MESSAGES))
+
+    assert result["success"] and result["routing"]["hedged"]
+    assert result["routing"]["used"] == "reserva"
+    assert result["routing"]["attempted"] == ["travado", "reserva"]
+    # A requisição cancelada não é registrada como erro do modelo lento
+    assert manager.router.stats("travado")["requests"] == 1
+    assert manager.router.stats("travado")["error_rate"] == 0.0
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Índice de Prefixos
+---------------------------
+Testes do autocompletar da base RAG e da busca de modelos.
+
+Uso: python -m pytest tests/test_prefix_index.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.prefix_index import PrefixIndex
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def test_complete_by_weight_and_filter():
+    """Completa por peso e filtra valores com várias chaves"""
+    index = PrefixIndex()
+    index.build([
+        ("docker", "docker", 5), ("dockerfile", "dockerfile", 9), ("docs", "docs", 1),
+        ("claude", "anthropic/claude-3.5-sonnet", 0), ("sonnet", "anthropic/claude-3.5-sonnet", 0),
+        ("claude", "anthropic/claude-3-haiku", 0), ("haiku", "anthropic/claude-3-haiku", 0),
+    ])
+
+    assert index.complete("Doc") == ["dockerfile", "docker", "docs"]
+    assert index.complete("dock", limit=1) == ["dockerfile"]
+    assert index.complete("x") == []
+    assert index.filter("claude son") == ["anthropic/claude-3.5-sonnet"]
+    assert len(index.filter("cl")) == 2
+
+
+def test_complete_is_fast():
+    """Completar num vocabulário de 100 mil termos leva microssegundos"""
+    index = PrefixIndex()
+    index.build((f"termo{i}", f"termo{i}", i % 97) for i in range(100_000))
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.complete("termo12345")
+    assert (time.perf_counter() - started) / 1000 < 1e-3
+    assert index.complete("termo9999", limit=3)[0].startswith("termo9999")
+
+
+def test_rag_completion_follows_index(tmp_path):
+    """complete() usa o vocabulário atual do índice, sem acentos"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("configuração do container docker", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert rag.complete("con") == []
+    rag.add_document(docs / "a.txt")
+    assert rag.complete("Con") == ["configuracao", "container"]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste dos Filtros RAG
+---------------------
+Testes dos bitmaps de metadados e das buscas filtradas do
+AdvancedRAGSystem.
+
+Uso: python -m pytest tests/test_rag_filters.py
+"""
+
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rag_filters import MetadataBitmaps
+from modules.rag_index import InvertedIndex
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def _build_bitmaps():
+    bitmaps = MetadataBitmaps()
+    bitmaps.add("a#0", {"category": "docker", "format": "PDF", "source": "file", "date": "2025-06-01"})
+    bitmaps.add("b#0", {"category": "docker", "format": "URL", "source": "url", "date": "2025-07-01"})
+    bitmaps.add("c#0", {"category": "git", "format": "PDF", "source": "file", "date": "2025-07-15"})
+    return bitmaps
+
+
+def test_select_intersects_attributes():
+    """OR entre valores de um atributo, AND entre atributos"""
+    bitmaps = _build_bitmaps()
+
+    assert bitmaps.select(None) is None
+    assert sorted(bitmaps.members(bitmaps.select({"format": "PDF"}))) == ["a#0", "c#0"]
+    assert bitmaps.members(bitmaps.select({"category": "docker", "format": "PDF"})) == ["a#0"]
+    assert sorted(bitmaps.members(bitmaps.select({"category": ["docker", "git"], "source": "file"}))) == ["a#0", "c#0"]
+    assert bitmaps.select({"category": "kubernetes"}) == 0
+
+
+def test_select_date_range_and_slot_reuse():
+    """Intervalo de datas inclusivo; slots liberados são reaproveitados"""
+    bitmaps = _build_bitmaps()
+
+    selected = bitmaps.select({"date_from": "2025-07-01", "date_to": "2025-07-15T23:59:59"})
+    assert sorted(bitmaps.members(selected)) == ["b#0", "c#0"]
+
+    bitmaps.remove("a#0")
+    assert bitmaps.select({"format": "PDF", "category": "docker"}) == 0
+    bitmaps.add("d#0", {"category": "git", "format": "MARKDOWN", "source": "file", "date": "2025-05-01"})
+    assert bitmaps.stats()["slots"] == 3
+    assert bitmaps.members(bitmaps.select({"date_to": "2025-06-30"})) == ["d#0"]
+
+
+def test_add_many_matches_add():
+    """Carga em lote gera os mesmos bitmaps que inserções uma a uma, inclusive com slots livres"""
+    docker = {"category": "docker", "format": "PDF", "source": "file", "date": "2025-06-01"}
+    git = {"category": "git", "format": None, "source": "url", "date": "2025-07-01"}
+    items = [(f"d{number}#{chunk}", docker if number % 2 else git) for number in range(50) for chunk in range(3)]
+
+    one_by_one = MetadataBitmaps()
+    for item_id, attributes in items:
+        one_by_one.add(item_id, attributes)
+    bulk = MetadataBitmaps()
+    bulk.add_many(items)
+    assert bulk.bitmaps == one_by_one.bitmaps and len(bulk) == 150
+
+    bulk.remove("d1#0")
+    bulk.remove("d2#1")
+    bulk.add_many([("novo#0", git), ("d3#0", git)])
+    assert bulk.stats()["slots"] == 150
+    assert "d1#0" not in bulk.members(bulk.select({"category": "docker"}))
+    assert "d3#0" in bulk.members(bulk.select({"category": "git"}))
+    assert bulk.count(bulk.select({"category": ["docker", "git"]})) == 149
+
+
+def test_index_search_with_candidates():
+    """Candidatos restringem a pontuação sem alterar os scores"""
+    index = InvertedIndex()
+    index.add_document("a", "docker compose up".split())
+    index.add_document("b", "docker build image".split())
+    index.add_document("c", "git push".split())
+
+    full = dict(index.search(["docker"]))
+    filtered = index.search(["docker"], candidates={"b", "c"})
+    assert filtered == [("b", full["b"])]
+    assert index.search(["docker"], candidates=set()) == []
+
+
+def test_rag_search_filters(tmp_path):
+    """search_knowledge filtra por formato, categoria e fonte"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "guia.md").write_text("# Guia\n\ndocker compose para desenvolvimento", encoding='utf-8')
+    (docs / "notas.txt").write_text("docker compose em produção", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "guia.md", category="docker")
+    rag.add_document(docs / "notas.txt", category="general")
+
+    assert rag.search_knowledge("docker compose")["total_found"] == 2
+
+    markdown = rag.search_knowledge("docker compose", filters={"format": "MARKDOWN"})
+    assert [r["metadata"]["format"] for r in markdown["results"]] == ["MARKDOWN"]
+
+    general = rag.search_knowledge("docker compose", category="general", filters={"source": "file"})
+    assert [r["category"] for r in general["results"]] == ["general"]
+    assert rag.search_knowledge("docker compose", filters={"source": "url"})["total_found"] == 0
+
+    # Bitmaps reconstruídos a partir do checkpoint
+    rag._save_knowledge_base()
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.search_knowledge("docker compose", filters={"format": "TEXT"})["total_found"] == 1
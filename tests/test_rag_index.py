@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Índice RAG
+-------------------
+Testes do índice invertido BM25 usado pelo AdvancedRAGSystem.
+
+Uso: python -m pytest tests/test_rag_index.py
+"""
+
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rag_index import InvertedIndex
+from modules.rag_query_cache import QueryCache
+
+
+def _build_index():
+    index = InvertedIndex()
+    index.add_document("docker", "docker compose up docker build".split())
+    index.add_document("git", "git commit git push branch".split())
+    index.add_document("n8n", "n8n workflow docker node".split())
+    return index
+
+
+def test_bm25_ranking():
+    """Documento com maior tf do termo vem primeiro"""
+    index = _build_index()
+    ranked = index.search(["docker"])
+
+    assert [doc_id for doc_id, _ in ranked] == ["docker", "n8n"]
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_search_only_matching_terms():
+    """Termos ausentes não geram resultados"""
+    index = _build_index()
+    assert index.search(["kubernetes"]) == []
+    assert [doc_id for doc_id, _ in index.search(["push"], limit=1)] == ["git"]
+
+
+def test_reindex_and_remove():
+    """Reindexar substitui postings; remover limpa vocabulário e comprimentos"""
+    index = _build_index()
+    index.add_document("git", "git rebase".split())
+
+    assert index.search(["push"]) == []
+    assert index.doc_lengths["git"] == 2
+
+    index.remove_document("git", ["git", "rebase"])
+    assert "git" not in index
+    assert "rebase" not in index.postings
+    assert index.total_length == sum(index.doc_lengths.values())
+
+
+def test_serialization_roundtrip():
+    """to_dict/from_dict preserva o ranking"""
+    index = _build_index()
+    data = index.to_dict()
+    restored = InvertedIndex.from_dict(data)
+
+    assert InvertedIndex.is_serialized_index(data)
+    assert not InvertedIndex.is_serialized_index({"docker": ["docker"]})
+    assert restored.search(["docker", "workflow"]) == index.search(["docker", "workflow"])
+
+
+def test_query_cache_invalidates_only_stale_entries():
+    """Só entradas que compartilham termos (e categoria) são descartadas"""
+    cache = QueryCache(max_entries=2)
+    docker_key = QueryCache.make_key("Docker  Compose", None, 5, "keyword")
+    git_key = QueryCache.make_key("git push", "git", 5, "keyword")
+
+    cache.put(docker_key, {"results": []}, ["docker", "compose"], None)
+    cache.put(git_key, {"results": []}, ["git", "push"], "git")
+
+    assert cache.invalidate(["push"], "docker") == 0
+    assert cache.invalidate(["compose", "volume"], "docker") == 1
+    assert cache.get(docker_key) is None
+    assert cache.get(QueryCache.make_key("GIT push", "git", 5, "keyword")) is not None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["memory_bytes"] > 0
+
+    cache.invalidate_all()
+    assert cache.get(git_key) is None
+
+
+def test_phrase_and_proximity():
+    """Frase exige termos consecutivos; proximidade favorece termos juntos"""
+    index = InvertedIndex()
+    index.add_document("junto", "docker compose up build".split())
+    index.add_document("longe", "compose file docker build".split())
+
+    phrase = [("docker", 0), ("compose", 1)]
+    assert [doc_id for doc_id, _ in index.search([], phrases=[phrase])] == ["junto"]
+    assert index.phrase_positions("junto", phrase) == [0]
+
+    plain = dict(index.search(["docker", "compose"]))
+    boosted = dict(index.search(["docker", "compose"], proximity_weight=0.5))
+    assert plain["junto"] == plain["longe"]
+    assert boosted["junto"] > boosted["longe"]
+
+
+def test_best_window_and_offsets():
+    """Janela mais densa e intervalo de caracteres saem do índice"""
+    text = "intro " * 30 + "docker compose volume"
+    terms = text.split()
+    offsets = [i * 6 for i in range(len(terms))]
+    index = InvertedIndex()
+    index.add_document("c", terms, list(range(len(terms))), offsets)
+
+    start, end, matched = index.best_window("c", ["docker", "volume"])
+    assert (start, end, matched) == (30, 32, 2)
+    assert index.char_span("c", start, end) == (180, None)
+    assert InvertedIndex.from_dict(index.to_dict()).char_span("c", 30, 31) == (180, 192)
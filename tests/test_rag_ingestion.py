@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste de Ingestão RAG
+---------------------
+Testes da ingestão de documentos do AdvancedRAGSystem.
+
+Uso: python -m pytest tests/test_rag_ingestion.py
+"""
+
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def _write_docs(directory: Path, docs):
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, text in docs.items():
+        path = directory / name
+        path.write_text(text, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def test_add_documents_parallel(tmp_path):
+    """Lote processado no pool, indexado e gravado com uma única escrita"""
+    paths = _write_docs(tmp_path / "docs", {
+        "docker.txt": "docker compose up",
+        "git.md": "# Git\ngit push origin",
+        "n8n.txt": "n8n workflow automation",
+    })
+    paths.append(tmp_path / "docs" / "missing.txt")
+    paths.append(_write_docs(tmp_path / "docs", {"image.xyz": "binário"})[0])
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    result = rag.add_documents(paths, category="tech", workers=2)
+
+    assert len(result["added"]) == 3
+    assert {Path(f["file"]).name for f in result["failed"]} == {"missing.txt", "image.xyz"}
+    assert rag.search_knowledge("workflow", category="tech")["total_found"] == 1
+
+    _, records = rag.store.load()
+    assert [record["op"] for record in records].count("put_document") == 3
+
+
+def _write_pdf(path: Path, pages):
+    """Gera um PDF mínimo com uma linha de texto por página"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('latin-1')
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    path.write_bytes(output)
+    return path
+
+
+def test_pdf_streaming_extraction(tmp_path):
+    """PDF é extraído em blocos limitados pelo orçamento, com intervalo de páginas"""
+    pdf = _write_pdf(tmp_path / "manual.pdf", ["docker intro", "compose volumes", "kubernetes pods"])
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.document_processor.memory_budget = 40
+    chunks = list(rag.document_processor.iter_pdf_chunks(pdf))
+
+    assert all(len(chunk["text"]) <= 40 for chunk in chunks)
+    assert chunks[0]["page_start"] == 1 and chunks[-1]["page_end"] == 3
+
+    doc_id = rag.add_document(pdf, category="manuais")["document_id"]
+    spans = rag.knowledge_base["documents"][doc_id]["metadata"]["page_spans"]
+    assert [span[:2] for span in spans] == [[c["page_start"], c["page_end"]] for c in chunks]
+    hit = rag.search_knowledge("kubernetes")["results"][0]
+    assert hit["document_id"] == doc_id
+    assert hit["page"] == 3
+
+
+def test_chunk_level_retrieval(tmp_path):
+    """Markdown é dividido por títulos e a busca devolve o chunk da seção"""
+    body = " ".join(f"palavra{i}" for i in range(300))
+    paths = _write_docs(tmp_path / "docs", {
+        "guia.md": f"# Introdução\n{body}\n\n## Volumes\ndocker volume create dados\n",
+    })
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    doc_id = rag.add_document(paths[0])["document_id"]
+
+    assert rag.knowledge_base["documents"][doc_id]["chunk_count"] > 2
+    hit = rag.search_knowledge("volume")["results"][0]
+    assert hit["heading"] == "Volumes"
+    assert hit["snippet"].startswith("## Volumes")
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.search_knowledge("volume")["results"][0]["chunk_id"] == hit["chunk_id"]
+
+
+def test_reingestion_skips_unchanged_and_replaces_changed(tmp_path):
+    """Reingerir não duplica: inalterado é pulado e alterado substitui a versão anterior"""
+    docs = tmp_path / "docs"
+    paths = _write_docs(docs, {"a.txt": "docker compose", "b.txt": "git push"})
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_documents(paths, workers=1)
+    second = rag.add_documents(paths, workers=1)
+    assert len(second["skipped"]) == 2 and second["added"] == []
+    assert rag.add_document(paths[0])["skipped"] is True
+
+    paths[0].write_text("docker swarm", encoding='utf-8')
+    result = rag.add_document(paths[0])
+    assert result["success"] and not result.get("skipped")
+    assert rag.get_stats()["total_documents"] == 2
+    assert rag.search_knowledge("compose")["total_found"] == 0
+
+    # Mesmo conteúdo em outro caminho reaproveita o documento
+    copy = _write_docs(docs, {"c.txt": "git push"})[0]
+    assert rag.add_document(copy)["document_id"] == rag.add_document(paths[1])["document_id"]
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.get_stats()["total_documents"] == 2
+    assert reloaded.add_documents(paths + [copy], workers=1)["added"] == []
+
+
+def test_phrase_query_and_snippet(tmp_path):
+    """Consulta entre aspas exige a frase e o snippet mostra o trecho encontrado"""
+    filler = " ".join(f"palavra{i}" for i in range(80))
+    paths = _write_docs(tmp_path / "docs", {
+        "compose.txt": f"{filler} para subir rode docker compose up no servidor",
+        "solto.txt": "compose sozinho e depois docker up",
+    })
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_documents(paths, workers=1)
+
+    results = rag.search_knowledge('"docker compose up"')["results"]
+    assert [r["title"] for r in results] == ["compose.txt"]
+    assert "docker compose up" in results[0]["snippet"]
+    assert results[0]["snippet"].startswith("...")
+    assert rag.search_knowledge("docker compose up")["total_found"] == 2
+
+
+def test_pdf_page_spans_same_on_both_paths(tmp_path):
+    """add_documents guarda page_spans como lista, igual a add_document"""
+    pdf = _write_pdf(tmp_path / "manual.pdf", ["docker intro", "compose volumes", "kubernetes pods"])
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.document_processor.memory_budget = 40
+    doc_id = rag.add_documents([pdf], workers=1)["added"][0]["document_id"]
+
+    spans = rag.knowledge_base["documents"][doc_id]["metadata"]["page_spans"]
+    assert isinstance(spans, list) and all(isinstance(span, list) for span in spans)
+    assert rag.search_knowledge("kubernetes")["results"][0]["page"] == 3
+
+
+def test_pdf_page_split_across_blocks_keeps_page(tmp_path):
+    """Pedaços de uma página fatiada entre blocos continuam com o número da página"""
+    long_page = " ".join(["filler"] * 12) + " kubernetes pods"
+    pdf = _write_pdf(tmp_path / "manual.pdf", ["docker intro", long_page])
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.document_processor.memory_budget = 40
+    blocks = list(rag.document_processor.iter_pdf_chunks(pdf))
+    assert sum(1 for block in blocks if block["page_start"] == 2) > 2
+
+    rag.add_document(pdf)
+    hit = rag.search_knowledge("kubernetes")["results"][0]
+    assert hit["page"] == 2
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Snapshot RAG
+---------------------
+Testes do snapshot binário do índice invertido e da exportação /
+importação JSON da base de conhecimento.
+
+Uso: python -m pytest tests/test_rag_snapshot.py
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rag_index import InvertedIndex
+from modules.rag_snapshot import SNAPSHOT_AVAILABLE, SnapshotMapping, write_snapshot, load_snapshot_index
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+pytestmark = pytest.mark.skipif(not SNAPSHOT_AVAILABLE, reason="NumPy não disponível")
+
+
+def _build_index():
+    index = InvertedIndex()
+    index.add_document("a", "docker compose up docker build".split(), offsets=[0, 7, 15, 18, 25])
+    index.add_document("b", "git commit git push branch".split())
+    index.add_document("c", "n8n workflow docker node".split(), [0, 2, 3, 4])
+    return index
+
+
+def test_snapshot_matches_original(tmp_path):
+    """Busca, frases, janelas e offsets iguais aos do índice em memória"""
+    index = _build_index()
+    write_snapshot(tmp_path / "index.snap", index)
+    loaded = load_snapshot_index(tmp_path / "index.snap")
+
+    assert len(loaded) == 3 and loaded.vocabulary_size == index.vocabulary_size
+    assert loaded.average_length == index.average_length
+    assert loaded.search(["docker", "compose"]) == index.search(["docker", "compose"])
+    assert loaded.phrase_positions("a", [("docker", 0), ("compose", 1)]) == [0]
+    assert loaded.best_window("c", ["workflow", "docker"]) == index.best_window("c", ["workflow", "docker"])
+    assert loaded.char_span("a", 1, 2) == (7, 18)
+    assert dict(loaded.document_frequencies()) == dict(index.document_frequencies())
+    assert loaded.to_dict() == json.loads(json.dumps(index.to_dict()))
+
+
+def test_snapshot_overlay_changes(tmp_path):
+    """Alterações depois do load ficam por cima do snapshot e vão para o próximo"""
+    index = _build_index()
+    write_snapshot(tmp_path / "first.snap", index)
+    loaded = load_snapshot_index(tmp_path / "first.snap")
+
+    for target in (index, loaded):
+        target.remove_document("a", "docker compose up docker build".split())
+        target.add_document("d", "docker swarm".split())
+
+    assert "a" not in loaded and "d" in loaded
+    assert loaded.search(["docker"]) == index.search(["docker"])
+    assert loaded.document_frequency("compose") == 0
+    assert loaded.vocabulary_size == index.vocabulary_size
+
+    write_snapshot(tmp_path / "second.snap", loaded)
+    reloaded = load_snapshot_index(tmp_path / "second.snap")
+    assert reloaded.search(["docker"]) == index.search(["docker"])
+    assert len(reloaded) == 3
+
+
+def test_snapshot_additions_do_not_decode_postings(tmp_path):
+    """Documento novo num termo do snapshot fica pendente até o termo ser lido"""
+    index = _build_index()
+    write_snapshot(tmp_path / "index.snap", index)
+    loaded = load_snapshot_index(tmp_path / "index.snap")
+
+    for target in (index, loaded):
+        target.add_document("d", "docker swarm git".split())
+    assert "docker" not in loaded.postings._values and "git" not in loaded.postings._values
+
+    assert loaded.document_frequency("docker") == 3
+    assert loaded.search(["docker"]) == index.search(["docker"])
+    assert loaded.to_dict() == json.loads(json.dumps(index.to_dict()))
+
+
+def test_rag_checkpoint_uses_snapshot(tmp_path):
+    """O checkpoint não traz o índice; o reload abre o snapshot binário"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("docker compose up para desenvolvimento", encoding='utf-8')
+    (docs / "b.txt").write_text("kubernetes deployment com rollout", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "a.txt")
+    rag.add_document(docs / "b.txt")
+    expected = rag.search_knowledge("docker compose", use_cache=False)["results"]
+    for _ in range(3):
+        rag._save_knowledge_base()
+
+    # Só o snapshot atual e o do checkpoint anterior são mantidos
+    checkpoint = json.loads(rag.store.checkpoint_file.read_text(encoding='utf-8'))
+    assert "documentation_index" not in checkpoint
+    snapshots = [path.name for path in rag.snapshot_dir.glob("*.snap")]
+    assert checkpoint["index_snapshot"] in snapshots and len(snapshots) == 2
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.search_knowledge("docker compose")["results"] == expected
+    assert reloaded.complete("kube")
+
+
+def test_rag_startup_defers_corpus_work(tmp_path):
+    """Chunks vêm do snapshot; bitmaps, índice vetorial e arquivos legados só no primeiro uso"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("docker compose up para desenvolvimento", encoding='utf-8')
+    (docs / "b.md").write_text("# Deploy\n\nkubernetes deployment com rollout", encoding='utf-8')
+    (docs / "c.txt").write_text("docker swarm em produção", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "a.txt", category="dev")
+    rag.add_document(docs / "b.md", category="ops")
+    rag._save_knowledge_base()
+    checkpoint = json.loads(rag.store.checkpoint_file.read_text(encoding='utf-8'))
+    assert "chunks" not in checkpoint
+    chunks = dict(rag.knowledge_base["chunks"])
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert isinstance(reloaded.knowledge_base["chunks"], SnapshotMapping)
+    assert reloaded.knowledge_base["chunks"].to_dict() == chunks
+    assert reloaded._filters is None and reloaded._vector_index is None and reloaded._legacy_files is None
+
+    # Journal por cima do snapshot, com os bitmaps ainda não montados
+    reloaded.add_document(docs / "c.txt", category="dev")
+    assert reloaded._filters is None
+
+    again = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    results = again.search_knowledge("docker", category="dev", use_cache=False)["results"]
+    assert len(results) == 2 and {result["category"] for result in results} == {"dev"}
+    assert again.search_knowledge("docker", category="ops", use_cache=False)["total_found"] == 0
+    assert again._filters is not None
+    assert again.search_semantic("kubernetes rollout")["results"][0]["category"] == "ops"
+    assert len(again.vector_index) == len(again.knowledge_base["chunks"])
+
+
+def test_rag_json_export_import(tmp_path):
+    """Exportação JSON portável reimportada em outra pasta de dados"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("terraform plan e apply", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "a.txt")
+    assert rag.export_knowledge_base(tmp_path / "export.json")["success"]
+
+    exported = json.loads((tmp_path / "export.json").read_text(encoding='utf-8'))
+    assert "documentation_index" in exported
+    assert [doc["content"] for doc in exported["documents"].values()] == ["terraform plan e apply"]
+
+    other = AdvancedRAGSystem(data_dir=str(tmp_path / "other"))
+    assert other.import_knowledge_base(tmp_path / "export.json") == {"success": True, "documents": 1}
+    assert other.search_knowledge("terraform")["total_found"] == 1
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste da Persistência RAG
+-------------------------
+Testes do journal append-only e dos checkpoints atômicos da base de
+conhecimento.
+
+Uso: python -m pytest tests/test_rag_storage.py
+"""
+
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rag_storage import KnowledgeBaseStore
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def test_journal_append_and_truncated_tail(tmp_path):
+    """Linha final truncada (queda no meio da escrita) é ignorada"""
+    store = KnowledgeBaseStore(tmp_path)
+    store.append([{"op": "put_url_cache", "key": "a", "value": {}}])
+    with open(store.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"op": "put_docu')
+
+    checkpoint, records = store.load()
+    assert checkpoint is None
+    assert records == [{"op": "put_url_cache", "key": "a", "value": {}}]
+
+
+def test_checkpoint_keeps_only_new_records(tmp_path):
+    """Checkpoint descarta o journal já incorporado"""
+    store = KnowledgeBaseStore(tmp_path)
+    store.append([{"op": "put_url_cache", "key": "a", "value": {}}])
+    store.checkpoint(lambda: json.dumps({"documents": {}}))
+
+    assert store.journal_size() == 0
+    checkpoint, records = store.load()
+    assert checkpoint == {"documents": {}}
+    assert records == []
+
+
+def test_concurrent_checkpoints_keep_journal_records(tmp_path):
+    """Checkpoint lento em segundo plano não sobrescreve um mais novo nem perde o journal"""
+    store = KnowledgeBaseStore(tmp_path)
+    state = []
+
+    def append(record):
+        with store.lock:
+            state.append(record)
+            store.append([record])
+
+    def serialize():
+        return json.dumps({"records": list(state)})
+
+    write_atomic = store._write_atomic
+    background = {}
+
+    def slow_write(path, payload):
+        if path == store.checkpoint_file and threading.current_thread() is background.get("thread"):
+            time.sleep(0.3)
+        write_atomic(path, payload)
+
+    store._write_atomic = slow_write
+    append({"op": "put_url_cache", "key": "a", "value": {}})
+    background["thread"] = threading.Thread(target=store.checkpoint, args=(serialize,))
+    background["thread"].start()
+    time.sleep(0.1)
+    append({"op": "put_url_cache", "key": "b", "value": {}})
+    store.checkpoint(serialize)
+    append({"op": "put_url_cache", "key": "c", "value": {}})
+    background["thread"].join()
+
+    checkpoint, records = store.load()
+    keys = [record["key"] for record in checkpoint["records"] + records]
+    assert sorted(keys) == ["a", "b", "c"]
+
+
+def test_ingestion_appends_instead_of_rewriting(tmp_path):
+    """add_document só acrescenta ao journal e a base é reconstruída no load"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name, text in [("a.txt", "docker compose"), ("b.txt", "git push")]:
+        (docs / name).write_text(text, encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "a.txt")
+    size_after_first = rag.store.journal_size()
+    rag.add_document(docs / "b.txt")
+
+    assert not rag.store.checkpoint_file.exists()
+    assert rag.store.journal_size() < 2 * size_after_first + 64
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.get_stats()["total_documents"] == 2
+    assert reloaded.search_knowledge("push")["results"][0]["title"] == "b.txt"
+
+
+def test_background_compaction(tmp_path):
+    """Compactação grava checkpoint e a base continua íntegra"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("n8n workflow", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.store.compact_min_bytes = 0
+    rag.add_document(docs / "a.txt")
+    rag.store.wait_for_compaction(timeout=5)
+
+    assert rag.store.checkpoint_file.exists()
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.get_stats()["total_documents"] == 1
+    assert reloaded.search_knowledge("workflow")["total_found"] == 1
+
+
+def test_search_cache_invalidated_by_new_document(tmp_path):
+    """Buscas repetidas vêm do cache até entrar documento com os mesmos termos"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("docker compose", encoding='utf-8')
+    (docs / "b.txt").write_text("docker swarm", encoding='utf-8')
+    (docs / "c.txt").write_text("git push", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "a.txt")
+
+    assert rag.search_knowledge("docker")["total_found"] == 1
+    assert rag.search_knowledge("docker")["cached"] is True
+
+    rag.add_document(docs / "c.txt")
+    assert rag.search_knowledge("docker").get("cached") is True
+
+    rag.add_document(docs / "b.txt")
+    assert rag.search_knowledge("docker")["total_found"] == 2
+    assert rag.get_stats()["query_cache"]["hits"] == 2
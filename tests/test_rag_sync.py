@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste da Sincronização de Pastas RAG
+------------------------------------
+Testes do DirectorySyncService (snapshots com os.scandir e deltas).
+
+Uso: python -m pytest tests/test_rag_sync.py
+"""
+
+import os
+import sys
+import time
+import multiprocessing
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import modules.advanced_rag_system as advanced_rag_system
+from modules.advanced_rag_system import AdvancedRAGSystem
+from modules.rag_sync import DirectorySyncService
+
+
+def _make_rag(tmp_path):
+    return AdvancedRAGSystem(data_dir=str(tmp_path / "data"), config_dir=str(tmp_path / "config"))
+
+
+def test_sync_applies_only_deltas(tmp_path):
+    """Novos, alterados e removidos são aplicados; o resto não é tocado"""
+    rag = _make_rag(tmp_path)
+    docs = rag.data_dir / "docs"
+    (docs / "a.txt").write_text("docker compose", encoding='utf-8')
+    (docs / "b.txt").write_text("git push", encoding='utf-8')
+    (docs / "sub").mkdir()
+    (docs / "sub" / "c.md").write_text("# N8N\nworkflow", encoding='utf-8')
+    (docs / "ignored.bin").write_bytes(b"\x00")
+
+    service = DirectorySyncService(rag, workers=1)
+    first = service.sync_once()
+    assert (first["added"], first["changed"], first["deleted"]) == (3, 0, 0)
+    assert service.sync_once()["added"] == 0
+
+    (docs / "a.txt").write_text("docker swarm", encoding='utf-8')
+    os.utime(docs / "a.txt", ns=(time.time_ns(), time.time_ns() + 10**9))
+    (docs / "b.txt").unlink()
+    cycle = service.sync_once()
+
+    assert (cycle["added"], cycle["changed"], cycle["deleted"]) == (0, 1, 1)
+    assert cycle["elapsed"] > 0 and cycle["lag"] >= 0
+    assert rag.search_knowledge("push")["total_found"] == 0
+    assert rag.search_knowledge("swarm")["total_found"] == 1
+    assert rag.get_stats()["total_documents"] == 2
+
+
+def test_first_cycle_detects_deletions_while_stopped(tmp_path):
+    """Arquivos apagados com o serviço parado saem do índice no primeiro ciclo"""
+    rag = _make_rag(tmp_path)
+    docs = rag.data_dir / "docs"
+    (docs / "a.txt").write_text("docker compose", encoding='utf-8')
+    DirectorySyncService(rag, workers=1).sync_once()
+    (docs / "a.txt").unlink()
+
+    cycle = DirectorySyncService(_make_rag(tmp_path), workers=1).sync_once()
+    assert cycle["deleted"] == 1
+
+
+def test_small_batches_in_process_and_failures_retried(tmp_path, monkeypatch):
+    """Poucos arquivos não criam pool; arquivo com falha é tentado no ciclo seguinte"""
+    def no_pool(*args, **kwargs):
+        raise AssertionError("pool criado para um lote pequeno")
+
+    monkeypatch.setattr(multiprocessing, "Pool", no_pool)
+    process_file = advanced_rag_system._process_file_worker
+    attempts = []
+
+    def flaky_process(file_path):
+        attempts.append(Path(file_path).name)
+        if attempts.count("b.txt") == 1 and file_path.endswith("b.txt"):
+            return {"success": False, "error": "arquivo bloqueado", "content": "", "metadata": {}}
+        return process_file(file_path)
+
+    monkeypatch.setattr(advanced_rag_system, "_process_file_worker", flaky_process)
+
+    rag = _make_rag(tmp_path)
+    docs = rag.data_dir / "docs"
+    (docs / "a.txt").write_text("docker compose", encoding='utf-8')
+    (docs / "b.txt").write_text("git push", encoding='utf-8')
+
+    service = DirectorySyncService(rag)
+    first = service.sync_once()
+    assert first["failed"] == 1
+    assert rag.search_knowledge("push")["total_found"] == 0
+
+    second = service.sync_once()
+    assert second["failed"] == 0 and second["added"] == 1
+    assert rag.search_knowledge("push")["total_found"] == 1
+    assert sorted(attempts) == ["a.txt", "b.txt", "b.txt"]
+    assert service.sync_once()["added"] == 0
+
+
+def test_background_service(tmp_path):
+    """Thread em segundo plano indexa arquivos novos e para com stop()"""
+    rag = _make_rag(tmp_path)
+    extra = tmp_path / "extra"
+    extra.mkdir()
+    service = DirectorySyncService(rag, directories=[(str(extra), "tech")], interval=0.05, workers=1)
+    service.start()
+    try:
+        (extra / "k8s.txt").write_text("kubernetes ingress", encoding='utf-8')
+        deadline = time.time() + 5
+        while time.time() < deadline and not rag.search_knowledge("ingress", use_cache=False)["total_found"]:
+            time.sleep(0.05)
+    finally:
+        service.stop(timeout=5)
+
+    assert rag.search_knowledge("ingress", category="tech")["total_found"] == 1
+    assert not service.get_status()["running"]
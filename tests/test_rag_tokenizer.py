@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Tokenizador RAG
+------------------------
+Testes do tokenizador regex (acentos, stopwords, stemming e modo em lote).
+
+Uso: python -m pytest tests/test_rag_tokenizer.py
+"""
+
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rag_tokenizer import Tokenizer, light_stem
+
+
+def test_folding_stopwords_and_stemming():
+    """Acentos removidos, stopwords PT/EN descartadas e plurais reduzidos"""
+    tokens = Tokenizer().tokenize("As Configurações dos containers e the branches")
+    assert tokens == ["configuracao", "container", "branch"]
+
+    assert light_stem("animais") == "animal"
+    assert light_stem("class") == "class"
+    assert Tokenizer(stem=False).tokenize("Imagens Docker") == ["imagens", "docker"]
+
+
+def test_every_token_is_kept():
+    """Nenhum corte por quantidade: todos os termos do texto são indexados"""
+    text = " ".join(f"termo{i}" for i in range(500))
+    assert len(Tokenizer().tokenize(text)) == 500
+
+
+def test_batch_matches_single():
+    """tokenize_batch devolve o mesmo que chamadas individuais"""
+    tokenizer = Tokenizer()
+    texts = ["Docker compose", "", "git\x00push", "Ações rápidas"]
+    assert tokenizer.tokenize_batch(texts) == [tokenizer.tokenize(text.replace("\x00", " ")) for text in texts]
+
+
+def test_nltk_not_imported():
+    """Importar o sistema RAG não carrega o NLTK"""
+    import modules.advanced_rag_system  # noqa: F401
+    assert "nltk" not in sys.modules
+
+
+def test_analyze_positions_and_offsets():
+    """Posições contam stopwords e offsets apontam para o texto original"""
+    tokenizer = Tokenizer()
+    text = "Instalar o Docker Compose"
+    terms, positions, offsets = tokenizer.analyze(text)
+
+    assert terms == ["instalar", "docker", "compose"]
+    assert positions == [0, 2, 3]
+    assert text[offsets[2]:].startswith("Docker")
+    assert tokenizer.analyze_batch([text, "git push"]) == [tokenizer.analyze(text), tokenizer.analyze("git push")]
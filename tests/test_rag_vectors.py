@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Índice Vetorial RAG
+----------------------------
+Testes da busca semântica local (HashingEncoder + DenseVectorIndex).
+
+Uso: python -m pytest tests/test_rag_vectors.py
+"""
+
+import sys
+import logging
+import threading
+from pathlib import Path
+
+import pytest
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+
+from modules.rag_vectors import HashingEncoder, DenseVectorIndex
+from modules.advanced_rag_system import AdvancedRAGSystem
+
+
+def _random_vectors(count, dim, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_topk_and_persistence(tmp_path, dtype):
+    """Top-1 de um vetor é ele mesmo, inclusive após reabrir o memmap"""
+    vectors = _random_vectors(3000, 32)
+    ids = [f"c{i}" for i in range(len(vectors))]
+
+    index = DenseVectorIndex(tmp_path, dim=32, dtype=dtype)
+    index.add(ids, vectors)
+    index.remove(["c7"])
+    index.save()
+
+    reopened = DenseVectorIndex(tmp_path)
+    assert len(reopened) == 2999
+    assert reopened.search(vectors[42], limit=1)[0][0] == "c42"
+    assert all(item_id != "c7" for item_id, _ in reopened.search(vectors[7], limit=5))
+
+
+def test_reingestion_reuses_rows_and_compacts(tmp_path):
+    """Reindexar reaproveita linhas vagas; save compacta matriz e journal"""
+    vectors = _random_vectors(600, 16, seed=2)
+    ids = [f"c{i}" for i in range(200)]
+    index = DenseVectorIndex(tmp_path, dim=16, compact_min_rows=50)
+    index.add(ids, vectors[:200])
+    index.build_ivf(n_lists=4)
+    matrix_size = index.matrix_file.stat().st_size
+
+    # Mesmo documento reindexado várias vezes: remover e acrescentar os mesmos chunks
+    for round_number in range(1, 3):
+        index.remove(ids)
+        index.add(ids, vectors[200 * round_number:200 * (round_number + 1)])
+    assert index.count == 200
+    assert index.matrix_file.stat().st_size == matrix_size
+
+    log_file = index.log_file
+    index.save()
+    assert index.generation == 1 and not log_file.exists()
+    assert sum(1 for _ in open(index.log_file, encoding='utf-8')) == 200
+
+    # Remoção em massa deixa linhas vagas: a compactação encolhe a matriz
+    index.remove(ids[:150])
+    index.save()
+    assert index.generation == 2 and index.count == 50
+
+    reopened = DenseVectorIndex(tmp_path)
+    assert len(reopened) == 50 and reopened.generation == 2
+    assert reopened.search(vectors[400 + 170], limit=1)[0][0] == "c170"
+    assert reopened.search(vectors[400 + 170], limit=1, nprobe=4)[0][0] == "c170"
+    assert all(item_id not in ids[:150] for item_id, _ in reopened.search(vectors[410], limit=10))
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+        ["ivf.npz", "vectors.2.f32", "vectors.2.log", "vectors.json"]
+
+
+def test_ivf_search(tmp_path):
+    """Com nprobe o IVF encontra o vizinho exato na maioria das consultas"""
+    vectors = _random_vectors(4000, 16, seed=1)
+    index = DenseVectorIndex(tmp_path, dim=16)
+    index.add([f"c{i}" for i in range(len(vectors))], vectors)
+    index.build_ivf(n_lists=16)
+
+    hits = sum(index.search(vectors[i], limit=1, nprobe=4)[0][0] == f"c{i}" for i in range(0, 4000, 40))
+    assert hits >= 95
+
+
+def test_semantic_mode(tmp_path):
+    """search_knowledge(mode="semantic") ranqueia por similaridade dos termos"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "docker.txt").write_text("docker container image registry volume", encoding='utf-8')
+    (docs / "git.txt").write_text("git branch merge rebase commit", encoding='utf-8')
+
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    rag.add_document(docs / "docker.txt")
+    rag.add_document(docs / "git.txt")
+
+    result = rag.search_knowledge("merge a branch", mode="semantic")
+    assert result["results"][0]["title"] == "git.txt"
+
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.search_semantic("container volume")["results"][0]["title"] == "docker.txt"
+
+
+def test_concurrent_ingestion_saves_vectors(tmp_path, caplog):
+    """Ingestão em várias threads grava os metadados dos vetores sem colidir"""
+    rag = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+
+    def ingest(number):
+        body = f"<html><title>Página {number}</title><body>docker volume pagina{number}</body></html>"
+        rag.add_fetched_content(f"http://docs.local/{number}", {
+            "changed": True, "status": "new", "body": body.encode('utf-8'),
+            "encoding": "utf-8", "entry": {}})
+
+    caplog.set_level(logging.ERROR)
+    threads = [threading.Thread(target=ingest, args=(number,)) for number in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+    assert not list((tmp_path / "data" / "vectors").glob("*.tmp"))
+    reloaded = AdvancedRAGSystem(data_dir=str(tmp_path / "data"))
+    assert reloaded.vector_index.count == 16
+    assert reloaded.search_semantic("pagina7")["results"][0]["title"] == "Página 7"
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Rate Limiter
+---------------------
+Testes dos token buckets, da fila limitada e das retentativas com
+backoff contra o servidor OpenRouter falso injetando 429.
+
+Uso: python -m pytest tests/test_rate_limiter.py
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.rate_limiter import RateLimiter, TokenBucket, QueueFullError
+from modules.openrouter_manager import OpenRouterManager
+from modules.advanced_rag_system import OpenRouterClient
+from tests.fake_openrouter import FakeOpenRouter
+
+MESSAGES = [{"role": "user", "content": "olá"}]
+
+
+def _manager(server, tmp_path, limiter):
+    manager = OpenRouterManager(catalog_path=tmp_path / "models.json.gz")
+    manager.api_key = "teste"
+    manager.base_url = server.url
+    manager.rate_limiter = limiter
+    return manager
+
+
+def test_token_bucket_and_retry_after():
+    """Rajada até a capacidade, depois espera proporcional à taxa"""
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0 and bucket.reserve(now) == 0
+    assert bucket.reserve(now) == pytest.approx(0.1)
+    assert bucket.reserve(now + 0.1) == pytest.approx(0.1)
+
+    assert RateLimiter.parse_retry_after("2") == 2.0
+    assert RateLimiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert RateLimiter.parse_retry_after("talvez") is None
+
+    limiter = RateLimiter(base_delay=1.0, max_delay=4.0)
+    assert all(0 <= limiter.backoff("m", attempt, 503) <= min(4.0, 2 ** attempt) for attempt in range(5))
+    assert limiter.backoff("m", 0, 429, retry_after="0.3") == 0.3
+    assert limiter._model_bucket("m").paused_until > time.monotonic()
+    assert limiter._model_bucket("x:free").rate < limiter._model_bucket("x").rate
+
+
+def test_retries_429_with_retry_after(tmp_path):
+    """429 com Retry-After é repetido depois da espera indicada e termina com sucesso"""
+    with FakeOpenRouter(reply="ok", rate_limit_first=2, retry_after="0.2") as server:
+        manager = _manager(server, tmp_path, RateLimiter())
+        result = asyncio.run(manager.chat_with_model("fake/modelo", MESSAGES))
+
+        client = OpenRouterClient(api_key="teste")
+        client.base_url = server.url
+        client.rate_limiter = RateLimiter(base_delay=0.01)
+        server.rate_limited, server.rate_limit_first, server.retry_after = 0, 1, None
+        sync_result = client.query_model("fake/modelo", "olá")
+
+    assert result["success"] and result["attempts"] == 3
+    gaps = [b - a for a, b in zip(server.request_times, server.request_times[1:3])]
+    assert all(gap >= 0.19 for gap in gaps)
+    assert manager.router.stats("fake/modelo")["rate_limit_rate"] == 2 / 3
+    assert sync_result["success"] and sync_result["attempts"] == 2
+
+
+def test_gives_up_after_max_retries(tmp_path):
+    """Sem sucesso dentro do limite de tentativas o erro volta ao chamador"""
+    with FakeOpenRouter(rate_limit_first=10) as server:
+        manager = _manager(server, tmp_path, RateLimiter(max_retries=2, base_delay=0.01))
+        result = asyncio.run(manager.chat_with_model("fake/modelo", MESSAGES))
+
+    assert result["status"] == 429 and result["attempts"] == 3
+    assert len(server.requests) == 3
+
+
+def test_burst_is_smoothed_and_queue_is_bounded(tmp_path):
+    """Rajada respeita o balde do modelo; além da fila as chamadas são recusadas"""
+    limiter = RateLimiter(model_requests_per_minute=600, model_burst=2, max_in_flight=2, max_queue=3)
+    with FakeOpenRouter(reply="ok", model_latency={"fake/modelo": 0.05}) as server:
+        manager = _manager(server, tmp_path, limiter)
+
+        async def burst():
+            return await asyncio.gather(*[manager.chat_with_model("fake/modelo", MESSAGES) for _ in range(8)])
+
+        results = asyncio.run(burst())
+
+    succeeded = [r for r in results if r.get("success")]
+    rejected = [r for r in results if r.get("queue_full")]
+    assert len(succeeded) == 5 and len(rejected) == 3
+    # Depois das 2 fichas iniciais, no máximo uma requisição a cada 0.1s
+    times = server.request_times
+    assert times[-1] - times[0] >= 0.25
+    stats = limiter.get_stats()
+    assert stats["rejected"] == 3 and stats["throttled"] >= 3
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0
+
+
+def test_queue_full_error_sync():
+    """Fila cheia também é aplicada ao cliente síncrono"""
+    limiter = RateLimiter(max_in_flight=1, max_queue=0)
+    with limiter.slot_sync("m"):
+        with pytest.raises(QueueFullError):
+            with limiter.slot_sync("m"):
+                pass
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+def test_interrupted_sync_wait_leaves_queue():
+    """Uma espera síncrona interrompida devolve o lugar na fila"""
+    limiter = RateLimiter(max_in_flight=1, max_queue=1)
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    with limiter.slot_sync("m"):
+        limiter._slot_freed.wait = interrupted
+        with pytest.raises(KeyboardInterrupt):
+            with limiter.slot_sync("m"):
+                pass
+        assert limiter.get_stats()["waiting"] == 0
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+def test_waiters_woken_when_slot_frees():
+    """Ao liberar a vaga, esperas síncronas e de outros loops seguem sem polling"""
+    limiter = RateLimiter(requests_per_minute=6000, burst=100, model_requests_per_minute=6000,
+                          model_burst=100, max_in_flight=1, max_queue=10)
+    started = []
+
+    def sync_caller():
+        with limiter.slot_sync("m"):
+            started.append(time.monotonic())
+
+    async def async_caller():
+        async with limiter.slot("m"):
+            started.append(time.monotonic())
+
+    with limiter.slot_sync("m"):
+        threads = [threading.Thread(target=sync_caller) for _ in range(2)]
+        threads += [threading.Thread(target=asyncio.run, args=(async_caller(),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while limiter.get_stats()["waiting"] < 4:
+            time.sleep(0.01)
+        assert not started
+        released = time.monotonic()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(started) == 4 and max(started) - released < 0.5
+    stats = limiter.get_stats()
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0 and not limiter._async_waiters
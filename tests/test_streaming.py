@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teste do Streaming de Chat
+--------------------------
+Testes do decodificador SSE e das respostas em streaming do
+OpenRouterManager e do OpenRouterClient contra um servidor local.
+
+Uso: python -m pytest tests/test_streaming.py
+"""
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules.sse_stream import SSEDecoder, StreamState
+from modules.rate_limiter import RateLimiter
+from modules.openrouter_manager import OpenRouterManager
+from modules.advanced_rag_system import OpenRouterClient
+from tests.fake_openrouter import FakeOpenRouter
+
+
+def _manager(server, tmp_path):
+    manager = OpenRouterManager(catalog_path=tmp_path / "models.json.gz")
+    manager.api_key = "teste"
+    # Limitador próprio: o compartilhado por API key acumularia fichas entre os testes
+    manager.rate_limiter = RateLimiter()
+    manager.base_url = server.url
+    return manager
+
+
+async def _collect(stream, cancel_after=None, cancel_event=None):
+    deltas = []
+    final = None
+    async for event in stream:
+        if event["type"] == "delta":
+            deltas.append(event["content"])
+            if cancel_after is not None and len(deltas) == cancel_after:
+                cancel_event.set()
+        else:
+            final = event
+    return deltas, final
+
+
+def test_decoder_handles_split_events():
+    """Eventos partidos entre pacotes, comentários e CRLF"""
+    decoder = SSEDecoder()
+    assert decoder.feed(b": keep-alive\n\nda") == []
+    assert decoder.feed(b'ta: {"a": 1}\r\n\r\ndata: [DO') == ['{"a": 1}']
+    assert decoder.feed(b"NE]\n") == []
+    assert decoder.close() == ["[DONE]"]
+
+    state = StreamState("m")
+    assert state.parse('{"choices": [{"delta": {"content": "oi"}}]}') == {"type": "delta", "content": "oi"}
+    assert state.parse('{"error": {"message": "limite"}}') == {"type": "error", "error": "limite"}
+    assert state.parse("[DONE]")["type"] == "skip" and state.finished
+    assert state.ttft is not None
+
+
+def test_stream_chat_yields_deltas_and_ttft(tmp_path):
+    """Deltas na ordem, resposta completa, usage e tempo até o primeiro token"""
+    reply = "um PRD bem longo com várias seções"
+    with FakeOpenRouter(reply=reply) as server:
+        manager = _manager(server, tmp_path)
+        deltas, final = asyncio.run(_collect(manager.stream_chat("fake/modelo", [{"role": "user", "content": "PRD"}],
+                                                                 "prompt", ["contexto RAG"])))
+
+    assert len(deltas) == len(reply.split())
+    assert "".join(deltas) == reply == final["response"]
+    assert final["success"] and not final["cancelled"]
+    assert final["usage"]["completion_tokens"] == len(reply.split())
+    assert 0 <= final["ttft"] <= final["elapsed"]
+    assert final["packing"]["included"] == [0]
+    assert server.requests[0]["stream"] is True
+
+
+def test_stream_chat_cancel(tmp_path):
+    """Cancelamento interrompe a leitura e devolve o texto parcial"""
+    with FakeOpenRouter(reply=" ".join(f"palavra{i}" for i in range(50)), delay=0.01) as server:
+        manager = _manager(server, tmp_path)
+        cancel = threading.Event()
+        deltas, final = asyncio.run(_collect(manager.stream_chat("fake/modelo", [{"role": "user", "content": "oi"}],
+                                                                 cancel_event=cancel),
+                                             cancel_after=3, cancel_event=cancel))
+
+    assert final["cancelled"]
+    assert 3 <= len(deltas) < 50
+    assert final["response"] == "".join(deltas)
+
+
+def test_client_query_model_stream():
+    """Versão síncrona (requests) do OpenRouterClient"""
+    with FakeOpenRouter(reply="resposta em partes", chunk_words=2) as server:
+        client = OpenRouterClient(api_key="teste")
+        client.base_url = server.url
+        events = list(client.query_model_stream("fake/modelo", "pergunta", context="ctx"))
+
+    assert [e["content"] for e in events if e["type"] == "delta"] == ["resposta em ", "partes"]
+    assert events[-1]["type"] == "done" and events[-1]["response"] == "resposta em partes"
+    assert events[-1]["model_used"] == "fake/modelo"